@@ -0,0 +1,59 @@
+"""
+Cancels renders whose HTTP client has gone away.
+
+While a generate route waits for its render, a small watcher task polls
+`request.is_disconnected()`. When the client times out or navigates away it
+cancels the request's CancelToken: a queued render is dropped before it
+starts, and a running one stops at the next block (or batch item) boundary.
+
+Environment Variables:
+    DISCONNECT_POLL_SECONDS: Poll interval of the watcher (default 0.25).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import Request
+
+from .pdf_utils.cancel import CancelToken
+
+DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.25"))
+
+# Status logged/returned when the client closed the connection (nginx convention).
+CLIENT_CLOSED_REQUEST = 499
+
+@asynccontextmanager
+async def cancel_on_disconnect(request: Request, token: Optional[CancelToken] = None,
+                               poll: float = DISCONNECT_POLL_SECONDS) -> AsyncIterator[CancelToken]:
+    """
+    Cancels `token` with reason "client disconnected" if the client goes away.
+
+    Args:
+        request (Request): The incoming request to watch.
+        token (Optional[CancelToken]): Token to cancel; a new one is created if None.
+        poll (float): Seconds between disconnect checks.
+
+    Yields:
+        CancelToken: The watched token, to pass to the render.
+    """
+    token = token or CancelToken()
+
+    async def _watch() -> None:
+        while not token.cancelled:
+            if await request.is_disconnected():
+                print(f"[Info] Client disconnected from {request.url.path}; cancelling render")
+                token.cancel("client disconnected")
+                return
+            await asyncio.sleep(poll)
+
+    watcher = asyncio.create_task(_watch())
+    try:
+        yield token
+    finally:
+        watcher.cancel()
+
+__all__ = ["CLIENT_CLOSED_REQUEST", "DISCONNECT_POLL_SECONDS", "cancel_on_disconnect"]
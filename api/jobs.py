@@ -0,0 +1,551 @@
+"""
+Asynchronous render jobs backed by a local SQLite queue.
+
+`POST /jobs` stores the payload and returns immediately; workers pull queued
+jobs, render every item and write one ZIP (PDFs plus `manifest.json`) next
+to the database. Jobs and results survive restarts:
+
+- a job is claimed atomically (BEGIN IMMEDIATE), so any number of worker
+  threads or processes can share one database;
+- running jobs heartbeat while they work (after every block, and while an
+  item waits for a render slot), and jobs whose heartbeat is older than the
+  lease are put back in the queue (e.g. after a crash);
+- finished jobs and their result files are purged after the retention period.
+
+Workers also append progress events (queued, started, per-block progress,
+item done/failed, done/failed) to a `job_events` table, which the API streams
+to clients as server-sent events; finished items can be downloaded before
+the whole job is done.
+
+In-process workers are started by the API lifespan. To add throughput, run
+more worker processes against the same database:
+
+    python -m api.jobs
+
+Environment Variables:
+    JOBS_DIR: Database and result directory (default `.cache/jobs`).
+    JOB_WORKERS: Worker threads started by the API process (default 1; 0 = none).
+    JOBS_LEASE_SECONDS: Heartbeat age after which a running job is requeued (default 120).
+    JOBS_RETENTION_HOURS: How long finished jobs and results are kept (default 24).
+    JOBS_MAX_ATTEMPTS: Attempts before a repeatedly interrupted job fails (default 3).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+import zipfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from .pdf_utils.cancel import CancelToken, RenderCancelled
+from .pdf_utils.resume import ProgressHook
+
+ROOT = Path(__file__).resolve().parents[1]
+
+JOBS_DIR = Path(os.getenv("JOBS_DIR", str(ROOT / ".cache" / "jobs"))).expanduser()
+LEASE_SECONDS = float(os.getenv("JOBS_LEASE_SECONDS", "120"))
+RETENTION_SECONDS = float(os.getenv("JOBS_RETENTION_HOURS", "24")) * 3600
+MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+# Minimum interval between heartbeats of a running item; several fit in one lease.
+HEARTBEAT_SECONDS = LEASE_SECONDS / 4
+
+# Job states; "done" and "failed" are final.
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    client TEXT,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    heartbeat REAL,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    items_total INTEGER NOT NULL DEFAULT 0,
+    items_done INTEGER NOT NULL DEFAULT 0,
+    items_failed INTEGER NOT NULL DEFAULT 0,
+    result_bytes INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS job_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    type TEXT NOT NULL,
+    item INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS job_events_job_seq ON job_events (job_id, seq);
+"""
+
+# Event types after which a job's event stream ends.
+FINAL_EVENTS = ("done", "failed")
+
+# Columns returned by GET /jobs/{id}; the payload stays internal.
+_PUBLIC = (
+    "id", "status", "created", "started", "finished", "attempts",
+    "items_total", "items_done", "items_failed", "result_bytes", "error",
+)
+
+class JobStore:
+    """
+    SQLite-backed job queue and result directory.
+
+    Args:
+        root (Path): Directory holding `jobs.sqlite3` and one result file per job.
+    """
+
+    def __init__(self, root: Path = JOBS_DIR):
+        self.root = root
+        self.db_path = root / "jobs.sqlite3"
+        self._local = threading.local()
+        self._ready = False
+        self._init_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._init()
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init(self) -> None:
+        with self._init_lock:
+            if self._ready:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.close()
+            self._ready = True
+
+    def result_path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.zip"
+
+    def parts_dir(self, job_id: str, worker: Optional[str] = None) -> Path:
+        """
+        Directory holding item PDFs of a running job until its ZIP is complete.
+
+        Every worker that claims the job writes to its own subdirectory, so a
+        worker whose lease expired cannot clobber the parts of the next one.
+        Without `worker`, returns the job's directory holding all of them.
+        """
+        parts = self.root / f"{job_id}.parts"
+        if worker is None:
+            return parts
+        return parts / re.sub(r"[^A-Za-z0-9._-]+", "_", worker)
+
+    def emit(self, job_id: str, type: str, item: Optional[int] = None, **data: Any) -> None:
+        """
+        Appends a progress event for a job.
+
+        Args:
+            job_id (str): Job the event belongs to.
+            type (str): Event type, e.g. "started", "block", "item_done".
+            item (Optional[int]): Item index the event refers to.
+            **data: JSON-serializable event details.
+        """
+        self._conn().execute(
+            "INSERT INTO job_events (job_id, ts, type, item, data) VALUES (?, ?, ?, ?, ?)",
+            (job_id, time.time(), type, item, json.dumps(data, ensure_ascii=False)),
+        )
+
+    def events(self, job_id: str, after: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Returns events of a job with a sequence number greater than `after`, oldest first.
+        """
+        rows = self._conn().execute(
+            "SELECT seq, ts, type, item, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (job_id, after, limit),
+        ).fetchall()
+        return [
+            {"seq": r["seq"], "ts": r["ts"], "type": r["type"], "item": r["item"], **json.loads(r["data"] or "{}")}
+            for r in rows
+        ]
+
+    def submit(self, items: List[Dict[str, Any]], client: Optional[str] = None) -> str:
+        """
+        Stores a new job and returns its id.
+
+        Args:
+            items (List[Dict[str, Any]]): Raw GenerateFormRequest payloads.
+            client (Optional[str]): Submitting client, used for fair scheduling.
+
+        Returns:
+            str: The job id.
+        """
+        job_id = uuid.uuid4().hex
+        self._conn().execute(
+            "INSERT INTO jobs (id, status, client, payload, created, items_total) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, client, json.dumps({"items": items}), time.time(), len(items)),
+        )
+        self.emit(job_id, "queued", items=len(items))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the public status fields of a job, or None if it does not exist.
+        """
+        row = self._conn().execute(f"SELECT {', '.join(_PUBLIC)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically moves the oldest queued job to running and returns it with its payload.
+
+        Running jobs whose heartbeat is older than the lease are requeued first.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for stale in conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ? AND heartbeat < ?", (RUNNING, now - LEASE_SECONDS)
+            ).fetchall():
+                if stale["attempts"] >= MAX_ATTEMPTS:
+                    self.emit(stale["id"], "failed", error="worker lost too many times")
+                else:
+                    self.emit(stale["id"], "requeued", reason="lease expired")
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = CASE WHEN attempts >= ? THEN 'worker lost too many times' ELSE error END, "
+                "finished = CASE WHEN attempts >= ? THEN ? ELSE finished END "
+                "WHERE status = ? AND heartbeat < ?",
+                (MAX_ATTEMPTS, FAILED, QUEUED, MAX_ATTEMPTS, MAX_ATTEMPTS, now, RUNNING, now - LEASE_SECONDS),
+            )
+            row = conn.execute(
+                "SELECT id, client, payload FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started = ?, heartbeat = ?, attempts = attempts + 1, "
+                "items_done = 0, items_failed = 0 WHERE id = ?",
+                (RUNNING, worker, now, now, row["id"]),
+            )
+            self.emit(row["id"], "started", worker=worker)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return {
+            "id": row["id"], "client": row["client"], "worker": worker,
+            "items": json.loads(row["payload"])["items"],
+        }
+
+    # The updates below only apply while `worker` still holds the job: once its
+    # lease expired and another worker claimed the job, they change nothing.
+
+    def progress(self, job_id: str, worker: str, done: int, failed: int) -> bool:
+        """
+        Records item progress and refreshes the job's heartbeat.
+
+        Returns:
+            bool: False if the worker no longer holds the job.
+        """
+        cur = self._conn().execute(
+            "UPDATE jobs SET items_done = ?, items_failed = ?, heartbeat = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (done, failed, time.time(), job_id, worker, RUNNING),
+        )
+        return cur.rowcount == 1
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """
+        Refreshes the job's heartbeat without changing its progress.
+
+        Returns:
+            bool: False if the worker no longer holds the job.
+        """
+        cur = self._conn().execute(
+            "UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? AND status = ?",
+            (time.time(), job_id, worker, RUNNING),
+        )
+        return cur.rowcount == 1
+
+    def finish(self, job_id: str, worker: str, result_bytes: int, failed: int, ms: float) -> bool:
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, finished = ?, result_bytes = ?, items_failed = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (DONE, time.time(), result_bytes, failed, job_id, worker, RUNNING),
+        )
+        if cur.rowcount == 1:
+            self.emit(job_id, "done", bytes=result_bytes, failed=failed, ms=ms)
+        return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, finished = ?, error = ? WHERE id = ? AND worker = ? AND status = ?",
+            (FAILED, time.time(), error, job_id, worker, RUNNING),
+        )
+        if cur.rowcount == 1:
+            self.emit(job_id, "failed", error=error)
+        return cur.rowcount == 1
+
+    def requeue(self, job_id: str, worker: str) -> bool:
+        """
+        Puts an interrupted job back in the queue (e.g. on worker shutdown).
+        """
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, worker = NULL, heartbeat = NULL WHERE id = ? AND worker = ? AND status = ?",
+            (QUEUED, job_id, worker, RUNNING),
+        )
+        if cur.rowcount == 1:
+            self.emit(job_id, "requeued", reason="worker stopped")
+        return cur.rowcount == 1
+
+    def purge(self, older_than: float = RETENTION_SECONDS) -> int:
+        """
+        Deletes finished jobs (and their result files) older than the retention period.
+
+        Returns:
+            int: Number of jobs removed.
+        """
+        conn = self._conn()
+        cutoff = time.time() - older_than
+        rows = conn.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) AND finished < ?", (DONE, FAILED, cutoff)
+        ).fetchall()
+        for row in rows:
+            self.result_path(row["id"]).unlink(missing_ok=True)
+            shutil.rmtree(self.parts_dir(row["id"]), ignore_errors=True)
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (row["id"],))
+        conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished < ?", (DONE, FAILED, cutoff))
+        return len(rows)
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+STORE = JobStore()
+
+# Refreshes a running job's lease; raises RenderCancelled once the lease is lost.
+Heartbeat = Callable[[], None]
+
+# render(data, cancel, client, progress, heartbeat) -> PDF bytes; `heartbeat`
+# must be called while the render waits for a slot, as `progress` only runs
+# once blocks are drawn.
+RenderFn = Callable[
+    [Dict[str, Any], CancelToken, Optional[str], Optional[ProgressHook], Optional[Heartbeat]], bytes
+]
+
+def render_direct(data: Dict[str, Any], cancel: CancelToken, client: Optional[str],
+                  progress: Optional[ProgressHook] = None, heartbeat: Optional[Heartbeat] = None) -> bytes:
+    """
+    Renders in the calling thread; used by standalone worker processes.
+
+    The render starts at once, so the per-block `progress` hook keeps the lease.
+    """
+    from .pdf_utils.resume import build_resume_pdf
+    return build_resume_pdf(data=data, cancel=cancel, progress=progress)
+
+def run_job(job: Dict[str, Any], store: JobStore, render: RenderFn, token: CancelToken) -> None:
+    """
+    Renders every item of a claimed job into its result ZIP.
+
+    Items are validated and rendered one by one; failures are written to the
+    manifest instead of failing the job. The token is checked between items
+    (and between blocks inside each render). Progress events are emitted per
+    item and per block, and each finished PDF is also kept in the job's parts
+    directory so it can be downloaded before the job completes. The lease is
+    refreshed after every block and while `render` waits for a render slot
+    (at most every HEARTBEAT_SECONDS), so a long queue wait does not get the
+    job requeued.
+
+    The ZIP is written to a temporary file of this run and moved into place at
+    the end; only this worker's parts directory is created and removed.
+
+    Raises:
+        RenderCancelled: If the token is cancelled, or the worker lost its lease
+            to another worker; the partial result is removed.
+    """
+    from .routes.common import prepare_render_data, slug, validation_summary
+    from .routes.generate_batch import BatchItemResult
+    from .schemas import BatchItemRequest
+
+    job_id, worker = job["id"], job["worker"]
+    final = store.result_path(job_id)
+    tmp = final.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    parts = store.parts_dir(job_id, worker)
+    shutil.rmtree(parts, ignore_errors=True)
+    parts.mkdir(parents=True)
+    results: List[BatchItemResult] = []
+    failed = 0
+    t_job = time.perf_counter()
+    last_beat = time.monotonic()
+
+    def keepalive() -> None:
+        nonlocal last_beat
+        if time.monotonic() - last_beat < HEARTBEAT_SECONDS:
+            return
+        last_beat = time.monotonic()
+        if not store.heartbeat(job_id, worker):
+            raise RenderCancelled("lease lost")
+
+    try:
+        with zipfile.ZipFile(tmp, mode="w", compression=zipfile.ZIP_STORED) as zf:
+            for index, item in enumerate(job["items"]):
+                token.raise_if_cancelled()
+                t0 = time.perf_counter()
+                res = BatchItemResult(index, None, "ok")
+                store.emit(job_id, "item_started", index)
+
+                def on_block(done: int, total: int, block_id: str, _index: int = index) -> None:
+                    store.emit(job_id, "block", _index, done=done, total=total, block=block_id)
+                    keepalive()
+
+                try:
+                    req = BatchItemRequest.model_validate(item)
+                    pdf = render(prepare_render_data(req), token, job.get("client"), on_block, keepalive)
+                    res.file = f"{index + 1:04d}-{slug(req.profile.header.name)}-{req.theme_name}.pdf"
+                    res.bytes = len(pdf)
+                    zf.writestr(res.file, pdf)
+                    part_tmp = parts / f"{res.file}.tmp"
+                    part_tmp.write_bytes(pdf)
+                    part_tmp.replace(parts / res.file)
+                except ValidationError as e:
+                    res.status, res.error = "error", validation_summary(e)
+                except RenderCancelled:
+                    raise
+                except Exception as e:
+                    print(f"[WARN] Job {job_id} item {index} failed: {e!r}")
+                    res.status, res.error = "error", f"{type(e).__name__}: {e}"
+                res.ms = round((time.perf_counter() - t0) * 1000, 1)
+                results.append(res)
+                failed += res.status != "ok"
+                if not store.progress(job_id, worker, len(results), failed):
+                    raise RenderCancelled("lease lost")
+                if res.status == "ok":
+                    store.emit(job_id, "item_done", index, file=res.file, bytes=res.bytes, ms=res.ms)
+                else:
+                    store.emit(job_id, "item_failed", index, error=res.error, ms=res.ms)
+
+            manifest = {
+                "job": job_id,
+                "items": [asdict(r) for r in results],
+                "ok": len(results) - failed,
+                "failed": failed,
+                "total_ms": round((time.perf_counter() - t_job) * 1000, 1),
+            }
+            zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+        if not store.progress(job_id, worker, len(results), failed):
+            raise RenderCancelled("lease lost")
+        tmp.replace(final)
+    finally:
+        tmp.unlink(missing_ok=True)
+        shutil.rmtree(parts, ignore_errors=True)
+        try:
+            parts.parent.rmdir()  # only once no other worker has parts left
+        except OSError:
+            pass
+    store.finish(job_id, worker, final.stat().st_size, failed, round((time.perf_counter() - t_job) * 1000, 1))
+
+class JobWorker:
+    """
+    Thread that pulls jobs from the store and runs them until stopped.
+
+    Args:
+        store (JobStore): Shared job store.
+        render (RenderFn): Renders one prepared item.
+        name (str): Worker name recorded on claimed jobs.
+        poll (float): Seconds to sleep when the queue is empty.
+    """
+
+    def __init__(self, store: JobStore, render: RenderFn, name: Optional[str] = None, poll: float = 1.0):
+        self.store = store
+        self.render = render
+        self.name = name or f"{os.uname().nodename}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll = poll
+        self._stop = threading.Event()
+        self._token = CancelToken()
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge = 0.0
+
+    def start(self) -> "JobWorker":
+        self._thread = threading.Thread(target=self.run_forever, name=f"job-worker-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stops the worker; a job in progress is interrupted between items and requeued.
+        """
+        self._stop.set()
+        self._token.cancel("shutdown")
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def run_once(self) -> bool:
+        """
+        Claims and runs at most one job.
+
+        Returns:
+            bool: True if a job was claimed.
+        """
+        job = self.store.claim(self.name)
+        if job is None:
+            return False
+        print(f"[Jobs] {self.name} running {job['id']} ({len(job['items'])} items)")
+        try:
+            run_job(job, self.store, self.render, self._token)
+            print(f"[Jobs] {job['id']} done")
+        except RenderCancelled as e:
+            if self.store.requeue(job["id"], self.name):
+                print(f"[Jobs] {job['id']} interrupted, requeued")
+            else:
+                print(f"[Jobs] {job['id']} abandoned ({e.reason})")
+        except Exception as e:
+            self.store.fail(job["id"], self.name, f"{type(e).__name__}: {e}")
+            print(f"[Jobs] {job['id']} failed: {e!r}")
+        return True
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - self._last_purge > 600:
+                    self._last_purge = time.monotonic()
+                    purged = self.store.purge()
+                    if purged:
+                        print(f"[Jobs] purged {purged} expired jobs")
+                if not self.run_once():
+                    self._stop.wait(self.poll)
+            except Exception as e:
+                print(f"[WARN] Job worker {self.name} error: {e!r}")
+                self._stop.wait(self.poll)
+
+def main() -> None:
+    """
+    Standalone worker process: `python -m api.jobs`.
+    """
+    from .pdf_utils.fonts import ensure_fonts
+    ensure_fonts()
+    worker = JobWorker(STORE, render_direct)
+    print(f"[Jobs] worker {worker.name} polling {STORE.db_path}")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+
+if __name__ == "__main__":
+    main()
+
+__all__ = ["HEARTBEAT_SECONDS", "JobStore", "JobWorker", "STORE", "render_direct", "run_job"]
@@ -1,17 +1,54 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from .pdf_utils.preview_cache import PREVIEWS
+from .registry import REGISTRY
+from .rate_limit import LIMITER
+from .render_queue import RENDER_QUEUE, render_queue_metrics
+from .routes.common import LAYOUTS_DIR, THEMES_DIR
 from .routes.generate_form import router as generate_form_router
+from .routes.generate_batch import router as generate_batch_router
+from .routes.assemble import router as assemble_router
+from .routes.incremental import router as incremental_router
+from .routes.preview import router as preview_router
+from .routes.jobs import router as jobs_router, start_job_workers, stop_job_workers
+from .routes.meta import router as meta_router
+from .warmup import STATE as WARMUP, run_warmup
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: warm fonts, icons, themes and layouts in the background.
+
+    The server starts accepting connections right away, but /healthz reports
+    not-ready until warmup has finished, so load balancers only route to warm workers.
+    The theme/layout registry is polled for changes while the app runs
+    (REGISTRY_POLL_SECONDS, 0 disables), and render job workers pull from the
+    job queue (JOB_WORKERS, 0 disables).
+    """
+    task = asyncio.create_task(asyncio.to_thread(run_warmup))
+    app.state.warmup_task = task
+    REGISTRY.start()
+    start_job_workers(asyncio.get_running_loop())
+    yield
+    await asyncio.to_thread(stop_job_workers)
+    REGISTRY.stop()
+    if not task.done():
+        await asyncio.wait({task}, timeout=5)
 
 app = FastAPI(
     title="Resume PDF API",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS setup to allow all origins during development
@@ -38,15 +75,41 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     print("[Error] 422 details:", exc.errors())
     return JSONResponse(status_code=422, content={"detail": exc.errors()})
 
-# Register the generate form router
+# Register the generate form, batch, assemble, incremental, preview, jobs and meta routers
 app.include_router(generate_form_router)
+app.include_router(generate_batch_router)
+app.include_router(assemble_router)
+app.include_router(incremental_router)
+app.include_router(preview_router)
+app.include_router(jobs_router)
+app.include_router(meta_router)
 
 @app.get("/healthz")
 def healthz():
     """
-    Basic health check endpoint.
+    Health and readiness check endpoint.
+
+    Returns:
+        JSONResponse: 200 once startup warmup has finished, 503 while it is still running.
+    """
+    body = {
+        "ok": WARMUP.ready,
+        "warmup": WARMUP.as_dict(),
+        "registry_version": REGISTRY.current.version,
+        "render_queue": RENDER_QUEUE.stats(),
+        "rate_limit": LIMITER.stats(),
+        "preview_cache": PREVIEWS.stats(),
+        "themes_dir": str(THEMES_DIR),
+        "layouts_dir": str(LAYOUTS_DIR),
+    }
+    return JSONResponse(status_code=200 if WARMUP.ready else 503, content=body)
+
+@app.get("/metrics")
+def metrics():
+    """
+    Render queue gauges (depth, in-flight, wait times) in Prometheus text format.
 
     Returns:
-        dict: A simple dictionary indicating the service is healthy.
+        PlainTextResponse: Prometheus exposition text.
     """
-    return {"ok": True}
\ No newline at end of file
+    return PlainTextResponse(render_queue_metrics(), media_type="text/plain; version=0.0.4")
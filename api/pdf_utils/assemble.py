@@ -0,0 +1,160 @@
+"""
+Single-pass assembly of several documents into one PDF.
+
+Concatenating separately rendered PDFs embeds the fonts, icons and avatar
+once per part. `assemble_pdf` instead records every part as a display list
+and replays all of them into one ReportLab canvas:
+
+- fonts are subset and embedded once for the whole file, and images with the
+  same pixels (icons, a shared avatar) become one image XObject;
+- purely decorative blocks (`FORM_BLOCKS`) that draw the same ops in several
+  parts are written once as a Form XObject and referenced from each page;
+- every part starts on a new page and gets a top-level outline entry.
+
+Long assembled files can be linearized, so a browser shows the first page
+while the rest is still loading, or written compactly for archives.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Sequence
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+
+from .cancel import CancelToken
+from .compression import canvas_compression
+from .config import UI_LANG
+from .data_utils import build_ready_from_profile
+from .display_list import DisplayList, State, replay, track_state
+from .fonts import ensure_fonts
+from .pdf_output import finish_pdf
+from .resume import PAGE_H, TOP_MARGIN, _resolve_layout_and_columns_from_inline, record_display_list
+from .theme_loader import load_and_apply
+
+# Blocks whose drawing does not depend on the profile; identical ranges become shared forms.
+FORM_BLOCKS = {"decor_curve", "left_panel_bg"}
+
+@dataclass
+class DocumentPart:
+    """
+    One part of an assembled PDF.
+
+    Attributes:
+        title (str): Outline entry of the part.
+        data (Dict[str, Any]): `build_resume_pdf` input (profile, theme_name,
+            ui_lang, rtl_mode, layout_inline).
+    """
+    title: str
+    data: Dict[str, Any]
+
+def page_part(title: str, heading: str, section: str = "", lines: Sequence[str] = (),
+              *, theme_name: Optional[str] = None, ui_lang: Optional[str] = None) -> DocumentPart:
+    """
+    Builds a simple text page (cover sheet, appendix) from existing blocks.
+
+    Args:
+        title (str): Outline entry.
+        heading (str): Large centered heading at the top of the page.
+        section (str): Section title above `lines`; lines are only drawn with a title.
+        lines (Sequence[str]): Paragraphs of the page.
+        theme_name (Optional[str]): Theme of the page.
+        ui_lang (Optional[str]): UI language code.
+
+    Returns:
+        DocumentPart: Part without a profile; blocks take their data from the layout.
+    """
+    layout = [
+        {"block_id": "header_name", "data": {"name": heading, "centered": True}},
+        {
+            "block_id": "text_section",
+            "frame": {"y": PAGE_H - TOP_MARGIN - 20 * mm},
+            "data": {"title": section or (title if lines else ""), "lines": list(lines)},
+        },
+    ]
+    return DocumentPart(title, {
+        "theme_name": theme_name,
+        "ui_lang": ui_lang,
+        "rtl_mode": False,
+        "profile": None,
+        "layout_inline": {"layout": layout},
+    })
+
+def _record_part(part: DocumentPart, cancel: Optional[CancelToken], compression: Optional[str]) -> DisplayList:
+    data = part.data
+    theme = load_and_apply(data.get("theme_name") or "default")
+    plan, _cols = _resolve_layout_and_columns_from_inline(data)
+    profile = data.get("profile")
+    return record_display_list(
+        plan,
+        build_ready_from_profile(profile, compression=compression) if profile else {},
+        ui_lang=data.get("ui_lang") or UI_LANG,
+        rtl_mode=bool(data.get("rtl_mode")),
+        theme=theme,
+        cancel=cancel,
+        dedup=False,
+    )
+
+def _emit(dl: DisplayList, c: canvas.Canvas, forms: Dict[str, str]) -> None:
+    pos = 0
+    state: State = {}
+    for block_id, start, end in dl.blocks:
+        if block_id not in FORM_BLOCKS or end <= start:
+            continue
+        replay(dl, c, start=pos, end=start)
+        track_state(dl, pos, start, state)
+        key = f"{block_id}:{dl.ops[start:end]!r}"
+        name = forms.get(key)
+        if name is None:
+            name = forms[key] = f"form-{block_id}-{len(forms)}"
+            c.beginForm(name)
+            replay(dl, c, start=start, end=end)
+            c.endForm()
+        c.doForm(name)
+        # A form's state changes end with the form; later blocks expect the state it left behind.
+        before = set(state.values())
+        track_state(dl, start, end, state)
+        for i in sorted(set(state.values()) - before):
+            replay(dl, c, start=i, end=i + 1)
+        pos = end
+    replay(dl, c, start=pos)
+
+def assemble_pdf(parts: Sequence[DocumentPart], *, cancel: Optional[CancelToken] = None,
+                 linearize: bool = False, compact: bool = False, compression: Optional[str] = None) -> bytes:
+    """
+    Renders several documents into one PDF with one outline entry per part.
+
+    Args:
+        parts (Sequence[DocumentPart]): Parts in page order.
+        cancel (Optional[CancelToken]): Checked between blocks and between parts.
+        linearize (bool): Write a linearized (fast web view) file.
+        compact (bool): Write PDF 1.5 object streams and an xref stream.
+        compression (Optional[str]): Compression profile name (see `compression.PROFILES`).
+
+    Returns:
+        bytes: The combined PDF.
+
+    Raises:
+        RenderCancelled: If `cancel` fires before the last part is drawn.
+    """
+    ensure_fonts()
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4, pageCompression=canvas_compression(compression))
+    forms: Dict[str, str] = {}
+    for i, part in enumerate(parts):
+        dl = _record_part(part, cancel, compression)
+        key = f"part-{i + 1}"
+        c.bookmarkPage(key)
+        c.addOutlineEntry(part.title, key, level=0)
+        _emit(dl, c, forms)
+        c.showPage()
+    if parts:
+        c.showOutline()
+    c.save()
+    print(f"[Info] Assembled {len(parts)} parts, {len(forms)} shared forms")
+    return finish_pdf(buf.getvalue(), linearize=linearize, compact=compact, compression=compression)
+
+__all__ = ["DocumentPart", "FORM_BLOCKS", "assemble_pdf", "page_part"]
@@ -10,7 +10,7 @@ class AvatarCircleBlock:
     BLOCK_ID = "avatar_circle"
 
     def render(self, c, frame: Frame, data: dict, ctx: RenderContext) -> float:
-        # data: { "photo_bytes": bytes, "max_d_mm"?: float (افتراضي 42) }
+        # data: { "photo_bytes": bytes, "image"?: ImageReader, "max_d_mm"?: float (افتراضي 42) }
         photo_bytes = data.get("photo_bytes")
         if not photo_bytes:
             return frame.y  # لا شيء
@@ -24,7 +24,7 @@ class AvatarCircleBlock:
         iy = cy - r
 
         try:
-            img = ImageReader(BytesIO(photo_bytes))
+            img = data.get("image") or ImageReader(BytesIO(photo_bytes))
             c.saveState()
             p = c.beginPath()
             p.circle(cx, cy, r)
@@ -6,7 +6,7 @@ from ..config import (
 )
 from ..labels import t
 from ..config import UI_LANG
-from ..icons import ICON_PATHS, draw_icon_line, draw_heading_with_icon
+from ..icons import ICON_PATHS, draw_icon_lines, draw_heading_with_icon
 from .base import Frame, RenderContext
 from .registry import register
 
@@ -25,10 +25,12 @@ class ContactInfoBlock:
             gap_below=LEFT_SEC_TITLE_BOTTOM_GAP / 2,
         )
         y -= LEFT_SEC_RULE_TO_LIST_GAP
+        rows = []
         for label, value in items.items():
             icon = ICON_PATHS.get((label or "").lower()) or ICON_PATHS.get(label)
-            y = draw_icon_line(c, frame.x, y, (value or ""), icon=icon,
-                               font="Helvetica", size=LEFT_TEXT_SIZE, line_gap=LEFT_LINE_GAP)
+            rows.append(((value or ""), icon, None))
+        y = draw_icon_lines(c, frame.x, y, rows,
+                            font="Helvetica", size=LEFT_TEXT_SIZE, line_gap=LEFT_LINE_GAP)
         return y
 
 register(ContactInfoBlock())
@@ -10,6 +10,7 @@ from ..labels import t
 from ..config import UI_LANG
 from ..icons import get_section_icon, draw_heading_with_icon
 from ..text import wrap_text
+from ..text_batch import TextBatch
 from .base import Frame, RenderContext
 from .registry import register
 
@@ -28,14 +29,22 @@ class KeySkillsBlock:
             gap_below=LEFT_SEC_TITLE_BOTTOM_GAP / 2,
         )
         y -= LEFT_SEC_RULE_TO_LIST_GAP
-        c.setFont("Helvetica", LEFT_SEC_TEXT_SIZE); c.setFillColor(colors.black)
+        c.setFillColor(colors.black)
         max_w = frame.w - (LEFT_SEC_TEXT_X_OFFSET + 2)
+        rows = []  # (y, line, is_first_line_of_item)
         for sk in skills:
             for i, ln in enumerate(wrap_text(sk, "Helvetica", LEFT_SEC_TEXT_SIZE, max_w)):
-                if i == 0:
-                    c.circle(frame.x + LEFT_SEC_BULLET_X_OFFSET, y + 3, LEFT_SEC_BULLET_RADIUS, stroke=1, fill=1)
-                c.drawString(frame.x + LEFT_SEC_TEXT_X_OFFSET, y, ln)
+                rows.append((y, ln, i == 0))
                 y -= LEFT_SEC_LINE_GAP
+
+        # Bullets are paths and cannot live inside a text object: draw them first.
+        for row_y, _, first in rows:
+            if first:
+                c.circle(frame.x + LEFT_SEC_BULLET_X_OFFSET, row_y + 3, LEFT_SEC_BULLET_RADIUS, stroke=1, fill=1)
+        with TextBatch(c) as tb:
+            tb.set_font("Helvetica", LEFT_SEC_TEXT_SIZE)
+            for row_y, ln, _ in rows:
+                tb.draw_string(frame.x + LEFT_SEC_TEXT_X_OFFSET, row_y, ln)
         return y
 
 register(KeySkillsBlock())
@@ -5,7 +5,7 @@ from reportlab.lib import colors
 from reportlab.lib.units import mm
 
 from ..config import UI_LANG
-from ..fonts import AR_FONT  # 👈 إضافة دعم الخط العربي
+from .. import fonts  # 👈 إضافة دعم الخط العربي
 from .base import Frame, RenderContext
 from .registry import register
 
@@ -33,7 +33,7 @@ class LinksInline:
 
         text = " · ".join(items)
         c.setFillColor(accent)
-        font_name = AR_FONT if rtl_mode else "Helvetica"
+        font_name = fonts.AR_FONT if rtl_mode else "Helvetica"
         c.setFont(font_name, font_size)
 
         # تحديد الموقع الصحيح للنص في حالة RTL
@@ -2,7 +2,7 @@ from __future__ import annotations
 from reportlab.pdfbase import pdfmetrics
 from reportlab.lib import colors
 from ..config import *
-from ..fonts import AR_FONT
+from .. import fonts
 from ..labels import t
 from ..icons import get_section_icon, draw_heading_with_icon
 from ..text import draw_par
@@ -39,7 +39,7 @@ class ProjectsBlock:
             y = draw_par(
                 c=c, x=frame.x, y=y,
                 lines=(desc or "").split("\n"),
-                font=(AR_FONT if rtl_mode else "Helvetica"), size=TEXT_SIZE,
+                font=(fonts.AR_FONT if rtl_mode else "Helvetica"), size=TEXT_SIZE,
                 max_w=frame.w, align=("right" if rtl_mode else "left"),
                 rtl_mode=rtl_mode, leading=PROJECT_DESC_LEADING,
             )
@@ -4,6 +4,7 @@ from reportlab.lib import colors
 from reportlab.lib.units import mm
 
 from ..config import UI_LANG
+from ..text_batch import TextBatch
 from .base import Frame, RenderContext
 from .registry import register
 
@@ -26,30 +27,31 @@ class SkillsGrid:
 
         cur_y = frame.y
 
-        # عنوان اختياري
-        if title:
-            c.setFillColor(colors.black)
-            c.setFont("Helvetica-Bold", 11)
-            c.drawString(frame.x, cur_y - 5 * mm, title)
-            cur_y -= 10 * mm
-
-        if not items:
-            return cur_y
-
-        col_w = frame.w / cols
-        c.setFillColor(colors.black)
-        c.setFont("Helvetica", 9)
-
-        rows = (len(items) + cols - 1) // cols
-        idx = 0
-        for _ in range(rows):
-            for cidx in range(cols):
-                if idx >= len(items):
-                    break
-                cx = frame.x + cidx * col_w
-                c.drawString(cx, cur_y - 4 * mm, f"• {items[idx]}")
-                idx += 1
-            cur_y -= row_h
+        with TextBatch(c) as tb:
+            # عنوان اختياري
+            if title:
+                tb.set_fill(colors.black)
+                tb.set_font("Helvetica-Bold", 11)
+                tb.draw_string(frame.x, cur_y - 5 * mm, title)
+                cur_y -= 10 * mm
+
+            if not items:
+                return cur_y
+
+            col_w = frame.w / cols
+            tb.set_fill(colors.black)
+            tb.set_font("Helvetica", 9)
+
+            rows = (len(items) + cols - 1) // cols
+            idx = 0
+            for _ in range(rows):
+                for cidx in range(cols):
+                    if idx >= len(items):
+                        break
+                    cx = frame.x + cidx * col_w
+                    tb.draw_string(cx, cur_y - 4 * mm, f"• {items[idx]}")
+                    idx += 1
+                cur_y -= row_h
 
         return cur_y - (4 * mm)
 
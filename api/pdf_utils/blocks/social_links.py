@@ -12,6 +12,7 @@ from ..labels import t
 from ..config import UI_LANG
 from ..icons import get_section_icon, draw_heading_with_icon, ICON_PATHS
 from ..text import wrap_text
+from ..text_batch import TextBatch
 from .. import social  # نستخدم أدوات التنظيف/البناء من social.py لو متاحة
 from .base import Frame, RenderContext
 from .registry import register
@@ -101,34 +102,35 @@ class SocialLinksBlock:
         )
         y -= LEFT_SEC_RULE_TO_LIST_GAP
 
-        c.setFont("Helvetica", LEFT_TEXT_SIZE)
-        c.setFillColor(colors.black)
+        with TextBatch(c) as tb:
+            tb.set_font("Helvetica", LEFT_TEXT_SIZE)
+            tb.set_fill(colors.black)
 
-        for (label, value, url) in triples:
-            # أيقونة إن وجدت
-            icon = ICON_PATHS.get(label.lower()) or ICON_PATHS.get(label)
-            text = f"{label}: {value}"
+            for (label, value, url) in triples:
+                # أيقونة إن وجدت
+                icon = ICON_PATHS.get(label.lower()) or ICON_PATHS.get(label)
+                text = f"{label}: {value}"
 
-            # ارسم النص
-            c.drawString(frame.x, y, text)
+                # ارسم النص
+                tb.draw_string(frame.x, y, text)
 
-            # لو في URL، اعمل linkURL على جزء القيمة
-            if url:
-                # حساب عرض "label: " عشان نربط من بعده
-                prefix = f"{label}: "
-                fn = "Helvetica"
-                fs = LEFT_TEXT_SIZE
-                px = pdfmetrics.stringWidth(prefix, fn, fs)
-                tw = pdfmetrics.stringWidth(value, fn, fs)
-                asc = pdfmetrics.getAscent(fn)/1000.0 * fs
-                dsc = abs(pdfmetrics.getDescent(fn))/1000.0 * fs
-                link_rect = (frame.x + px, y - dsc, frame.x + px + tw, y + asc * 0.2)
-                try:
-                    c.linkURL(url, link_rect, relative=0, thickness=0)
-                except Exception:
-                    pass
+                # لو في URL، اعمل linkURL على جزء القيمة
+                if url:
+                    # حساب عرض "label: " عشان نربط من بعده
+                    prefix = f"{label}: "
+                    fn = "Helvetica"
+                    fs = LEFT_TEXT_SIZE
+                    px = pdfmetrics.stringWidth(prefix, fn, fs)
+                    tw = pdfmetrics.stringWidth(value, fn, fs)
+                    asc = pdfmetrics.getAscent(fn)/1000.0 * fs
+                    dsc = abs(pdfmetrics.getDescent(fn))/1000.0 * fs
+                    link_rect = (frame.x + px, y - dsc, frame.x + px + tw, y + asc * 0.2)
+                    try:
+                        c.linkURL(url, link_rect, relative=0, thickness=0)
+                    except Exception:
+                        pass
 
-            y -= LEFT_LINE_GAP
+                y -= LEFT_LINE_GAP
 
         return y
 
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, List, Optional
+
+class RenderCancelled(Exception):
+    """
+    Raised inside a render when its CancelToken has been cancelled.
+
+    Attributes:
+        reason (str): Why the render was cancelled (e.g. "superseded").
+    """
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(f"render cancelled: {reason}")
+        self.reason = reason
+
+class CancelToken:
+    """
+    Cooperative cancellation flag shared between a request and its render.
+
+    The request side calls `cancel()`; the render checks the token at safe
+    points (between blocks) with `raise_if_cancelled()` and stops early.
+    Callbacks let schedulers react immediately, e.g. to drop a queued render
+    before it ever starts.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reason: Optional[str] = None
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._reason is not None
+
+    @property
+    def reason(self) -> Optional[str]:
+        return self._reason
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """
+        Marks the token as cancelled and runs the registered callbacks once.
+
+        Args:
+            reason (str): Short reason reported by RenderCancelled.
+        """
+        with self._lock:
+            if self._reason is not None:
+                return
+            self._reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception as e:
+                print(f"[WARN] Cancel callback failed: {e}")
+
+    def add_callback(self, cb: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registers `cb` to run on cancellation (immediately if already cancelled).
+
+        Returns:
+            Callable[[], None]: Function that unregisters the callback.
+        """
+        with self._lock:
+            if self._reason is None:
+                self._callbacks.append(cb)
+                return lambda: self._discard(cb)
+        cb()
+        return lambda: None
+
+    def _discard(self, cb: Callable[[], None]) -> None:
+        with self._lock:
+            if cb in self._callbacks:
+                self._callbacks.remove(cb)
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises RenderCancelled if the token has been cancelled.
+        """
+        if self._reason is not None:
+            raise RenderCancelled(self._reason)
+
+__all__ = ["CancelToken", "RenderCancelled"]
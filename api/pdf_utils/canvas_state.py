@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from reportlab.lib import colors
+from reportlab.pdfgen import canvas
+
+def _opaque_color(value: Any) -> Optional[colors.Color]:
+    """
+    Convert a color value for comparison, or return None if it must not be deduplicated.
+
+    Colors carrying an alpha below 1 also change the transparency state, so they
+    are always passed through.
+
+    Args:
+        value (Any): ReportLab color, hex string, or RGB tuple.
+
+    Returns:
+        Optional[colors.Color]: Comparable color, or None.
+    """
+    try:
+        col = colors.toColor(value)
+    except Exception:
+        return None
+    if getattr(col, "alpha", 1) != 1:
+        return None
+    return col
+
+def _alpha(c: Any, key: str) -> float:
+    """
+    Return the canvas' current fill ("ca") or stroke ("CA") alpha, tracked across q/Q.
+    """
+    state = getattr(c, "_extgstate", None)
+    return state.getValue(key) if state is not None else 1
+
+class DedupCanvas:
+    """
+    Canvas proxy that drops redundant graphics and text state operators.
+
+    ReportLab's canvas writes `setFont`, `setFillColor`, `setStrokeColor` and
+    `setLineWidth` to the content stream on every call, even when the value
+    is already active. This proxy compares each call against the state the
+    wrapped canvas already tracks (which `saveState`/`restoreState` keep in
+    sync with the PDF q/Q stack) and skips the operator when nothing would
+    change. Everything else is forwarded unchanged, so blocks need no edits.
+
+    Setting an opaque color also resets the fill or stroke alpha to 1, so a
+    color call is only dropped while that alpha is already 1.
+
+    Attributes:
+        removed (Dict[str, int]): Number of dropped calls per method name.
+    """
+
+    __slots__ = ("_canvas", "removed")
+
+    def __init__(self, c: canvas.Canvas):
+        object.__setattr__(self, "_canvas", c)
+        object.__setattr__(self, "removed", {})
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._canvas, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in DedupCanvas.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._canvas, name, value)
+
+    @property
+    def wrapped(self) -> canvas.Canvas:
+        """Return the underlying ReportLab canvas."""
+        return self._canvas
+
+    @property
+    def removed_total(self) -> int:
+        """Return the total number of operators that were dropped."""
+        return sum(self.removed.values())
+
+    def _drop(self, op: str) -> None:
+        self.removed[op] = self.removed.get(op, 0) + 1
+
+    def setFont(self, psfontname: str, size: float, leading: Optional[float] = None) -> None:
+        c = self._canvas
+        lead = size * 1.2 if leading is None else leading
+        if psfontname == c._fontname and size == c._fontsize and lead == c._leading:
+            self._drop("setFont")
+            return
+        c.setFont(psfontname, size, leading)
+
+    def setFillColor(self, aColor: Any, alpha: Optional[float] = None) -> None:
+        c = self._canvas
+        if alpha is None:
+            want = _opaque_color(aColor)
+            if want is not None and want == _opaque_color(c._fillColorObj) and _alpha(c, "ca") == 1:
+                self._drop("setFillColor")
+                return
+        c.setFillColor(aColor, alpha)
+
+    def setStrokeColor(self, aColor: Any, alpha: Optional[float] = None) -> None:
+        c = self._canvas
+        if alpha is None:
+            want = _opaque_color(aColor)
+            if want is not None and want == _opaque_color(c._strokeColorObj) and _alpha(c, "CA") == 1:
+                self._drop("setStrokeColor")
+                return
+        c.setStrokeColor(aColor, alpha)
+
+    def setLineWidth(self, width: float) -> None:
+        c = self._canvas
+        if width == c._lineWidth:
+            self._drop("setLineWidth")
+            return
+        c.setLineWidth(width)
+
+__all__ = ["DedupCanvas"]
@@ -0,0 +1,183 @@
+"""
+Compression profiles: file size against render time, chosen per request.
+
+Without a profile, files are written as ReportLab does by default: Flate
+content streams (zlib level 6) wrapped in ASCII85. A named profile replaces
+that:
+
+    none      content streams stored uncompressed; fastest, largest
+    fast      ReportLab's own Flate compression; avatar downsampled to 150 dpi
+              and stored as JPEG (q80), which is also cheaper to embed
+    balanced  zlib level 6 without ASCII85; avatar at 300 dpi as JPEG (q90)
+    max       zlib level 9 for every stream, including fonts and images
+              that ReportLab already compressed; avatar at 200 dpi as JPEG (q75)
+
+`none` and `fast` are meant for interactive renders and only set the
+canvas's page compression (`canvas_compression`); the file is used as
+ReportLab writes it. `balanced` and `max` create the canvas with page
+compression off and `compress_pdf` rewrites the finished file, compressing
+every stream once at the profile's level and dropping the ASCII85 layer
+(it only makes streams 25% larger); that pass costs time but saves bytes.
+The avatar is re-encoded when the block data is built (`reencode_photo`);
+photos with transparency are downsampled but stay lossless.
+"""
+
+from __future__ import annotations
+
+import base64
+import re
+import zlib
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, Optional
+
+from PIL import Image
+
+from .pdf_objects import parse_pdf, write_pdf
+
+@dataclass(frozen=True)
+class CompressionProfile:
+    """
+    Settings of one named compression profile.
+
+    Attributes:
+        name (str): Profile name.
+        level (int): zlib level for content streams (0 stores them uncompressed)
+            and for the object streams of the compact writer.
+        rewrite (bool): Recompress the finished file (`compress_pdf`); without
+            it the canvas compresses (level > 0) or not, at ReportLab's level.
+        recompress (bool): Also recompress streams ReportLab already compressed (fonts, images).
+        photo_dpi (Optional[int]): Avatar resolution at its drawn size; None keeps the photo.
+        jpeg_quality (int): JPEG quality of a re-encoded opaque avatar.
+    """
+    name: str
+    level: int
+    rewrite: bool = True
+    recompress: bool = False
+    photo_dpi: Optional[int] = None
+    jpeg_quality: int = 85
+
+PROFILES: Dict[str, CompressionProfile] = {
+    "none": CompressionProfile("none", 0, rewrite=False),
+    "fast": CompressionProfile("fast", 1, rewrite=False, photo_dpi=150, jpeg_quality=80),
+    "balanced": CompressionProfile("balanced", 6, photo_dpi=300, jpeg_quality=90),
+    "max": CompressionProfile("max", 9, recompress=True, photo_dpi=200, jpeg_quality=75),
+}
+
+_STREAM = re.compile(rb">>\s*stream\r?\n")
+_FILTER = re.compile(rb"/Filter \[ ([^\]]*)\]|/Filter /(\w+)")
+_LENGTH = re.compile(rb"/Length \d+")
+
+def get_profile(name: Optional[str]) -> Optional[CompressionProfile]:
+    """
+    Returns the named profile, or None for ReportLab's default output.
+
+    Raises:
+        ValueError: Unknown profile name.
+    """
+    if not name:
+        return None
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"compression must be one of {sorted(PROFILES)}")
+
+def canvas_compression(name: Optional[str]) -> Optional[int]:
+    """
+    Returns the `pageCompression` argument for a ReportLab canvas (None = ReportLab default).
+    """
+    profile = get_profile(name)
+    if profile is None:
+        return None
+    if profile.rewrite:
+        return 0
+    return 1 if profile.level > 0 else 0
+
+def _restream(body: bytes, profile: CompressionProfile) -> bytes:
+    m = _STREAM.search(body)
+    if m is None:
+        return body
+    head = body[:m.start()]
+    f = _FILTER.search(head)
+    filters = [x.lstrip(b"/") for x in (f.group(1) or b"/" + f.group(2)).split()] if f else []
+    if filters not in ([], [b"FlateDecode"], [b"ASCII85Decode", b"FlateDecode"]):
+        return body  # DCT (JPEG) images and anything unusual stay as they are
+    length = _LENGTH.search(head)
+    if length is None:
+        return body
+    data = body[m.end():m.end() + int(length.group(0)[8:])]
+
+    if not filters:
+        if profile.level == 0:
+            return body
+        data = zlib.compress(data, profile.level)
+    else:
+        if filters[0] == b"ASCII85Decode":
+            data = base64.a85decode(data.strip(), adobe=True)
+        elif not profile.recompress:
+            return body
+        if profile.recompress:
+            data = zlib.compress(zlib.decompress(data), profile.level)
+    if f:
+        head = head[:f.start()] + head[f.end():]
+    head = _LENGTH.sub(b"/Length %d" % len(data), head, count=1)
+    return head.rstrip() + b" /Filter [ /FlateDecode ]\n>>\nstream\n" + data + b"\nendstream"
+
+def compress_pdf(pdf: bytes, name: Optional[str]) -> bytes:
+    """
+    Compresses the streams of a ReportLab PDF according to a profile.
+
+    Args:
+        pdf (bytes): File written on a canvas created with `canvas_compression(name)`.
+        name (Optional[str]): Profile name; None and profiles without `rewrite`
+            return the file unchanged.
+
+    Returns:
+        bytes: The file with its streams re-encoded (same objects, classic xref).
+    """
+    profile = get_profile(name)
+    if profile is None or not profile.rewrite:
+        return pdf
+    doc = parse_pdf(pdf)
+    doc.objects = {n: _restream(body, profile) for n, body in doc.objects.items()}
+    return write_pdf(doc)
+
+def reencode_photo(photo_bytes: bytes, max_d_mm: float, name: Optional[str]) -> bytes:
+    """
+    Downsamples an avatar to the profile's resolution at its drawn size.
+
+    Opaque photos are stored as JPEG, which ReportLab embeds without
+    recompressing; photos with transparency are resized and kept as PNG.
+    Photos that are already small enough, and profiles without `photo_dpi`,
+    keep the original bytes.
+
+    Args:
+        photo_bytes (bytes): Original image file.
+        max_d_mm (float): Largest drawn size of the avatar in mm.
+        name (Optional[str]): Compression profile name.
+
+    Returns:
+        bytes: Image file to embed.
+    """
+    profile = get_profile(name)
+    if profile is None or profile.photo_dpi is None:
+        return photo_bytes
+    with Image.open(BytesIO(photo_bytes)) as im:
+        im.load()
+        side = max(1, round(max_d_mm / 25.4 * profile.photo_dpi))
+        opaque = im.mode in ("RGB", "L", "CMYK") or (im.mode == "P" and "transparency" not in im.info)
+        if max(im.size) <= side and im.format == "JPEG":
+            return photo_bytes
+        if max(im.size) > side:
+            im = im.copy()
+            im.thumbnail((side, side), Image.LANCZOS)
+        out = BytesIO()
+        if opaque:
+            im.convert("RGB").save(out, format="JPEG", quality=profile.jpeg_quality, optimize=True)
+        else:
+            im.save(out, format="PNG")
+        return out.getvalue()
+
+__all__ = [
+    "CompressionProfile", "PROFILES", "canvas_compression", "compress_pdf", "get_profile", "reencode_photo",
+]
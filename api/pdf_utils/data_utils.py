@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import threading
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from reportlab.lib.utils import ImageReader
+
+from .compression import reencode_photo
 
 
 def _norm_projects(projects_list: List[Any]) -> List[Tuple[str, str, Optional[str]]]:
@@ -41,9 +47,84 @@ def _read_bytes_if_exists(pathlike: str | Path | None) -> bytes | None:
     return None
 
 
-def build_ready_from_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+def _image_reader(photo_bytes: bytes | None) -> Any:
+    """
+    Wrap photo bytes in a ReportLab ImageReader, or return None if they cannot be read.
+
+    The reader caches the decoded pixels, so renders that share the ready data
+    (e.g. language variants of one profile) decode the photo only once.
+    """
+    if not photo_bytes:
+        return None
+    try:
+        return ImageReader(BytesIO(photo_bytes))
+    except Exception:
+        return None
+
+
+class LazyReady(Mapping[str, Any]):
+    """
+    Read-only mapping of block_id -> block data whose values are built on first access.
+
+    Each key is backed by a producer function. A producer runs only when the
+    renderer asks for that block, and its result is memoized for the lifetime
+    of the mapping (one request), so blocks absent from the layout cost nothing.
+
+    Producers run under a lock, so variants of one request rendering on
+    several workers share the mapping and still build each value once.
+    """
+
+    def __init__(self, producers: Dict[str, Callable[[], Any]]):
+        self._producers = producers
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        producer = self._producers[key]
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = producer()
+            return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._producers)
+
+    def __len__(self) -> int:
+        return len(self._producers)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._producers
+
+    @property
+    def built(self) -> List[str]:
+        """Return the keys whose producers have already run."""
+        return list(self._values)
+
+
+def _social_from_contact(contact: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Extract known social links from the contact section.
+    """
+    social: Dict[str, str] = {}
+    for k, v in (contact or {}).items():
+        kl = str(k).lower()
+        if kl in {"github", "linkedin", "website", "site", "url", "twitter", "x"}:
+            social[k] = str(v)
+    return social
+
+
+def build_ready_from_profile(profile: Dict[str, Any], *, compression: Optional[str] = None) -> LazyReady:
     """
-    Build a data-ready dictionary from a standardized profile structure.
+    Build a data-ready mapping from a standardized profile structure.
+
+    Values are produced lazily per block_id (see `LazyReady`): the avatar file
+    is only read, and projects only normalized, when the layout renders them.
+    With a `compression` profile the avatar is downsampled and re-encoded for
+    its drawn size (see `compression.reencode_photo`).
 
     Recognized profile keys include:
     - header: {name, title}
@@ -58,49 +139,43 @@ def build_ready_from_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
     Additional optional sections supported:
     - experience, objective, activities, volunteer, achievements, publications
     """
-    header = profile.get("header") or {}
-    name = (header.get("name") or "").strip()
-    title = (header.get("title") or "").strip()
-
-    avatar = profile.get("avatar") or {}
-    photo_bytes = _read_bytes_if_exists(avatar.get("path"))
-
-    contact = dict(profile.get("contact") or {})
-    skills = list(profile.get("skills") or [])
-    languages = list(profile.get("languages") or [])
-    projects_list = list(profile.get("projects") or [])
-    education_items = list(profile.get("education") or [])
-    summary_lines = list(profile.get("summary") or [])
-
-    norm_projects = _norm_projects(projects_list)
+    def header_name() -> Dict[str, Any]:
+        header = profile.get("header") or {}
+        return {
+            "name": (header.get("name") or "").strip(),
+            "title": (header.get("title") or "").strip(),
+        }
 
-    # Extract known social links from contact section
-    social: Dict[str, str] = {}
-    for k, v in (contact or {}).items():
-        kl = str(k).lower()
-        if kl in {"github", "linkedin", "website", "site", "url", "twitter", "x"}:
-            social[k] = str(v)
+    def avatar_circle() -> Dict[str, Any]:
+        avatar = profile.get("avatar") or {}
+        photo_bytes = _read_bytes_if_exists(avatar.get("path"))
+        if photo_bytes and compression:
+            try:
+                photo_bytes = reencode_photo(photo_bytes, 42, compression)
+            except Exception as e:
+                print(f"[WARN] Avatar not re-encoded ({compression}): {e}")
+        return {"photo_bytes": photo_bytes, "image": _image_reader(photo_bytes), "max_d_mm": 42}
 
-    ready: Dict[str, Any] = {
-        "header_name": {"name": name, "title": title},
-        "avatar_circle": {"photo_bytes": photo_bytes, "max_d_mm": 42},
-        "contact_info": {"items": contact},
-        "key_skills": {"skills": skills},
-        "languages": {"languages": languages},
-        "social_links": social,
-        "projects": {"items": norm_projects, "title": None},
-        "education": {"items": education_items, "title": None},
-        "text_section:summary": {"title": "", "lines": summary_lines},
-        "experience": {"items": profile.get("experience") or []},
-        "objective": {"lines": profile.get("objective") or []},
-        "activities": {"lines": profile.get("activities") or []},
-        "rule": {},
-        "header_bar": {},
-        "links_inline": {},
-        "decor_curve": {},
-        "skills_grid": {},
-        "volunteer": {"items": profile.get("volunteer") or []},
-        "achievements": {"items": profile.get("achievements") or []},
-        "publications": {"items": profile.get("publications") or []},
+    producers: Dict[str, Callable[[], Any]] = {
+        "header_name": header_name,
+        "avatar_circle": avatar_circle,
+        "contact_info": lambda: {"items": dict(profile.get("contact") or {})},
+        "key_skills": lambda: {"skills": list(profile.get("skills") or [])},
+        "languages": lambda: {"languages": list(profile.get("languages") or [])},
+        "social_links": lambda: _social_from_contact(dict(profile.get("contact") or {})),
+        "projects": lambda: {"items": _norm_projects(list(profile.get("projects") or [])), "title": None},
+        "education": lambda: {"items": list(profile.get("education") or []), "title": None},
+        "text_section:summary": lambda: {"title": "", "lines": list(profile.get("summary") or [])},
+        "experience": lambda: {"items": profile.get("experience") or []},
+        "objective": lambda: {"lines": profile.get("objective") or []},
+        "activities": lambda: {"lines": profile.get("activities") or []},
+        "rule": dict,
+        "header_bar": dict,
+        "links_inline": dict,
+        "decor_curve": dict,
+        "skills_grid": dict,
+        "volunteer": lambda: {"items": profile.get("volunteer") or []},
+        "achievements": lambda: {"items": profile.get("achievements") or []},
+        "publications": lambda: {"items": profile.get("publications") or []},
     }
-    return ready
\ No newline at end of file
+    return LazyReady(producers)
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+from reportlab.pdfgen.canvas import _digester
+
+# Canvas/text-object methods that only query state; they are forwarded but not recorded.
+_QUERY_PREFIXES = ("get", "stringWidth", "beginPath")
+
+# Recorded but not drawn on the scratch canvas: images change no state a block can
+# query, and encoding them there would be thrown away with the scratch document.
+_RECORD_ONLY = ("drawImage", "drawInlineImage")
+
+# Canvas calls that only change graphics state (see `track_state`).
+STATE_OPS = {
+    "setFillColor", "setStrokeColor", "setLineWidth", "setFont", "setDash",
+    "setLineCap", "setLineJoin", "setFillAlpha", "setStrokeAlpha", "__setattr__",
+}
+
+# State key -> index of the op that last set it.
+State = Dict[Tuple[str, Any], int]
+
+@dataclass(frozen=True)
+class Slot:
+    """
+    Symbolic color in a display list, bound to a concrete color on replay.
+
+    Attributes:
+        key (str): Config color name (one of `theme_loader.COLOR_KEYS`).
+    """
+    key: str
+
+@dataclass(frozen=True)
+class _TextRef:
+    handle: int
+
+# (target, method, args, kwargs): target is None for the canvas, or the handle
+# of a text object created by a recorded "beginText" op.
+Op = Tuple[Optional[int], str, Tuple[Any, ...], Dict[str, Any]]
+
+@dataclass
+class DisplayList:
+    """
+    Canvas calls of one rendered page, in order, with colors optionally kept as slots.
+
+    Attributes:
+        ops (List[Op]): Recorded calls.
+        blocks (List[Tuple[str, int, int]]): (block_id, first op, end op) per drawn block.
+        page_size (Tuple[float, float]): Page size the list was recorded for.
+    """
+    ops: List[Op] = field(default_factory=list)
+    blocks: List[Tuple[str, int, int]] = field(default_factory=list)
+    page_size: Tuple[float, float] = (0.0, 0.0)
+
+    @property
+    def slots(self) -> List[str]:
+        """Return the color slots the list refers to."""
+        found = set()
+        for _target, _name, args, kwargs in self.ops:
+            for a in (*args, *kwargs.values()):
+                if isinstance(a, Slot):
+                    found.add(a.key)
+        return sorted(found)
+
+def _color_hex(value: Any) -> Optional[str]:
+    return value.hexval().lower() if isinstance(value, colors.Color) else None
+
+class _RecordingText:
+    """
+    Text-object proxy that records every drawing call under its handle.
+    """
+
+    __slots__ = ("_rec", "_text", "_handle")
+
+    def __init__(self, rec: "RecordingCanvas", text: Any, handle: int):
+        self._rec = rec
+        self._text = text
+        self._handle = handle
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._text, name)
+        if not callable(attr) or name.startswith(_QUERY_PREFIXES):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            self._rec._record(self._handle, name, args, kwargs)
+            return result
+        return call
+
+class RecordingCanvas:
+    """
+    Canvas proxy that draws on a scratch canvas and records every call as a display list.
+
+    Blocks see a normal canvas: state queries (`_fontname`, `stringWidth`, ...)
+    are answered by the scratch canvas, which is never saved. Each drawing
+    call, text-object call and canvas attribute update is appended to
+    `display_list.ops`, so the page can later be replayed onto another canvas
+    without running the blocks again. A call is recorded only once the
+    scratch canvas has accepted it: a call that raises (and fails its block)
+    is not replayed, so the list holds exactly what a direct render draws.
+
+    Colors equal to one of `slot_colors` are recorded as `Slot` values, which
+    lets a replay bind a different palette.
+
+    Args:
+        pagesize (Tuple[float, float]): Page size of the scratch canvas.
+        slot_colors (Optional[Dict[str, str]]): Color hexval ("0xrrggbb") -> slot key.
+    """
+
+    __slots__ = ("_canvas", "_slot_colors", "_texts", "display_list")
+
+    def __init__(self, pagesize: Tuple[float, float], slot_colors: Optional[Dict[str, str]] = None):
+        object.__setattr__(self, "_canvas", canvas.Canvas(BytesIO(), pagesize=pagesize))
+        object.__setattr__(self, "_slot_colors", dict(slot_colors or {}))
+        object.__setattr__(self, "_texts", 0)
+        object.__setattr__(self, "display_list", DisplayList(page_size=tuple(pagesize)))
+
+    def _symbolic(self, value: Any) -> Any:
+        key = self._slot_colors.get(_color_hex(value)) if self._slot_colors else None
+        return Slot(key) if key else value
+
+    def _record(self, target: Optional[int], name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        args = tuple(_TextRef(a._handle) if isinstance(a, _RecordingText) else self._symbolic(a) for a in args)
+        kwargs = {k: self._symbolic(v) for k, v in kwargs.items()}
+        self.display_list.ops.append((target, name, args, kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._canvas, name)
+        if not callable(attr) or name.startswith(_QUERY_PREFIXES):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = None
+            if name not in _RECORD_ONLY:
+                result = attr(*(a._text if isinstance(a, _RecordingText) else a for a in args), **kwargs)
+            self._record(None, name, args, kwargs)
+            return result
+        return call
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in RecordingCanvas.__slots__:
+            object.__setattr__(self, name, value)
+            return
+        setattr(self._canvas, name, value)
+        self._record(None, "__setattr__", (name, value), {})
+
+    def beginText(self, x: float = 0, y: float = 0, direction: Any = None) -> _RecordingText:
+        text = self._canvas.beginText(x, y, direction)
+        handle = self._texts
+        object.__setattr__(self, "_texts", handle + 1)
+        self.display_list.ops.append((handle, "beginText", (x, y, direction), {}))
+        return _RecordingText(self, text, handle)
+
+    def mark_block(self, block_id: str, start: int) -> None:
+        """
+        Records that ops from `start` up to now were drawn by `block_id`.
+        """
+        self.display_list.blocks.append((block_id, start, len(self.display_list.ops)))
+
+    @property
+    def op_count(self) -> int:
+        """Return the number of recorded ops."""
+        return len(self.display_list.ops)
+
+def _fresh(obj: Any) -> Any:
+    # A PDF object remembers the document-internal name it was registered under;
+    # a shallow copy without it can be registered in another document.
+    dup = copy.copy(obj)
+    vars(dup).pop("__InternalName__", None)
+    return dup
+
+class ImageCache:
+    """
+    Encoded image XObjects shared by several replays of the same display list.
+
+    ReportLab compresses and encodes an image every time a new document draws
+    it. Replays that draw the same ImageReader (icons, the avatar) register a
+    copy of the already encoded XObject instead, so only the first replay pays
+    for the encoding.
+    """
+
+    def __init__(self) -> None:
+        self._names: Dict[Tuple[int, str], str] = {}
+        self._objs: Dict[str, Tuple[Any, Optional[Any]]] = {}
+
+    def _name(self, image: ImageReader, mask: Any) -> str:
+        key = (id(image), str(mask))
+        name = self._names.get(key)
+        if name is None:
+            # Same signature as Canvas.drawImage, so the canvas finds the registered object.
+            smask = image._dataA
+            mdata = smask.getRGBData() if mask == "auto" and smask else str(mask).encode("utf8")
+            name = self._names[key] = _digester(image.getRGBData() + mdata)
+        return name
+
+    def draw(self, c: Any, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """
+        Calls `c.drawImage(*args, **kwargs)`, reusing the encoded image when cached.
+        """
+        image = args[0] if args else None
+        doc = getattr(c, "_doc", None)
+        if not isinstance(image, ImageReader) or doc is None or len(args) > 5:
+            return c.drawImage(*args, **kwargs)
+
+        name = self._name(image, kwargs.get("mask"))
+        reg = doc.getXObjectName(name)
+        hit = self._objs.get(name)
+        if hit is not None and reg not in doc.idToObject:
+            img, smask = hit
+            img = _fresh(img)
+            doc.Reference(img, reg)
+            doc.addForm(name, img)
+            if smask is not None:
+                mreg = doc.getXObjectName(smask.name)
+                if mreg not in doc.idToObject:
+                    doc.Reference(_fresh(smask), mreg)
+
+        result = c.drawImage(*args, **kwargs)
+
+        if hit is None:
+            img = doc.idToObject.get(reg)
+            ref = getattr(img, "smask", None)
+            smask = doc.idToObject.get(ref.name) if ref is not None else None
+            if img is not None:
+                self._objs[name] = (img, smask)
+        return result
+
+def track_state(dl: DisplayList, start: int, end: int, state: State) -> None:
+    """
+    Applies the state ops of `dl.ops[start:end]` to `state`.
+
+    Only page-level changes are kept: ops inside a saveState/restoreState pair
+    are undone by the restore. Replaying the ops in `state` (in index order)
+    recreates the canvas state at `end` on a fresh canvas or form.
+
+    Args:
+        dl (DisplayList): Recorded display list.
+        start (int): First op to apply.
+        end (int): Op index to stop at (exclusive); ranges must not split a save/restore pair.
+        state (State): Updated in place.
+    """
+    stack: List[State] = []
+    for i in range(start, end):
+        target, name, args, _kwargs = dl.ops[i]
+        if target is not None:
+            continue
+        if name == "saveState":
+            stack.append(dict(state))
+        elif name == "restoreState":
+            if stack:
+                state.clear()
+                state.update(stack.pop())
+        elif name in STATE_OPS:
+            state[(name, args[0] if name == "__setattr__" else None)] = i
+
+def replay(dl: DisplayList, c: Any, bind: Optional[Callable[[Slot], Any]] = None,
+           start: int = 0, end: Optional[int] = None, images: Optional[ImageCache] = None,
+           exclude: Collection[str] = ()) -> None:
+    """
+    Re-issues recorded calls on a canvas.
+
+    Args:
+        dl (DisplayList): Recorded display list.
+        c (Any): Target canvas (ReportLab canvas or compatible backend).
+        bind (Optional[Callable[[Slot], Any]]): Maps a color slot to a concrete color;
+            required if the list contains slots.
+        start (int): First op to replay.
+        end (Optional[int]): Op index to stop at (exclusive); defaults to the end.
+        images (Optional[ImageCache]): Reuse encoded images across replays onto ReportLab canvases.
+        exclude (Collection[str]): Canvas methods to leave out (e.g. link annotations
+            that cannot be part of a form).
+    """
+    texts: Dict[int, Any] = {}
+
+    def value(a: Any) -> Any:
+        if isinstance(a, Slot):
+            return bind(a)
+        if isinstance(a, _TextRef):
+            return texts[a.handle]
+        return a
+
+    for target, name, args, kwargs in dl.ops[start:end]:
+        if name == "beginText":
+            texts[target] = c.beginText(*args)
+            continue
+        args = tuple(value(a) for a in args)
+        if kwargs:
+            kwargs = {k: value(v) for k, v in kwargs.items()}
+        if target is None and name in exclude:
+            continue
+        obj = c if target is None else texts[target]
+        if name == "__setattr__":
+            setattr(obj, *args)
+        elif name == "drawImage" and images is not None and target is None:
+            images.draw(c, args, kwargs)
+        else:
+            getattr(obj, name)(*args, **kwargs)
+
+__all__ = [
+    "DisplayList", "ImageCache", "Op", "RecordingCanvas", "STATE_OPS", "Slot", "State",
+    "replay", "track_state",
+]
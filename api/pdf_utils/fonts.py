@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from importlib.resources import files
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
@@ -18,6 +19,10 @@ FONT_PATH_AMIRI = ASSETS / "Amiri-Regular.ttf"  # Could be AmiriQuran depending
 AR_FONT = "NotoNaskhArabic"
 AR_FONT_FALLBACK = "Amiri"
 
+_FONTS_READY = False
+# Held while registering, so a render never sees a half-registered font set.
+_FONTS_LOCK = threading.Lock()
+
 # ============================================================
 # Helper functions
 # ============================================================
@@ -34,6 +39,18 @@ def rtl(text: str) -> str:
     """
     return text or ""
 
+_PRELOADED: dict[str, TTFont] = {}
+
+def preload_fonts(parsed: dict[str, TTFont]) -> None:
+    """
+    Provide already-parsed fonts (e.g. from a warm-start snapshot) so that
+    `ensure_fonts()` registers them without re-parsing the TTF files.
+
+    Args:
+        parsed (dict[str, TTFont]): Font objects keyed by registration name.
+    """
+    _PRELOADED.update(parsed)
+
 def _register_ttf_font(name: str, path_str: str) -> None:
     """
     Register a TrueType font with ReportLab.
@@ -42,7 +59,10 @@ def _register_ttf_font(name: str, path_str: str) -> None:
         name (str): The name to register the font under.
         path_str (str): File path to the .ttf font.
     """
-    pdfmetrics.registerFont(TTFont(name, path_str))
+    font = _PRELOADED.get(name)
+    if font is None or font.face.filename != path_str:
+        font = TTFont(name, path_str)
+    pdfmetrics.registerFont(font)
 
 # ============================================================
 # Font registration with safe fallback
@@ -53,9 +73,24 @@ def ensure_fonts() -> None:
     then Amiri as a fallback. If both fail, attempts to register a built-in Unicode font
     to avoid server crashes.
 
+    Safe to call repeatedly and from several threads: callers that arrive while
+    another thread (e.g. the startup warmup) is registering wait until it has
+    finished, so AR_FONT is always registered when this returns.
+
     Modifies:
         AR_FONT (str): Global variable may be updated to fallback font name.
     """
+    global _FONTS_READY
+
+    if _FONTS_READY:
+        return
+    with _FONTS_LOCK:
+        if _FONTS_READY:
+            return
+        _register_arabic_font()
+        _FONTS_READY = True
+
+def _register_arabic_font() -> None:
     global AR_FONT
 
     try:
@@ -80,7 +115,4 @@ def ensure_fonts() -> None:
     except Exception as e:
         print(f"Could not register any font: {e}")
 
-# Register fonts upon import
-ensure_fonts()
-
-__all__ = ["AR_FONT", "rtl", "ensure_fonts"]
+__all__ = ["AR_FONT", "rtl", "ensure_fonts", "preload_fonts"]
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.lib.utils import ImageReader
 from reportlab.pdfbase.pdfmetrics import stringWidth
 
+from .text_batch import TextBatch
+
 # =========================
 # Icon paths and setup
 # =========================
@@ -67,6 +69,42 @@ ICON_PATHS: dict[str, Path] = {}
 ICON_PATHS.update({k: v for k, v in DEFAULT_INFO_ICONS.items() if v and v.is_file()})
 ICON_PATHS.update({k: v for k, v in SECTION_ICON_PATHS.items() if v and v.is_file()})
 
+_ICON_CACHE: dict[str, ImageReader] = {}
+
+def load_icon(path: Path) -> ImageReader:
+    """
+    Return a decoded icon image, reading and decoding each file only once.
+
+    Args:
+        path (Path): Path to the icon file.
+
+    Returns:
+        ImageReader: Cached ReportLab image reader for the icon.
+    """
+    key = str(path)
+    img = _ICON_CACHE.get(key)
+    if img is None:
+        img = ImageReader(key)
+        img.getRGBData()  # decode now so drawImage reuses the pixel buffer
+        _ICON_CACHE[key] = img
+    return img
+
+def warm_icons() -> int:
+    """
+    Decode every known icon into the cache.
+
+    Returns:
+        int: Number of icons loaded.
+    """
+    count = 0
+    for p in set(ICON_PATHS.values()):
+        try:
+            load_icon(p)
+            count += 1
+        except Exception as e:
+            print(f"[WARN] Failed to load icon {p}: {e}")
+    return count
+
 def _text_width(text: str, font_name: str, font_size: int) -> float:
     """
     Calculate the width of a text string for a given font and size.
@@ -156,7 +194,7 @@ def draw_heading_with_icon(
     draw_x = x
     if icon and icon.is_file():
         try:
-            img = ImageReader(str(icon))
+            img = load_icon(icon)
             c.drawImage(img, draw_x, y - icon_h, width=icon_w, height=icon_h, mask="auto")
             draw_x += icon_w + pad_x
         except Exception:
@@ -221,7 +259,7 @@ def draw_icon_line(
     draw_x = x
     if icon and icon.is_file():
         try:
-            img = ImageReader(str(icon))
+            img = load_icon(icon)
             c.drawImage(img, draw_x, y - icon_h + 1, width=icon_w, height=icon_h, mask="auto")
             draw_x += icon_w + pad_x
         except Exception:
@@ -238,6 +276,69 @@ def draw_icon_line(
 
     return y - line_gap
 
+def draw_icon_lines(
+    c: canvas.Canvas,
+    x: float,
+    y: float,
+    rows: Iterable[Tuple[str, Optional[Path], Optional[str]]],
+    *,
+    font: str = "Helvetica",
+    size: int = 10,
+    color=colors.black,
+    icon_w: float = 10,
+    icon_h: float = 10,
+    pad_x: float = 6,
+    line_gap: float = 14,
+) -> float:
+    """
+    Draw several icon lines, emitting all of their text in one text object.
+
+    Produces the same placement as calling `draw_icon_line` per row, but the
+    icons are drawn first and the text lines are then batched (see `TextBatch`),
+    since images cannot be placed inside a text object.
+
+    Args:
+        c (canvas.Canvas): ReportLab canvas.
+        x (float): Starting x-coordinate.
+        y (float): Starting y-coordinate.
+        rows (Iterable[Tuple[str, Optional[Path], Optional[str]]]): (text, icon, link) per line.
+
+    Keyword Args:
+        font (str): Font name.
+        size (int): Font size.
+        color: Font color.
+        icon_w (float): Icon width.
+        icon_h (float): Icon height.
+        pad_x (float): Padding between icon and text.
+        line_gap (float): Vertical gap between lines.
+
+    Returns:
+        float: New y-coordinate after rendering.
+    """
+    placed: List[Tuple[float, float, str, Optional[str]]] = []
+    for text, icon, link in rows:
+        draw_x = x
+        if icon and icon.is_file():
+            try:
+                img = load_icon(icon)
+                c.drawImage(img, draw_x, y - icon_h + 1, width=icon_w, height=icon_h, mask="auto")
+                draw_x += icon_w + pad_x
+            except Exception:
+                pass
+        placed.append((draw_x, y, text or "", link))
+        y -= line_gap
+
+    with TextBatch(c) as tb:
+        tb.set_font(font, size)
+        tb.set_fill(color)
+        for draw_x, row_y, txt, link in placed:
+            tb.draw_string(draw_x, row_y - (size * 0.8), txt)
+            if link:
+                tw = _text_width(txt, font, size)
+                c.linkURL(link, (draw_x, row_y - size, draw_x + tw, row_y + 2), relative=0)
+
+    return y
+
 def info_line(
     c: canvas.Canvas,
     x: float,
@@ -291,8 +392,11 @@ __all__ = [
     "get_section_icon",
     "draw_heading_with_icon",
     "draw_icon_line",
+    "draw_icon_lines",
     "info_line",
     "SECTION_ICON_PATHS",
     "DEFAULT_INFO_ICONS",
     "ICON_PATHS",
+    "load_icon",
+    "warm_icons",
 ]
\ No newline at end of file
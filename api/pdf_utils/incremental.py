@@ -0,0 +1,257 @@
+"""
+Incremental updates of rendered resumes.
+
+A document rendered through `render_incremental` draws every block as its
+own Form XObject, so each block's drawing lives in one content stream, and
+the page only places the forms (plus the link annotations, which cannot live
+in a form). The file, its objects and a fingerprint of every block's
+display-list ops are kept in `DOCUMENTS`.
+
+When an edited request names a stored document as its base, the new render
+is compared with it object by object, and only the objects whose bytes
+changed are written as an incremental update section (ISO 32000-1, 7.5.6):
+normally the form streams of the edited blocks, the info dictionary, and a
+font whose subset grew. Appending the section to the base file gives the new
+document, so a client only downloads the delta and the server stores the
+updated file without rewriting it. If the update would be nearly as large
+as the file (e.g. a new font or image shifted the object numbers), the full
+file is returned instead and becomes the new base.
+
+Environment Variables:
+    INCREMENTAL_CACHE_SIZE: Documents kept for updates (default 64, least recently used are dropped).
+    INCREMENTAL_MAX_RATIO: Updates larger than this fraction of the full file
+        are sent as a full file instead (default 0.8).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+from reportlab.pdfgen.canvas import _digester
+
+from .cancel import CancelToken
+from .compression import canvas_compression, compress_pdf
+from .config import UI_LANG
+from .data_utils import build_ready_from_profile
+from .display_list import DisplayList, State, replay, track_state
+from .fonts import ensure_fonts
+from .pdf_objects import last_xref, parse_pdf, write_update
+from .resume import _resolve_layout_and_columns_from_inline, record_display_list
+from .theme_loader import load_and_apply
+
+CACHE_SIZE = int(os.getenv("INCREMENTAL_CACHE_SIZE", "64"))
+MAX_RATIO = float(os.getenv("INCREMENTAL_MAX_RATIO", "0.8"))
+
+# Annotations belong to the page, not to a form; these calls are replayed on the page.
+_PAGE_OPS = ("linkURL", "linkRect", "linkAbsolute")
+
+@dataclass
+class StoredDocument:
+    """
+    A rendered document that later requests can update incrementally.
+
+    Attributes:
+        doc_id (str): Identifier handed to the client.
+        pdf (bytes): Current file (original render plus appended updates).
+        objects (Dict[int, bytes]): Current body of every object number in the file.
+        startxref (int): Offset of the last cross-reference section.
+        file_id (str): First /ID entry of the original render, kept by every update.
+        blocks (List[Tuple[str, str]]): (block_id, fingerprint) per drawn block.
+    """
+    doc_id: str
+    pdf: bytes
+    objects: Dict[int, bytes]
+    startxref: int
+    file_id: str
+    blocks: List[Tuple[str, str]]
+
+    @property
+    def size(self) -> int:
+        """Return the trailer /Size of the current file."""
+        return max(self.objects, default=0) + 1
+
+@dataclass
+class DocumentUpdate:
+    """
+    Result of `render_incremental`.
+
+    Attributes:
+        doc_id (str): Identifier of the resulting document.
+        base_id (Optional[str]): Document the update applies to; None for a full file.
+        body (bytes): Update section to append to the base, or the full PDF.
+        incremental (bool): True if `body` is an update section (empty when nothing changed).
+        changed_blocks (List[str]): Block ids whose drawing differs from the base.
+        changed_objects (int): Objects written in the update section.
+        size (int): Length of the complete resulting file.
+    """
+    doc_id: str
+    base_id: Optional[str]
+    body: bytes
+    incremental: bool
+    changed_blocks: List[str]
+    changed_objects: int
+    size: int
+
+class DocumentStore:
+    """
+    Thread-safe LRU of documents that can be updated incrementally.
+
+    Args:
+        capacity (int): Maximum number of documents kept.
+    """
+
+    def __init__(self, capacity: int = CACHE_SIZE):
+        self.capacity = max(1, capacity)
+        self._docs: "OrderedDict[str, StoredDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, doc_id: str) -> Optional[StoredDocument]:
+        """
+        Returns a stored document and marks it as recently used, or None if unknown or evicted.
+        """
+        with self._lock:
+            doc = self._docs.get(doc_id)
+            if doc is not None:
+                self._docs.move_to_end(doc_id)
+            return doc
+
+    def put(self, doc: StoredDocument) -> None:
+        """
+        Stores a document, evicting the least recently used ones over capacity.
+        """
+        with self._lock:
+            self._docs[doc.doc_id] = doc
+            self._docs.move_to_end(doc.doc_id)
+            while len(self._docs) > self.capacity:
+                self._docs.popitem(last=False)
+
+DOCUMENTS = DocumentStore()
+
+def _stable(value: Any) -> Any:
+    # Display lists hold live objects; fingerprint them by content, not by address.
+    if isinstance(value, ImageReader):
+        return ("image", _digester(value.getRGBData()))
+    if hasattr(value, "getCode"):
+        return ("path", value.getCode())
+    return value
+
+def _fingerprint(dl: DisplayList, start: int, end: int) -> str:
+    h = hashlib.sha1()
+    for target, name, args, kwargs in dl.ops[start:end]:
+        op = (target, name, tuple(_stable(a) for a in args), sorted((k, _stable(v)) for k, v in kwargs.items()))
+        h.update(repr(op).encode("utf-8"))
+    return h.hexdigest()
+
+def _emit_block_forms(dl: DisplayList, compression: Optional[str] = None) -> bytes:
+    """
+    Writes the display list with each block as a separate Form XObject (`blk<n>`).
+
+    Every form first re-applies the state in effect where its block starts,
+    so it does not depend on what earlier blocks left on the page.
+    """
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=dl.page_size, pageCompression=canvas_compression(compression))
+    state: State = {}
+    for n, (_block_id, start, end) in enumerate(dl.blocks):
+        name = f"blk{n}"
+        c.beginForm(name)
+        for i in sorted(state.values()):
+            replay(dl, c, start=i, end=i + 1)
+        replay(dl, c, start=start, end=end, exclude=_PAGE_OPS)
+        c.endForm()
+        c.doForm(name)
+        for i in range(start, end):
+            target, op, _args, _kwargs = dl.ops[i]
+            if target is None and op in _PAGE_OPS:
+                replay(dl, c, start=i, end=i + 1)
+        track_state(dl, start, end, state)
+    c.showPage()
+    c.save()
+    return compress_pdf(buf.getvalue(), compression)
+
+def _doc_id(pdf: bytes) -> str:
+    return hashlib.sha1(pdf).hexdigest()[:16]
+
+def _store_full(pdf: bytes, blocks: List[Tuple[str, str]]) -> DocumentUpdate:
+    parsed = parse_pdf(pdf)
+    doc = StoredDocument(_doc_id(pdf), pdf, parsed.objects, parsed.startxref, parsed.file_id[0], blocks)
+    DOCUMENTS.put(doc)
+    return DocumentUpdate(doc.doc_id, None, pdf, False, [b for b, _fp in blocks], len(parsed.objects), len(pdf))
+
+def render_incremental(data: Dict[str, Any], base_id: Optional[str] = None, *,
+                       cancel: Optional[CancelToken] = None) -> DocumentUpdate:
+    """
+    Renders a resume and, if `base_id` is a stored document, returns only the update section.
+
+    Args:
+        data (Dict[str, Any]): Same input as `build_resume_pdf`.
+        base_id (Optional[str]): Document id returned by an earlier call.
+        cancel (Optional[CancelToken]): Checked between blocks.
+
+    Returns:
+        DocumentUpdate: An update section to append to the base, or a full PDF
+            when there is no usable base (unknown or evicted id, or an update
+            that would not be smaller than the file).
+
+    Raises:
+        RenderCancelled: If `cancel` fires before the last block is drawn.
+    """
+    ensure_fonts()
+    theme = load_and_apply(data.get("theme_name") or "default")
+    plan, _cols = _resolve_layout_and_columns_from_inline(data)
+    profile = data.get("profile")
+    dl = record_display_list(
+        plan,
+        build_ready_from_profile(profile, compression=data.get("compression")) if profile else {},
+        ui_lang=data.get("ui_lang") or UI_LANG,
+        rtl_mode=bool(data.get("rtl_mode")),
+        theme=theme,
+        cancel=cancel,
+        dedup=False,
+    )
+    blocks = [(block_id, _fingerprint(dl, start, end)) for block_id, start, end in dl.blocks]
+
+    base = DOCUMENTS.get(base_id) if base_id else None
+    if base_id and base is None:
+        print(f"[Info] Incremental base {base_id} unknown or evicted; sending the full file")
+    if base is not None and base.blocks == blocks:
+        return DocumentUpdate(base.doc_id, base.doc_id, b"", True, [], 0, len(base.pdf))
+
+    pdf = _emit_block_forms(dl, data.get("compression"))
+    if base is None:
+        return _store_full(pdf, blocks)
+
+    new = parse_pdf(pdf)
+    changed = {n: body for n, body in new.objects.items() if base.objects.get(n) != body}
+    section = write_update(
+        len(base.pdf), base.startxref, changed,
+        size=max(base.size, new.size), root=new.root, info=new.info,
+        file_id=(base.file_id, new.file_id[1]),
+    )
+    if len(section) > MAX_RATIO * len(pdf):
+        print(f"[Info] Update of {base.doc_id} is {len(section)} B for a {len(pdf)} B file; sending the full file")
+        return _store_full(pdf, blocks)
+
+    updated = base.pdf + section
+    changed_blocks = [
+        block_id for i, (block_id, fp) in enumerate(blocks)
+        if i >= len(base.blocks) or base.blocks[i] != (block_id, fp)
+    ]
+    doc = StoredDocument(
+        _doc_id(updated), updated, {**base.objects, **new.objects},
+        last_xref(section), base.file_id, blocks,
+    )
+    DOCUMENTS.put(doc)
+    print(f"[Info] Incremental update {base.doc_id} -> {doc.doc_id}: {len(changed)} objects, "
+          f"{len(section)} B (full file {len(pdf)} B), blocks {changed_blocks}")
+    return DocumentUpdate(doc.doc_id, base.doc_id, section, True, changed_blocks, len(changed), len(updated))
+
+__all__ = ["DOCUMENTS", "DocumentStore", "DocumentUpdate", "StoredDocument", "render_incremental"]
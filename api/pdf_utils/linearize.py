@@ -0,0 +1,305 @@
+"""
+Linearized ("fast web view") output for ReportLab PDFs.
+
+A viewer that streams a linearized file can show page one as soon as the
+first part of the file has arrived, instead of waiting for the trailer at
+the end. `linearize_pdf` rewrites a finished ReportLab file in the layout of
+ISO 32000-1, Annex F:
+
+    header, linearization dictionary, first-page xref and trailer,
+    catalog, primary hint stream, first page (and the outlines if the
+    document opens with them), remaining pages, shared objects, other
+    objects, main xref and trailer.
+
+Objects are renumbered so that the first-page cross-reference section covers
+everything up to the end of page one, and the hint stream carries the page
+offset and shared object hint tables. Content stream offsets inside a page
+are given as zero and content lengths as the page length, as most writers do.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .pdf_objects import format_object, parse_pdf
+
+_HEADER_MARK = b"%\xe2\xe3\xcf\xd3\n"
+_STRING_OR_REF = re.compile(rb"\((?:\\.|[^\\)])*\)|(\d+) 0 R", re.S)
+_STREAM = re.compile(rb">>\s*stream\r?\n")
+
+def _dict_part(body: bytes) -> int:
+    # References only occur in the dictionary in front of stream data.
+    m = _STREAM.search(body)
+    return m.start() + 2 if m else len(body)
+
+def _refs(body: bytes) -> List[int]:
+    end = _dict_part(body)
+    return [int(m.group(1)) for m in _STRING_OR_REF.finditer(body, 0, end) if m.group(1)]
+
+def _renumber(body: bytes, numbers: Dict[int, int]) -> bytes:
+    end = _dict_part(body)
+
+    def sub(m: "re.Match[bytes]") -> bytes:
+        if m.group(1) is None:
+            return m.group(0)
+        return b"%d 0 R" % numbers[int(m.group(1))]
+    return _STRING_OR_REF.sub(sub, body[:end]) + body[end:]
+
+def _ref_of(body: bytes, key: bytes) -> Optional[int]:
+    m = re.search(rb"/" + key + rb" (\d+) 0 R", body[:_dict_part(body)])
+    return int(m.group(1)) if m else None
+
+def _page_tree(objects: Dict[int, bytes], root: int) -> Tuple[List[int], Set[int]]:
+    """
+    Returns the page objects in order and the page tree nodes.
+    """
+    pages: List[int] = []
+    nodes: Set[int] = set()
+
+    def walk(n: int) -> None:
+        body = objects[n]
+        if re.search(rb"/Type /Pages\b", body):
+            nodes.add(n)
+            kids = re.search(rb"/Kids \[([^\]]*)\]", body)
+            for kid in re.findall(rb"(\d+) 0 R", kids.group(1) if kids else b""):
+                walk(int(kid))
+        else:
+            pages.append(n)
+
+    top = _ref_of(objects[root], b"Pages")
+    if top is None:
+        raise ValueError("catalog has no /Pages")
+    walk(top)
+    return pages, nodes
+
+def _reach(objects: Dict[int, bytes], start: int, stop: Set[int]) -> List[int]:
+    """
+    Objects reachable from `start` in depth-first order, not entering `stop`.
+    """
+    seen: Set[int] = {start}
+    order: List[int] = []
+    todo = [start]
+    while todo:
+        n = todo.pop()
+        order.append(n)
+        for ref in reversed(_refs(objects[n])):
+            if ref not in seen and ref not in stop and ref in objects:
+                seen.add(ref)
+                todo.append(ref)
+    return order
+
+class _Bits:
+    """
+    Big-endian bit writer for hint tables.
+    """
+
+    def __init__(self) -> None:
+        self.out = bytearray()
+        self._acc = 0
+        self._n = 0
+
+    def put(self, value: int, bits: int) -> None:
+        for i in range(bits - 1, -1, -1):
+            self._acc = (self._acc << 1) | ((value >> i) & 1)
+            self._n += 1
+            if self._n == 8:
+                self.out.append(self._acc)
+                self._acc = self._n = 0
+
+    def align(self) -> None:
+        if self._n:
+            self.put(0, 8 - self._n)
+
+def _nbits(value: int) -> int:
+    return max(0, value).bit_length()
+
+def _hint_stream(pages: Sequence[Tuple[int, int, int, Sequence[int]]],
+                 groups: Sequence[int], n_first: int, first_shared: Tuple[int, int]) -> bytes:
+    """
+    Builds the page offset and shared object hint tables (Annex F.4).
+
+    Args:
+        pages: (page object offset, page length, object count, shared group ids) per page.
+        groups: Byte length of every shared object group (first-page objects first).
+        n_first: Number of groups that belong to the first page.
+        first_shared: (object number, offset) of the first object in the shared objects section.
+
+    Returns:
+        bytes: Hint stream object body.
+    """
+    counts = [p[2] for p in pages]
+    lengths = [p[1] for p in pages]
+    shared = [p[3] for p in pages]
+    min_count, min_len = min(counts), min(lengths)
+    b_count = _nbits(max(counts) - min_count)
+    b_len = _nbits(max(lengths) - min_len)
+    b_nshared = _nbits(max(len(s) for s in shared))
+    b_id = _nbits(max((i for s in shared for i in s), default=0))
+
+    w = _Bits()
+    for value, bits in (
+        (min_count, 32), (pages[0][0], 32), (b_count, 16), (min_len, 32), (b_len, 16),
+        (0, 32), (0, 16), (min_len, 32), (b_len, 16), (b_nshared, 16), (b_id, 16), (0, 16), (1, 16),
+    ):
+        w.put(value, bits)
+    for values, bits in (
+        ([c - min_count for c in counts], b_count),
+        ([n - min_len for n in lengths], b_len),
+        ([len(s) for s in shared], b_nshared),
+        ([i for s in shared for i in s], b_id),
+        ([n - min_len for n in lengths], b_len),
+    ):
+        for v in values:
+            w.put(v, bits)
+        w.align()
+    page_table = len(w.out)
+
+    min_group = min(groups, default=0)
+    b_group = _nbits(max(groups, default=0) - min_group)
+    for value, bits in (
+        (first_shared[0], 32), (first_shared[1], 32), (n_first, 32), (len(groups), 32),
+        (0, 16), (min_group, 32), (b_group, 16),
+    ):
+        w.put(value, bits)
+    for g in groups:
+        w.put(g - min_group, b_group)
+    w.align()
+    for _g in groups:
+        w.put(0, 1)  # no MD5 signatures
+    w.align()
+
+    data = zlib.compress(bytes(w.out))
+    return b"<< /Filter /FlateDecode /Length %d /S %d >>\nstream\n%s\nendstream" % (len(data), page_table, data)
+
+def linearize_pdf(pdf: bytes) -> bytes:
+    """
+    Rewrites a ReportLab PDF as a linearized file.
+
+    Args:
+        pdf (bytes): PDF with a single classic xref table (ReportLab output).
+
+    Returns:
+        bytes: The linearized PDF with the same objects (renumbered).
+
+    Raises:
+        ValueError: The input cannot be parsed (see `pdf_objects.parse_pdf`).
+    """
+    src = parse_pdf(pdf)
+    objs = src.objects
+    page_list, nodes = _page_tree(objs, src.root)
+    stop = set(page_list) | nodes | {src.root}
+
+    first = _reach(objs, page_list[0], stop - {page_list[0]})
+    catalog = objs[src.root]
+    outlines = _ref_of(catalog, b"Outlines")
+    if outlines is not None and re.search(rb"/PageMode /UseOutlines\b", catalog):
+        in_first = set(first)
+        first += [n for n in _reach(objs, outlines, stop) if n not in in_first]
+    in_first = set(first)
+
+    reached = {p: _reach(objs, p, stop - {p}) for p in page_list[1:]}
+    users: Dict[int, int] = {}
+    for p, found in reached.items():
+        for n in found:
+            if n not in in_first:
+                users[n] = users.get(n, 0) + 1
+    private = {p: [n for n in found if n not in in_first and users[n] == 1] for p, found in reached.items()}
+    shared: List[int] = []
+    for p in page_list[1:]:
+        shared += [n for n in reached[p] if n not in in_first and users[n] > 1 and n not in shared]
+    placed = in_first | set(shared) | {src.root} | {n for ns in private.values() for n in ns}
+    others = [n for n in sorted(objs) if n not in placed]
+
+    # Main xref: 1..n_main-1 in file order after page one; first-page xref: the rest.
+    rest = [n for p in page_list[1:] for n in private[p]] + shared + others
+    numbers = {n: i for i, n in enumerate(rest, start=1)}
+    n_main = len(rest) + 1
+    lin_num, cat_num, hint_num = n_main, n_main + 1, n_main + 2
+    numbers[src.root] = cat_num
+    for i, n in enumerate(first):
+        numbers[n] = hint_num + 1 + i
+    size = hint_num + 1 + len(first)
+
+    first_blobs = [format_object(cat_num, _renumber(catalog, numbers))]
+    first_blobs += [format_object(numbers[n], _renumber(objs[n], numbers)) for n in first]
+    rest_blobs = [format_object(numbers[n], _renumber(objs[n], numbers)) for n in rest]
+    file_id = b"/ID [<%s> <%s>]" % (src.file_id[0].encode("ascii"), src.file_id[1].encode("ascii"))
+    info = b" /Info %d 0 R" % numbers[src.info] if src.info in numbers else b""
+    header = b"%%PDF-%s\n%s" % (src.version.encode("ascii"), _HEADER_MARK)
+    first_ids = {n: i for i, n in enumerate(first)}
+    shared_ids = {n: len(first) + i for i, n in enumerate(shared)}
+
+    hint = b""
+    params = (0, 0, 0, 0, 0, 0)
+    for _ in range(8):
+        L, hint_at, hint_len, E, T, main_prev = params
+        lin = format_object(lin_num, (
+            b"<< /Linearized 1 /L %10d /H [ %10d %10d ] /O %d /E %10d /N %d /T %10d >>"
+            % (L, hint_at, hint_len, numbers[page_list[0]], E, len(page_list), T)
+        ))
+        hint_blob = format_object(hint_num, hint)
+        fp_xref_len = len(b"xref\n%d %d\n" % (lin_num, size - lin_num)) + 20 * (size - lin_num)
+        fp_trailer = (
+            b"trailer\n<< /Size %d /Root %d 0 R%s %s /Prev %10d >>\nstartxref\n0\n%%%%EOF\n"
+            % (size, cat_num, info, file_id, main_prev)
+        )
+
+        offsets: Dict[int, int] = {}
+        pos = len(header)
+        offsets[lin_num] = pos
+        pos += len(lin)
+        fp_xref_at = pos
+        pos += fp_xref_len + len(fp_trailer)
+        offsets[cat_num] = pos
+        pos += len(first_blobs[0])
+        new_hint_at = pos
+        offsets[hint_num] = pos
+        pos += len(hint_blob)
+        for n, blob in zip(first, first_blobs[1:]):
+            offsets[numbers[n]] = pos
+            pos += len(blob)
+        new_E = pos
+        ends: Dict[int, int] = {}
+        for n, blob in zip(rest, rest_blobs):
+            offsets[numbers[n]] = pos
+            pos += len(blob)
+            ends[n] = pos
+        main_at = pos
+        main_head = b"xref\n0 %d" % n_main
+        main = main_head + b"\n0000000000 65535 f \n" + b"".join(
+            b"%010d 00000 n \n" % offsets[i] for i in range(1, n_main)
+        )
+        main += b"trailer\n<< /Size %d >>\nstartxref\n%d\n%%%%EOF\n" % (n_main, fp_xref_at)
+        new_L = pos + len(main)
+
+        page_hints = [(offsets[numbers[page_list[0]]], new_E - offsets[numbers[page_list[0]]], len(first), ())]
+        for p in page_list[1:]:
+            own = private[p]
+            start = offsets[numbers[p]]
+            refs = [first_ids.get(n, shared_ids.get(n)) for n in reached[p] if n in first_ids or n in shared_ids]
+            page_hints.append((start, ends[own[-1]] - start, len(own), refs))
+        groups = [len(b) for b in first_blobs[1:]] + [len(rest_blobs[rest.index(n)]) for n in shared]
+        first_shared = (numbers[shared[0]], offsets[numbers[shared[0]]]) if shared else (0, 0)
+        new_hint = _hint_stream(page_hints, groups, len(first), first_shared)
+        # The compressed hint stream can shrink by a byte when offsets move, which moves
+        # them back; padding after `endstream` keeps its length from going down.
+        new_hint += b" " * (len(hint) - len(new_hint))
+
+        new_params = (new_L, new_hint_at, len(hint_blob), new_E, main_at + len(main_head), main_at)
+        if new_params == params and new_hint == hint:
+            break
+        params, hint = new_params, new_hint
+    else:
+        raise ValueError("linearized layout did not converge")
+
+    fp_xref = b"xref\n%d %d\n" % (lin_num, size - lin_num) + b"".join(
+        b"%010d 00000 n \n" % offsets[i] for i in range(lin_num, size)
+    )
+    out = b"".join([header, lin, fp_xref, fp_trailer, first_blobs[0], hint_blob, *first_blobs[1:], *rest_blobs, main])
+    if len(out) != params[0]:
+        raise ValueError("linearized file length does not match its layout")
+    return out
+
+__all__ = ["linearize_pdf"]
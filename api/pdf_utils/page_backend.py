@@ -0,0 +1,425 @@
+"""
+Base class for page backends that draw display lists without ReportLab.
+
+`display_list.replay` re-issues recorded canvas calls on any object with the
+canvas API; `record_page` lays a request out into the display list that the
+preview backends replay. `PageBackend` implements the part of that API the blocks use and
+keeps the graphics state the way a PDF viewer does (saveState/restoreState
+stack; font and color changes made inside a text object stay in effect after
+`drawText`). Every drawing call is reduced to a few primitives that a backend
+implements:
+
+    _paint(segments, fill, stroke)     fill and/or stroke a path
+    _text(x, y, text)                  one run of text on a baseline
+    _image(image, x, y, w, h, mask)    an image scaled into a box
+    _clip_to(segments)                 the current clip intersected with a path
+    _link(url, rect)                   a link annotation (optional)
+
+Text arguments are passed to `_text` as `str` (blocks may hand over URL or
+number objects that ReportLab would reject). `replay_page` replays a page
+block by block, so a block that fails on a backend is skipped like a block
+that fails while rendering the PDF, instead of failing the whole page.
+
+Coordinates are PDF points with the origin at the bottom left of the page.
+Shapes (`rect`, `roundRect`, `circle`, ...) are built with ReportLab's own
+path object, so they have exactly the geometry they have in the PDF. Calls a
+backend does not support are skipped with one warning per call name.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.boxstuff import aspectRatioFix
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen.pathobject import PDFPathObject
+
+from .cancel import CancelToken
+from .config import UI_LANG
+from .data_utils import build_ready_from_profile
+from .display_list import DisplayList, replay
+from .fonts import ensure_fonts
+from .resume import _resolve_layout_and_columns_from_inline, record_display_list
+from .theme_loader import load_and_apply
+
+# ("M", (x, y)), ("L", (x, y)), ("C", (x1, y1, x2, y2, x3, y3)) or ("Z", ())
+Segment = Tuple[str, Tuple[float, ...]]
+
+# Graphics state saved by saveState (names match the ReportLab canvas attributes).
+_STATE = (
+    "_fillColorObj", "_strokeColorObj", "_fillAlpha", "_strokeAlpha", "_lineWidth",
+    "_fontname", "_fontsize", "_leading", "_clip",
+)
+
+_WARNED: Set[str] = set()
+
+def path_segments(path: Any) -> List[Segment]:
+    """
+    Parses the operators of a ReportLab path object into segments.
+
+    Args:
+        path (Any): PDFPathObject (or anything with `getCode()` returning PDF path operators).
+
+    Returns:
+        List[Segment]: Move, line, cubic curve and close segments in page coordinates.
+    """
+    out: List[Segment] = []
+    nums: List[float] = []
+    cur = start = (0.0, 0.0)
+    for tok in path.getCode().split():
+        try:
+            nums.append(float(tok))
+            continue
+        except ValueError:
+            pass
+        if tok == "m" and len(nums) >= 2:
+            cur = start = (nums[-2], nums[-1])
+            out.append(("M", cur))
+        elif tok == "l" and len(nums) >= 2:
+            cur = (nums[-2], nums[-1])
+            out.append(("L", cur))
+        elif tok == "c" and len(nums) >= 6:
+            out.append(("C", tuple(nums[-6:])))
+            cur = (nums[-2], nums[-1])
+        elif tok == "v" and len(nums) >= 4:
+            out.append(("C", (*cur, *nums[-4:])))
+            cur = (nums[-2], nums[-1])
+        elif tok == "y" and len(nums) >= 4:
+            out.append(("C", (*nums[-4:], nums[-2], nums[-1])))
+            cur = (nums[-2], nums[-1])
+        elif tok == "h":
+            out.append(("Z", ()))
+            cur = start
+        elif tok == "re" and len(nums) >= 4:
+            x, y, w, h = nums[-4:]
+            out += [("M", (x, y)), ("L", (x + w, y)), ("L", (x + w, y + h)), ("L", (x, y + h)), ("Z", ())]
+            cur = start = (x, y)
+        nums = []
+    return out
+
+def to_color(value: Any) -> colors.Color:
+    """
+    Returns a ReportLab color for any value the canvas accepts (black if it cannot be read).
+    """
+    if isinstance(value, colors.Color):
+        return value
+    if isinstance(value, (tuple, list)) and len(value) in (3, 4):
+        return colors.Color(*value[:3]) if len(value) == 3 else colors.CMYKColor(*value)
+    return colors.toColor(value, colors.black)
+
+def record_page(data: Dict[str, Any], ready: Optional[Any] = None,
+                cancel: Optional[CancelToken] = None) -> DisplayList:
+    """
+    Lays out the first page of a resume without drawing it.
+
+    Args:
+        data (Dict[str, Any]): Same input as `build_resume_pdf`; the PDF output
+            options (linearize, compact, compression) do not apply.
+        ready (Optional[Any]): Shared block data for the profile.
+        cancel (Optional[CancelToken]): Checked between blocks.
+
+    Returns:
+        DisplayList: The page's canvas calls, as the PDF would draw them.
+
+    Raises:
+        RenderCancelled: If `cancel` fires before the last block is recorded.
+    """
+    ensure_fonts()
+    theme = load_and_apply(data.get("theme_name") or "default")
+    plan, _cols = _resolve_layout_and_columns_from_inline(data)
+    return record_display_list(
+        plan,
+        ready if ready is not None else build_ready_from_profile(data.get("profile") or {}),
+        ui_lang=data.get("ui_lang") or UI_LANG,
+        rtl_mode=bool(data.get("rtl_mode")),
+        theme=theme,
+        cancel=cancel,
+    )
+
+def replay_page(dl: DisplayList, c: "PageBackend") -> None:
+    """
+    Replays a recorded page onto a backend, skipping blocks whose replay raises.
+
+    The graphics state stack is unwound to its depth before a failed block, so
+    the following blocks start from the state they were recorded with.
+    """
+    pos = 0
+    for block_id, start, end in dl.blocks:
+        replay(dl, c, start=pos, end=start)
+        depth = len(c._stack)
+        try:
+            replay(dl, c, start=start, end=end)
+        except Exception as e:
+            print(f"[WARN] {c.BACKEND}: block '{block_id}' skipped: {e}")
+            while len(c._stack) > depth:
+                c.restoreState()
+        pos = end
+    replay(dl, c, start=pos)
+
+def _as_text(value: Any) -> str:
+    # Blocks may pass URL objects or numbers where ReportLab expects a string.
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+class BackendText:
+    """
+    Text object of a `PageBackend`; its calls are collected and run by `drawText`.
+    """
+
+    def __init__(self, x: float, y: float):
+        self.origin = (x, y)
+        self.calls: List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args: Any, **kwargs: Any) -> None:
+            self.calls.append((name, args, kwargs))
+        return call
+
+class PageBackend:
+    """
+    Canvas-compatible target for `display_list.replay`; subclasses draw the primitives.
+
+    Args:
+        pagesize (Tuple[float, float]): Page width and height in points.
+    """
+
+    BACKEND = "page backend"
+
+    def __init__(self, pagesize: Tuple[float, float]):
+        self.page_size = (float(pagesize[0]), float(pagesize[1]))
+        self._fillColorObj: Any = colors.black
+        self._strokeColorObj: Any = colors.black
+        self._fillAlpha = 1.0
+        self._strokeAlpha = 1.0
+        self._lineWidth = 1.0
+        self._fontname = "Helvetica"
+        self._fontsize = 12.0
+        self._leading = 14.4
+        self._clip: Any = None
+        self._stack: List[Dict[str, Any]] = []
+
+    # -- primitives -------------------------------------------------------
+
+    def _paint(self, segments: Sequence[Segment], fill: bool, stroke: bool) -> None:
+        raise NotImplementedError
+
+    def _text(self, x: float, y: float, text: str) -> None:
+        raise NotImplementedError
+
+    def _image(self, image: ImageReader, x: float, y: float, w: float, h: float, mask: Any) -> None:
+        raise NotImplementedError
+
+    def _clip_to(self, segments: Sequence[Segment]) -> Any:
+        raise NotImplementedError
+
+    def _link(self, url: str, rect: Tuple[float, float, float, float]) -> None:
+        return None
+
+    # -- state ------------------------------------------------------------
+
+    def _unsupported(self, name: str) -> None:
+        if name not in _WARNED:
+            _WARNED.add(name)
+            print(f"[WARN] {self.BACKEND}: canvas call '{name}' is not supported; skipped")
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *_args, **_kwargs: self._unsupported(name)
+
+    def saveState(self) -> None:
+        self._stack.append({k: getattr(self, k) for k in _STATE})
+
+    def restoreState(self) -> None:
+        if self._stack:
+            for k, v in self._stack.pop().items():
+                setattr(self, k, v)
+
+    def setFillColor(self, aColor: Any, alpha: Optional[float] = None) -> None:
+        self._fillColorObj = color = to_color(aColor)
+        if alpha is not None:
+            self._fillAlpha = float(alpha)
+        elif getattr(color, "alpha", None) is not None:
+            self._fillAlpha = float(color.alpha)
+
+    def setStrokeColor(self, aColor: Any, alpha: Optional[float] = None) -> None:
+        self._strokeColorObj = color = to_color(aColor)
+        if alpha is not None:
+            self._strokeAlpha = float(alpha)
+        elif getattr(color, "alpha", None) is not None:
+            self._strokeAlpha = float(color.alpha)
+
+    def setFillColorRGB(self, r: float, g: float, b: float, alpha: Optional[float] = None) -> None:
+        self.setFillColor(colors.Color(r, g, b), alpha)
+
+    def setStrokeColorRGB(self, r: float, g: float, b: float, alpha: Optional[float] = None) -> None:
+        self.setStrokeColor(colors.Color(r, g, b), alpha)
+
+    def setFillGray(self, gray: float, alpha: Optional[float] = None) -> None:
+        self.setFillColor(colors.Color(gray, gray, gray), alpha)
+
+    def setStrokeGray(self, gray: float, alpha: Optional[float] = None) -> None:
+        self.setStrokeColor(colors.Color(gray, gray, gray), alpha)
+
+    def setFillAlpha(self, a: float) -> None:
+        self._fillAlpha = float(a)
+
+    def setStrokeAlpha(self, a: float) -> None:
+        self._strokeAlpha = float(a)
+
+    def setLineWidth(self, width: float) -> None:
+        self._lineWidth = float(width)
+
+    def setFont(self, psfontname: str, size: float, leading: Optional[float] = None) -> None:
+        self._fontname = psfontname
+        self._fontsize = float(size)
+        self._leading = float(leading) if leading is not None else self._fontsize * 1.2
+
+    # Dashes, caps and joins are not reproduced; previews draw solid lines.
+    def setDash(self, *_args: Any, **_kwargs: Any) -> None:
+        return None
+
+    def setLineCap(self, _mode: Any) -> None:
+        return None
+
+    def setLineJoin(self, _mode: Any) -> None:
+        return None
+
+    def fill_rgb(self) -> Tuple[float, float, float]:
+        """Return the fill color as RGB floats in 0..1."""
+        return to_color(self._fillColorObj).rgb()
+
+    def stroke_rgb(self) -> Tuple[float, float, float]:
+        """Return the stroke color as RGB floats in 0..1."""
+        return to_color(self._strokeColorObj).rgb()
+
+    # -- shapes -----------------------------------------------------------
+
+    def _shape(self, build: str, *args: Any, stroke: Any = 1, fill: Any = 0) -> None:
+        p = PDFPathObject()
+        getattr(p, build)(*args)
+        self._paint(path_segments(p), bool(fill), bool(stroke))
+
+    def beginPath(self) -> PDFPathObject:
+        return PDFPathObject()
+
+    def line(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        self._paint([("M", (x1, y1)), ("L", (x2, y2))], False, True)
+
+    def lines(self, linelist: Sequence[Tuple[float, float, float, float]]) -> None:
+        for x1, y1, x2, y2 in linelist:
+            self.line(x1, y1, x2, y2)
+
+    def rect(self, x: float, y: float, width: float, height: float, stroke: Any = 1, fill: Any = 0) -> None:
+        self._shape("rect", x, y, width, height, stroke=stroke, fill=fill)
+
+    def roundRect(self, x: float, y: float, width: float, height: float, radius: float,
+                  stroke: Any = 1, fill: Any = 0) -> None:
+        self._shape("roundRect", x, y, width, height, radius, stroke=stroke, fill=fill)
+
+    def circle(self, x_cen: float, y_cen: float, r: float, stroke: Any = 1, fill: Any = 0) -> None:
+        self._shape("circle", x_cen, y_cen, r, stroke=stroke, fill=fill)
+
+    def ellipse(self, x1: float, y1: float, x2: float, y2: float, stroke: Any = 1, fill: Any = 0) -> None:
+        self._shape("ellipse", x1, y1, x2 - x1, y2 - y1, stroke=stroke, fill=fill)
+
+    def drawPath(self, aPath: Any, stroke: Any = 1, fill: Any = 0, fillMode: Any = None) -> None:
+        self._paint(path_segments(aPath), bool(fill), bool(stroke))
+
+    def clipPath(self, aPath: Any, stroke: Any = 1, fill: Any = 0, fillMode: Any = None) -> None:
+        segments = path_segments(aPath)
+        if stroke or fill:
+            self._paint(segments, bool(fill), bool(stroke))
+        self._clip = self._clip_to(segments)
+
+    # -- text -------------------------------------------------------------
+
+    def _width(self, text: str, char_space: float = 0.0) -> float:
+        width = pdfmetrics.stringWidth(text, self._fontname, self._fontsize)
+        return width + char_space * max(0, len(text) - 1)
+
+    def drawString(self, x: float, y: float, text: str, mode: Any = None, charSpace: float = 0,
+                   direction: Any = None, wordSpace: Any = None) -> None:
+        self._text(x, y, _as_text(text))
+
+    def drawRightString(self, x: float, y: float, text: str, mode: Any = None, charSpace: float = 0,
+                        direction: Any = None, wordSpace: Any = None) -> None:
+        text = _as_text(text)
+        self._text(x - self._width(text, charSpace), y, text)
+
+    def drawCentredString(self, x: float, y: float, text: str, mode: Any = None, charSpace: float = 0,
+                          direction: Any = None, wordSpace: Any = None) -> None:
+        text = _as_text(text)
+        self._text(x - self._width(text, charSpace) / 2.0, y, text)
+
+    def beginText(self, x: float = 0, y: float = 0, direction: Any = None) -> BackendText:
+        return BackendText(x, y)
+
+    def drawText(self, aTextObject: BackendText) -> None:
+        """
+        Runs the calls of a text object; font and fill changes stay in effect afterwards.
+        """
+        x0, y0 = aTextObject.origin
+        x = x0
+        char_space = 0.0
+        for name, args, kwargs in aTextObject.calls:
+            if name == "setTextOrigin":
+                x0, y0 = args[0], args[1]
+                x = x0
+            elif name == "moveCursor":
+                x0, y0 = x0 + args[0], y0 - args[1]
+                x = x0
+            elif name == "textOut":
+                text = _as_text(args[0])
+                self._text(x, y0, text)
+                x += self._width(text, char_space)
+            elif name in ("textLine", "textLines"):
+                text = args[0] if args else kwargs.get("text", kwargs.get("stuff", ""))
+                lines = [_as_text(text)] if name == "textLine" else (
+                    text.split("\n") if isinstance(text, str) else [_as_text(t) for t in text]
+                )
+                for ln in lines:
+                    if ln:
+                        self._text(x, y0, ln.strip() if name == "textLines" else ln)
+                    y0 -= self._leading
+                    x = x0
+            elif name == "setLeading":
+                self._leading = float(args[0])
+            elif name == "setCharSpace":
+                char_space = float(args[0])
+            elif name in ("setFont", "setFillColor", "setStrokeColor", "setFillColorRGB",
+                          "setStrokeColorRGB", "setFillGray", "setStrokeGray", "setFillAlpha"):
+                getattr(self, name)(*args, **kwargs)
+            else:
+                self._unsupported(f"text.{name}")
+
+    # -- images and links -------------------------------------------------
+
+    def drawImage(self, image: Any, x: float, y: float, width: Optional[float] = None,
+                  height: Optional[float] = None, mask: Any = None, preserveAspectRatio: bool = False,
+                  anchor: str = "c", anchorAtXY: bool = False, showBoundary: bool = False,
+                  extraReturn: Any = None) -> None:
+        reader = image if isinstance(image, ImageReader) else ImageReader(image)
+        iw, ih = reader.getSize()
+        width = iw if width is None else width
+        height = ih if height is None else height
+        x, y, width, height, _scaled = aspectRatioFix(
+            preserveAspectRatio, anchor, x, y, width, height, iw, ih, anchorAtXY,
+        )
+        self._image(reader, x, y, width, height, mask)
+
+    drawInlineImage = drawImage
+
+    def linkURL(self, url: str, rect: Tuple[float, float, float, float], relative: int = 0,
+                thickness: float = 0, color: Any = None, dashArray: Any = None, kind: str = "URI",
+                **kw: Any) -> None:
+        x1, y1, x2, y2 = rect
+        self._link(url, (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+
+__all__ = ["BackendText", "PageBackend", "Segment", "path_segments", "record_page", "replay_page", "to_color"]
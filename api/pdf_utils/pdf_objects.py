@@ -0,0 +1,205 @@
+"""
+Object-level access to PDFs written by ReportLab.
+
+ReportLab writes every object at the top level of the file, followed by one
+classic cross-reference table and a trailer. `parse_pdf` splits such a file
+into its numbered objects, so the output writers in this package can
+re-emit them in another arrangement, e.g. as an incremental update section
+(`write_update`), or write them back after changing some (`write_pdf`).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+
+_STARTXREF = re.compile(rb"startxref\s+(\d+)\s+%%EOF\s*$")
+_XREF_SECTION = re.compile(rb"(\d+) (\d+)\s*\n")
+_REF = rb"/%s (\d+) 0 R"
+_ID = re.compile(rb"/ID\s*\[\s*<([0-9A-Fa-f]*)>\s*<([0-9A-Fa-f]*)>\s*\]")
+
+@dataclass
+class PdfObjects:
+    """
+    A ReportLab PDF split into its objects.
+
+    Attributes:
+        version (str): Header version, e.g. "1.4".
+        objects (Dict[int, bytes]): Object number -> body (between "N 0 obj" and "endobj").
+        root (int): Object number of the catalog.
+        info (Optional[int]): Object number of the document info dictionary.
+        file_id (Tuple[str, str]): The two /ID strings (hex).
+        startxref (int): Offset of the cross-reference table.
+    """
+    version: str
+    objects: Dict[int, bytes] = field(default_factory=dict)
+    root: int = 0
+    info: Optional[int] = None
+    file_id: Tuple[str, str] = ("", "")
+    startxref: int = 0
+
+    @property
+    def size(self) -> int:
+        """Return the trailer /Size (highest object number + 1)."""
+        return max(self.objects, default=0) + 1
+
+def last_xref(pdf: bytes) -> int:
+    """
+    Returns the startxref offset at the end of a PDF file (or update section).
+
+    Raises:
+        ValueError: The data does not end with startxref and %%EOF.
+    """
+    m = _STARTXREF.search(pdf[-64:])
+    if m is None:
+        raise ValueError("no startxref at the end of the file")
+    return int(m.group(1))
+
+def parse_pdf(pdf: bytes) -> PdfObjects:
+    """
+    Splits a PDF with a single classic xref table (as written by ReportLab) into objects.
+
+    Args:
+        pdf (bytes): The PDF file.
+
+    Returns:
+        PdfObjects: Objects and trailer entries of the file.
+
+    Raises:
+        ValueError: The file has no classic xref table, has incremental updates,
+            or the table does not match the objects.
+    """
+    if not pdf.startswith(b"%PDF-"):
+        raise ValueError("not a PDF file")
+    version = pdf[5:pdf.index(b"\n")].strip().decode("ascii")
+    startxref = last_xref(pdf)
+    if pdf[startxref:startxref + 4] != b"xref":
+        raise ValueError("cross-reference streams are not supported")
+
+    pos = pdf.index(b"\n", startxref) + 1
+    offsets: Dict[int, int] = {}
+    while True:
+        sec = _XREF_SECTION.match(pdf, pos)
+        if sec is None:
+            break
+        first, count = int(sec.group(1)), int(sec.group(2))
+        pos = sec.end()
+        for n in range(first, first + count):
+            entry = pdf[pos:pos + 20]
+            if entry[17:18] == b"n":
+                offsets[n] = int(entry[:10])
+            pos += 20
+    trailer_at = pdf.index(b"trailer", pos)
+    trailer = pdf[trailer_at:]
+    if re.search(rb"/Prev \d+", trailer):
+        raise ValueError("files with incremental updates are not supported")
+
+    # Bound each object by the next one so binary stream data is never scanned for "endobj".
+    bounds = sorted(offsets.values()) + [startxref]
+    ends = {start: bounds[i + 1] for i, start in enumerate(bounds[:-1])}
+    objects: Dict[int, bytes] = {}
+    for n, off in offsets.items():
+        header = b"%d 0 obj" % n
+        if not pdf.startswith(header, off):
+            raise ValueError(f"xref entry of object {n} does not point at its header")
+        end = pdf.rindex(b"endobj", off, ends[off])
+        objects[n] = pdf[off + len(header):end].strip(b"\r\n")
+
+    root = re.search(_REF % b"Root", trailer)
+    info = re.search(_REF % b"Info", trailer)
+    ids = _ID.search(trailer)
+    if root is None:
+        raise ValueError("trailer has no /Root")
+    return PdfObjects(
+        version=version,
+        objects=objects,
+        root=int(root.group(1)),
+        info=int(info.group(1)) if info else None,
+        file_id=(ids.group(1).decode("ascii"), ids.group(2).decode("ascii")) if ids else ("", ""),
+        startxref=startxref,
+    )
+
+def format_object(number: int, body: bytes) -> bytes:
+    """
+    Returns one indirect object as it appears in the file.
+    """
+    return b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+def write_pdf(doc: PdfObjects) -> bytes:
+    """
+    Writes objects as a plain PDF with one classic xref table (the layout ReportLab uses).
+
+    Args:
+        doc (PdfObjects): Objects and trailer entries.
+
+    Returns:
+        bytes: The PDF file.
+    """
+    out = bytearray(b"%%PDF-%s\n%%\xe2\xe3\xcf\xd3\n" % doc.version.encode("ascii"))
+    entries: List[Tuple[int, int]] = []
+    for number in sorted(doc.objects):
+        entries.append((number, len(out)))
+        out += format_object(number, doc.objects[number])
+    xref_at = len(out)
+    size = doc.size
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    offsets = dict(entries)
+    out += b"".join(
+        b"%010d 00000 n \n" % offsets[n] if n in offsets else b"0000000000 65535 f \n" for n in range(1, size)
+    )
+    out += b"trailer\n<<\n/Size %d /Root %d 0 R" % (size, doc.root)
+    if doc.info is not None:
+        out += b" /Info %d 0 R" % doc.info
+    out += b" /ID [<%s> <%s>]\n>>\n" % (doc.file_id[0].encode("ascii"), doc.file_id[1].encode("ascii"))
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_at
+    return bytes(out)
+
+def _xref_sections(entries: List[Tuple[int, int]]) -> bytes:
+    """
+    Formats (object number, offset) pairs as xref subsections of consecutive numbers.
+    """
+    out: List[bytes] = []
+    run: List[Tuple[int, int]] = []
+    for number, offset in sorted(entries):
+        if run and number != run[-1][0] + 1:
+            out.append(b"%d %d\n" % (run[0][0], len(run)) + b"".join(b"%010d 00000 n \n" % o for _n, o in run))
+            run = []
+        run.append((number, offset))
+    if run:
+        out.append(b"%d %d\n" % (run[0][0], len(run)) + b"".join(b"%010d 00000 n \n" % o for _n, o in run))
+    return b"".join(out)
+
+def write_update(base_length: int, prev_xref: int, objects: Mapping[int, bytes], *,
+                 size: int, root: int, info: Optional[int], file_id: Tuple[str, str]) -> bytes:
+    """
+    Builds an incremental update section (ISO 32000-1, 7.5.6) to append to a PDF.
+
+    Args:
+        base_length (int): Length of the file the section is appended to.
+        prev_xref (int): Offset of that file's last cross-reference section.
+        objects (Mapping[int, bytes]): New or replaced objects (number -> body).
+        size (int): Trailer /Size of the updated file.
+        root (int): Catalog object number.
+        info (Optional[int]): Info dictionary object number.
+        file_id (Tuple[str, str]): /ID of the updated file; the first entry
+            should stay the one of the original file.
+
+    Returns:
+        bytes: Objects, xref section and trailer, ending with %%EOF.
+    """
+    out = bytearray()
+    entries: List[Tuple[int, int]] = []
+    for number in sorted(objects):
+        entries.append((number, base_length + len(out)))
+        out += format_object(number, objects[number])
+    xref_at = base_length + len(out)
+    out += b"xref\n" + _xref_sections(entries)
+    out += b"trailer\n<<\n/Size %d /Root %d 0 R" % (size, root)
+    if info is not None:
+        out += b" /Info %d 0 R" % info
+    out += b" /Prev %d /ID [<%s> <%s>]\n>>\n" % (prev_xref, file_id[0].encode("ascii"), file_id[1].encode("ascii"))
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_at
+    return bytes(out)
+
+__all__ = ["PdfObjects", "format_object", "last_xref", "parse_pdf", "write_pdf", "write_update"]
@@ -0,0 +1,54 @@
+"""
+Output writers applied to a finished ReportLab PDF.
+
+Requests pick the file layout with options that travel in the render data:
+
+- `compression`: stream compression profile (`compression.compress_pdf`);
+- `linearize`: fast web view layout (`linearize.linearize_pdf`);
+- `compact`: PDF 1.5 object streams and xref stream (`compact.compact_pdf`).
+
+Linearize and compact are exclusive; request validation rejects the combination.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional
+
+from .compact import compact_pdf
+from .compression import compress_pdf, get_profile
+from .linearize import linearize_pdf
+
+def finish_pdf(pdf: bytes, *, linearize: bool = False, compact: bool = False,
+               compression: Optional[str] = None) -> bytes:
+    """
+    Rewrites a ReportLab PDF with the requested writer, or returns it unchanged.
+
+    Args:
+        pdf (bytes): File written by ReportLab.
+        linearize (bool): Linearize the file.
+        compact (bool): Pack objects into object streams (ignored with `linearize`).
+        compression (Optional[str]): Compression profile; the canvas must have been
+            created with `compression.canvas_compression(compression)`.
+
+    Returns:
+        bytes: The final file.
+    """
+    pdf = compress_pdf(pdf, compression)
+    if linearize:
+        return linearize_pdf(pdf)
+    if compact:
+        profile = get_profile(compression)
+        return compact_pdf(pdf, profile.level if profile else 9)
+    return pdf
+
+def output_options(data: Mapping[str, Any]) -> dict:
+    """
+    Returns the `finish_pdf` keyword arguments stored in `build_resume_pdf` input data.
+    """
+    return {
+        "linearize": bool(data.get("linearize")),
+        "compact": bool(data.get("compact")),
+        "compression": data.get("compression"),
+    }
+
+__all__ = ["finish_pdf", "output_options"]
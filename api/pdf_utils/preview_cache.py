@@ -0,0 +1,92 @@
+"""
+Cache of rendered previews (PNG, SVG) keyed by request content.
+
+A live preview re-sends the whole form on every edit, and most requests
+repeat one seen a moment ago (undo, switching back to a theme, a second tab).
+`PREVIEWS` keeps recently rendered previews in memory, bounded by their
+total size, so those are answered without touching the render queue. The
+key (`preview_key`) also serves as the response ETag.
+
+Environment Variables:
+    PREVIEW_CACHE_MB: Memory budget of the preview cache in MiB (default 64, 0 disables it).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+CACHE_BYTES = int(float(os.getenv("PREVIEW_CACHE_MB", "64")) * 1024 * 1024)
+
+def preview_key(*parts: Any) -> str:
+    """
+    Returns a stable digest of JSON-serializable parts (output kind, resolution, request, ...).
+    """
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class PreviewCache:
+    """
+    Thread-safe LRU of rendered previews, bounded by their total size in bytes.
+
+    Args:
+        max_bytes (int): Memory budget; entries larger than the budget are not stored.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_BYTES):
+        self.max_bytes = max(0, max_bytes)
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns a cached preview and marks it as recently used, or None.
+        """
+        with self._lock:
+            body = self._items.get(key)
+            if body is None:
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+            return body
+
+    def put(self, key: str, body: bytes) -> None:
+        """
+        Stores a preview, evicting the least recently used ones over the budget.
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _key, dropped = self._items.popitem(last=False)
+                self._size -= len(dropped)
+
+    def stats(self) -> dict:
+        """
+        Returns entry count, size and hit/miss counters.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+PREVIEWS = PreviewCache()
+
+__all__ = ["CACHE_BYTES", "PREVIEWS", "PreviewCache", "preview_key"]
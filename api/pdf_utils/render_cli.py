@@ -0,0 +1,303 @@
+"""
+Offline bulk renderer: renders stored profiles to PDF files without the HTTP API.
+
+    python -m api.pdf_utils.render_cli profiles.jsonl --out outputs/bulk --workers 4
+    python -m api.pdf_utils.render_cli profiles/ --theme aqua-card --checkpoint run.ckpt
+
+Input is either a JSONL file (one record per line) or a directory of saved
+Streamlit profile JSONs (`*.json`). A record is a GenerateFormRequest-like
+object (`{"profile": {...}, "theme_name": ..., "layout_name": ..., "ui_lang": ...,
+"rtl_mode": ...}`, which is also the shape the Streamlit sidebar saves) or a
+bare profile (`{"header": {...}, ...}`). Records are validated through
+`api.schemas.Profile` before any rendering; `--theme`, `--layout`, `--lang`
+and `--rtl` override the values stored in the records.
+
+Rendering runs in worker processes. The parent warms fonts, themes and
+layouts once (and refreshes the warm-start snapshot); on platforms that fork,
+workers inherit those caches, elsewhere each worker loads the snapshot.
+Each PDF is written to a temporary file and renamed into place, so an output
+file is either complete or absent.
+
+Finished items are appended to a checkpoint file (JSONL) as they complete.
+Re-running with the same checkpoint skips items whose record is unchanged and
+whose output still exists, so an interrupted run resumes where it stopped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+@dataclass
+class RenderTask:
+    """
+    One validated record, ready to hand to a worker.
+    """
+    key: str
+    source: str
+    out: str
+    request: Dict[str, Any]
+
+@dataclass
+class RenderResult:
+    """
+    Outcome of one record, as written to the checkpoint file.
+    """
+    key: str
+    source: str
+    file: Optional[str]
+    status: str
+    error: Optional[str] = None
+    bytes: int = 0
+    ms: float = 0.0
+
+# ── input ───────────────────────────────────────────────────────────────
+def _iter_records(src: Path) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Yields (source label, output stem, raw record) from a JSONL file or a directory of JSON files.
+    """
+    if src.is_dir():
+        for p in sorted(src.glob("*.json")):
+            try:
+                yield p.name, p.stem, json.loads(p.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                yield p.name, p.stem, e
+        return
+    with src.open(encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                yield f"{src.name}:{lineno}", f"{lineno:05d}", json.loads(line)
+            except ValueError as e:
+                yield f"{src.name}:{lineno}", f"{lineno:05d}", e
+
+def _to_request(record: Any, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turns a raw record into a validated GenerateFormRequest payload.
+
+    Raises:
+        ValueError: The record is not an object or has no profile.
+        pydantic.ValidationError: The profile or options are invalid.
+    """
+    from api.schemas import GenerateFormRequest, Profile
+
+    if not isinstance(record, dict):
+        raise ValueError("record is not a JSON object")
+    if isinstance(record.get("profile"), dict):
+        raw = {k: record[k] for k in ("theme_name", "layout_name", "ui_lang", "rtl_mode") if record.get(k) is not None}
+        profile = record["profile"]
+    elif "header" in record:
+        raw, profile = {}, record
+    else:
+        raise ValueError("record has no 'profile' object")
+
+    raw.update({k: v for k, v in overrides.items() if v is not None})
+    raw["profile"] = Profile.model_validate(profile)
+    req = GenerateFormRequest.model_validate(raw)
+    return {
+        "theme_name": req.theme_name,
+        "layout_name": req.layout_name,
+        "ui_lang": req.ui_lang,
+        "rtl_mode": bool(req.rtl_mode),
+        "profile": req.profile.model_dump(mode="json"),
+    }
+
+def _task_key(source: str, request: Dict[str, Any]) -> str:
+    """
+    Checkpoint key: changes whenever the record or the render options change.
+    """
+    blob = json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return f"{source}#{hashlib.sha1(blob).hexdigest()[:16]}"
+
+def _out_name(stem: str, request: Dict[str, Any]) -> str:
+    from api.routes.common import slug
+    name = request["profile"].get("header", {}).get("name")
+    return f"{slug(stem)}-{slug(name)}-{request['theme_name']}.pdf"
+
+# ── checkpoint ──────────────────────────────────────────────────────────
+def _load_checkpoint(path: Optional[Path]) -> Set[str]:
+    """
+    Returns the keys of items that finished successfully in earlier runs.
+    """
+    done: Set[str] = set()
+    if path is None or not path.exists():
+        return done
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue  # torn last line of an interrupted run
+        if entry.get("status") == "ok":
+            done.add(entry["key"])
+    return done
+
+# ── workers ─────────────────────────────────────────────────────────────
+def _init_worker(quiet: bool) -> None:
+    """
+    Pool initializer: warms caches unless inherited from the parent, and silences render logs.
+    """
+    from api.warmup import STATE, run_warmup
+    if quiet:
+        sys.stdout = open(os.devnull, "w", encoding="utf-8")
+    if not STATE.ready:
+        run_warmup()
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def _render_task(task: RenderTask) -> RenderResult:
+    """
+    Renders one task in a worker process and writes the PDF atomically.
+    """
+    from api.routes.common import compile_layout
+    from api.pdf_utils.resume import build_resume_pdf
+
+    t0 = time.perf_counter()
+    req = task.request
+    try:
+        data = {
+            "ui_lang": req["ui_lang"],
+            "rtl_mode": req["rtl_mode"],
+            "profile": req["profile"],
+            "theme_name": req["theme_name"],
+            "layout_inline": compile_layout(req["theme_name"], req["layout_name"]),
+        }
+        pdf = build_resume_pdf(data=data)
+        _atomic_write(Path(task.out), pdf)
+    except Exception as e:
+        return RenderResult(task.key, task.source, None, "error", f"{type(e).__name__}: {e}",
+                            ms=round((time.perf_counter() - t0) * 1000, 1))
+    return RenderResult(task.key, task.source, Path(task.out).name, "ok", None, len(pdf),
+                        round((time.perf_counter() - t0) * 1000, 1))
+
+# ── main ────────────────────────────────────────────────────────────────
+def _plan(src: Path, out_dir: Path, overrides: Dict[str, Any], done: Set[str]) -> Tuple[List[RenderTask], List[RenderResult], int]:
+    """
+    Validates all records and splits them into tasks, invalid records and already finished ones.
+    """
+    from pydantic import ValidationError
+    from api.routes.common import validation_summary
+
+    tasks: List[RenderTask] = []
+    invalid: List[RenderResult] = []
+    skipped = 0
+    for source, stem, record in _iter_records(src):
+        try:
+            if isinstance(record, Exception):
+                raise ValueError(f"invalid JSON: {record}")
+            request = _to_request(record, overrides)
+        except ValidationError as e:
+            invalid.append(RenderResult(source, source, None, "invalid", validation_summary(e)))
+            continue
+        except ValueError as e:
+            invalid.append(RenderResult(source, source, None, "invalid", str(e)))
+            continue
+        key = _task_key(source, request)
+        out = out_dir / _out_name(stem, request)
+        if key in done and out.exists():
+            skipped += 1
+            continue
+        tasks.append(RenderTask(key, source, str(out), request))
+    return tasks, invalid, skipped
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of `python -m api.pdf_utils.render_cli`.
+
+    Returns:
+        int: Process exit code (0 if every record rendered or was skipped, 1 otherwise).
+    """
+    ap = argparse.ArgumentParser(description="Render stored profiles to PDF files in bulk.")
+    ap.add_argument("input", help="JSONL file, or directory of saved profile JSON files")
+    ap.add_argument("--out", default="outputs/bulk", help="output directory (default outputs/bulk)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    ap.add_argument("--checkpoint", default=None, help="checkpoint file (default <out>/.render_cli.ckpt)")
+    ap.add_argument("--theme", default=None, help="render every record with this theme")
+    ap.add_argument("--layout", default=None, help="render every record with this layout")
+    ap.add_argument("--lang", default=None, help="render every record with this UI language")
+    ap.add_argument("--rtl", default=None, choices=["on", "off"], help="force RTL mode on or off")
+    ap.add_argument("--verbose", action="store_true", help="keep the renderer's per-item logs")
+    args = ap.parse_args(argv)
+
+    src = Path(args.input)
+    if not src.exists():
+        ap.error(f"input not found: {src}")
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ckpt = Path(args.checkpoint) if args.checkpoint else out_dir / ".render_cli.ckpt"
+    overrides = {
+        "theme_name": args.theme,
+        "layout_name": args.layout,
+        "ui_lang": args.lang,
+        "rtl_mode": None if args.rtl is None else args.rtl == "on",
+    }
+
+    from api.warmup import run_warmup
+    run_warmup()
+
+    tasks, invalid, skipped = _plan(src, out_dir, overrides, _load_checkpoint(ckpt))
+    for r in invalid:
+        print(f"[WARN] {r.source}: {r.error}")
+    workers = max(1, min(args.workers, len(tasks) or 1))
+    print(f"[Render] {len(tasks)} to render, {skipped} already done, {len(invalid)} invalid; {workers} workers")
+
+    ok = failed = total_bytes = 0
+    t0 = time.perf_counter()
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    pool = ctx.Pool(workers, initializer=_init_worker, initargs=(not args.verbose,))
+    try:
+        with ckpt.open("a", encoding="utf-8") as log:
+            for res in pool.imap_unordered(_render_task, tasks):
+                log.write(json.dumps(asdict(res), ensure_ascii=False) + "\n")
+                log.flush()
+                if res.status == "ok":
+                    ok += 1
+                    total_bytes += res.bytes
+                else:
+                    failed += 1
+                    print(f"[WARN] {res.source}: {res.error}")
+                done = ok + failed
+                if done % 50 == 0 or done == len(tasks):
+                    print(f"[Render] {done}/{len(tasks)}")
+        pool.close()
+    except KeyboardInterrupt:
+        print("[Render] interrupted; re-run with the same checkpoint to resume")
+        pool.terminate()
+        return 130
+    except BaseException:
+        # join() on a pool that was neither closed nor terminated raises
+        # ValueError and would hide the original error.
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    secs = time.perf_counter() - t0
+    rate = ok / secs if secs > 0 else 0.0
+    print(
+        f"[Render] {ok} ok, {failed} failed, {len(invalid)} invalid, {skipped} skipped "
+        f"in {secs:.1f} s ({rate:.1f} docs/s, {total_bytes / 1e6:.1f} MB) -> {out_dir}"
+    )
+    return 0 if not failed and not invalid else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+__all__ = ["RenderResult", "RenderTask", "main"]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import os
 from io import BytesIO
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Callable, Dict, Any, List, Mapping, Sequence, Tuple, Optional
 
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
@@ -11,8 +12,20 @@ from .blocks.base import Frame, RenderContext
 from .blocks.registry import get as get_block
 from .data_utils import build_ready_from_profile
 from .config import UI_LANG
-from .theme_loader import load_and_apply
+from .theme_loader import bind_palette, load_and_apply, palette_slots, parse_palette
 from .block_aliases import canonicalize
+from .canvas_state import DedupCanvas
+from .display_list import DisplayList, ImageCache, RecordingCanvas, Slot, replay
+from .cancel import CancelToken
+from .fonts import ensure_fonts
+from .compression import canvas_compression
+from .pdf_output import finish_pdf, output_options
+
+# progress(done_blocks, total_blocks, block_id), called after every block.
+ProgressHook = Callable[[int, int, str], None]
+
+# PDF_DEBUG=1 logs per-render diagnostics (e.g. dropped state operators).
+DEBUG = os.getenv("PDF_DEBUG", "0").lower() in ("1", "true", "yes", "on")
 
 PAGE_W, PAGE_H = A4
 LEFT_MARGIN = 18 * mm
@@ -29,22 +42,33 @@ def build_resume_pdf(
     rtl_mode: Optional[bool] = None,
     theme_name: Optional[str] = None,
     theme: Optional[str] = None,
+    cancel: Optional[CancelToken] = None,
+    progress: Optional[ProgressHook] = None,
 ) -> bytes:
     """
     Build a resume PDF and return it as byte content.
 
     Can be used in two modes:
-        1. New interface: pass `data` with profile, layout, and settings.
+        1. New interface: pass `data` with profile, layout, and settings
+           (`data["linearize"]` / `data["compact"]` select the output writer).
         2. Legacy mode: directly pass `layout_plan` and `ready`.
 
+    In the `data` mode, `ready` may also be passed to reuse block data that was
+    already built for the same profile (e.g. when rendering several language
+    variants); otherwise it is built from `data["profile"]`.
+
     Args:
         data (Optional[Dict[str, Any]]): Input dictionary containing resume profile and layout.
         layout_plan (Optional[List[Dict[str, Any]]]): Legacy layout configuration.
-        ready (Optional[Dict[str, Any]]): Preprocessed data ready for block rendering.
+        ready (Optional[Dict[str, Any]]): Preprocessed data ready for block rendering
+            (legacy mode, or shared block data in the `data` mode).
         ui_lang (Optional[str]): UI language code.
         rtl_mode (Optional[bool]): Whether the text is right-to-left.
         theme_name (Optional[str]): Name of the theme to use.
         theme (Optional[str]): Legacy theme name for compatibility.
+        cancel (Optional[CancelToken]): Checked between blocks; a cancelled
+            token stops the render with RenderCancelled.
+        progress (Optional[ProgressHook]): Called after each block is drawn.
 
     Returns:
         bytes: Rendered PDF content as bytes.
@@ -52,13 +76,15 @@ def build_resume_pdf(
     if theme and not theme_name:
         theme_name = theme
 
+    ensure_fonts()
+
     if data is not None:
         ui = (data.get("ui_lang") or UI_LANG)
         rtl = bool(data.get("rtl_mode"))
         profile = data.get("profile") or {}
         tn = theme_name or data.get("theme_name") or "default"
         theme_dict = load_and_apply(tn)
-        rd = build_ready_from_profile(profile)
+        rd = ready if ready is not None else build_ready_from_profile(profile, compression=data.get("compression"))
         plan, cols = _resolve_layout_and_columns_from_inline(data)
 
         return _render_pdf(
@@ -68,6 +94,9 @@ def build_resume_pdf(
             rtl_mode=rtl,
             columns=cols,
             theme=theme_dict,
+            cancel=cancel,
+            progress=progress,
+            **output_options(data),
         )
 
     ui = ui_lang or UI_LANG
@@ -85,31 +114,63 @@ def build_resume_pdf(
         rtl_mode=rtl,
         columns=cols,
         theme=theme_dict,
+        cancel=cancel,
+        progress=progress,
     )
 
 def _render_pdf(
     layout_plan: List[Dict[str, Any]] | Dict[str, Any],
-    ready: Dict[str, Any],
+    ready: Mapping[str, Any],
     *,
     ui_lang: str,
     rtl_mode: bool,
     columns: Dict[str, Tuple[float, float]],
     theme: Optional[Dict[str, Any]] = None,
+    cancel: Optional[CancelToken] = None,
+    progress: Optional[ProgressHook] = None,
+    linearize: bool = False,
+    compact: bool = False,
+    compression: Optional[str] = None,
 ) -> bytes:
     """
     Render the resume PDF by drawing each block according to the layout plan.
 
     Args:
         layout_plan (List[Dict[str, Any]] | Dict[str, Any]): Block layout definition.
-        ready (Dict[str, Any]): Data for each block.
+        ready (Mapping[str, Any]): Data for each block; lazy mappings are only
+            evaluated for the block_ids that appear in the plan.
         ui_lang (str): UI language code.
         rtl_mode (bool): Enable RTL layout.
         columns (Dict[str, Tuple[float, float]]): Layout column positions and widths.
         theme (Optional[Dict[str, Any]]): Theme settings.
+        cancel (Optional[CancelToken]): Cancellation token checked before each block.
+        progress (Optional[ProgressHook]): Called with (done, total, block_id) after each block.
+        linearize (bool): Rewrite the file for fast web view (see `linearize.linearize_pdf`).
+        compact (bool): Write PDF 1.5 object streams and an xref stream (see `compact.compact_pdf`).
+        compression (Optional[str]): Compression profile name (see `compression.PROFILES`).
 
     Returns:
         bytes: PDF binary content.
+
+    Raises:
+        RenderCancelled: If `cancel` is cancelled before the last block is drawn.
     """
+    layout_plan = _fix_plan(layout_plan)
+
+    buf = BytesIO()
+    # Blocks draw through a proxy that skips font/color/width operators that are already active.
+    c = DedupCanvas(canvas.Canvas(buf, pagesize=A4, pageCompression=canvas_compression(compression)))
+
+    ctx = _render_context(ui_lang, rtl_mode, theme)
+    _draw_blocks(c, layout_plan, ready, ctx, cancel=cancel, progress=progress)
+
+    c.showPage()
+    c.save()
+    if DEBUG and c.removed_total:
+        print(f"[Debug] Dropped {c.removed_total} redundant state operators: {c.removed}")
+    return finish_pdf(buf.getvalue(), linearize=linearize, compact=compact, compression=compression)
+
+def _fix_plan(layout_plan: List[Dict[str, Any]] | Dict[str, Any]) -> List[Dict[str, Any]]:
     if isinstance(layout_plan, dict):
         layout_plan = layout_plan.get("layout", [])
 
@@ -122,15 +183,12 @@ def _render_pdf(
         else:
             print(f"[WARN] Skipping invalid layout item in _render: {it!r}")
 
-    layout_plan = fixed_plan
-
-    for it in layout_plan:
+    for it in fixed_plan:
         it["block_id"] = canonicalize(it["block_id"])
+    return fixed_plan
 
-    buf = BytesIO()
-    c = canvas.Canvas(buf, pagesize=A4)
-
-    ctx: RenderContext = {
+def _render_context(ui_lang: str, rtl_mode: bool, theme: Optional[Dict[str, Any]]) -> RenderContext:
+    return {
         "ui_lang": ui_lang,
         "rtl_mode": rtl_mode,
         "page_top_y": PAGE_H - TOP_MARGIN,
@@ -138,7 +196,27 @@ def _render_pdf(
         "theme": theme or {},
     }
 
-    for block_conf in layout_plan:
+def _draw_blocks(
+    c: Any,
+    layout_plan: List[Dict[str, Any]],
+    ready: Mapping[str, Any],
+    ctx: RenderContext,
+    *,
+    cancel: Optional[CancelToken] = None,
+    progress: Optional[ProgressHook] = None,
+    recorder: Optional[RecordingCanvas] = None,
+) -> None:
+    """
+    Draw every block of the plan on `c`; a failing block is logged and skipped.
+
+    When `recorder` is given (the canvas `c` draws into), the op range of each
+    block is marked in its display list.
+    """
+    total = len(layout_plan)
+    for done, block_conf in enumerate(layout_plan, start=1):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        start = recorder.op_count if recorder is not None else 0
         try:
             block_id = block_conf.get("block_id")
             block = get_block(block_id)
@@ -156,12 +234,115 @@ def _render_pdf(
 
         except Exception as e:
             print(f"[WARN] Block '{block_conf.get('block_id') if isinstance(block_conf, dict) else block_conf}' failed: {e}")
-            continue
 
+        if recorder is not None:
+            recorder.mark_block(block_conf.get("block_id"), start)
+
+        if progress is not None:
+            try:
+                progress(done, total, block_conf.get("block_id"))
+            except Exception as e:
+                print(f"[WARN] Progress hook failed: {e}")
+
+def record_display_list(
+    layout_plan: List[Dict[str, Any]] | Dict[str, Any],
+    ready: Mapping[str, Any],
+    *,
+    ui_lang: str,
+    rtl_mode: bool,
+    theme: Optional[Dict[str, Any]] = None,
+    slot_colors: Optional[Dict[str, str]] = None,
+    cancel: Optional[CancelToken] = None,
+    dedup: bool = True,
+) -> DisplayList:
+    """
+    Run the blocks once and record their canvas calls instead of writing a PDF.
+
+    Args:
+        layout_plan (List[Dict[str, Any]] | Dict[str, Any]): Block layout definition.
+        ready (Mapping[str, Any]): Data for each block.
+        ui_lang (str): UI language code.
+        rtl_mode (bool): Enable RTL layout.
+        theme (Optional[Dict[str, Any]]): Theme settings.
+        slot_colors (Optional[Dict[str, str]]): Colors to record as slots
+            (hexval -> slot key, see `theme_loader.palette_slots`).
+        cancel (Optional[CancelToken]): Cancellation token checked before each block.
+        dedup (bool): Drop redundant state operators while recording. Disable it
+            when block op ranges are replayed out of order (e.g. as shared forms),
+            since a dropped operator relies on the state left by the previous block.
+
+    Returns:
+        DisplayList: The recorded page, with per-block op ranges.
+    """
+    rec = RecordingCanvas(A4, slot_colors)
+    _draw_blocks(
+        DedupCanvas(rec) if dedup else rec, _fix_plan(layout_plan), ready, _render_context(ui_lang, rtl_mode, theme),
+        cancel=cancel, recorder=rec,
+    )
+    return rec.display_list
+
+def _replay_pdf(dl: DisplayList, bind: Optional[Callable[[Slot], Any]] = None,
+                images: Optional[ImageCache] = None, compression: Optional[str] = None) -> bytes:
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=dl.page_size, pageCompression=canvas_compression(compression))
+    replay(dl, c, bind, images=images)
     c.showPage()
     c.save()
     return buf.getvalue()
 
+def build_palette_variants(
+    data: Dict[str, Any],
+    palettes: Sequence[Mapping[str, Any]],
+    *,
+    ready: Optional[Mapping[str, Any]] = None,
+    cancel: Optional[CancelToken] = None,
+) -> List[bytes]:
+    """
+    Render one PDF per color palette from a single layout pass.
+
+    The blocks run once and their canvas calls are recorded with theme colors
+    kept as symbolic slots; each palette then only replays the recorded calls
+    with its colors bound, so N variants cost one layout plus N emissions.
+
+    Args:
+        data (Dict[str, Any]): Same input as `build_resume_pdf`.
+        palettes (Sequence[Mapping[str, Any]]): Color overrides keyed by
+            COLOR_KEYS names; keys left out keep the theme color.
+        ready (Optional[Mapping[str, Any]]): Shared block data for the profile.
+        cancel (Optional[CancelToken]): Checked between blocks and between variants.
+
+    Returns:
+        List[bytes]: One PDF per palette, in order.
+
+    Raises:
+        ValueError: A palette has an unknown key or an invalid color.
+    """
+    ensure_fonts()
+    parsed = [parse_palette(dict(p)) for p in palettes]
+    theme_dict = load_and_apply(data.get("theme_name") or "default")
+    plan, _cols = _resolve_layout_and_columns_from_inline(data)
+    dl = record_display_list(
+        plan,
+        ready if ready is not None else build_ready_from_profile(
+            data.get("profile") or {}, compression=data.get("compression"),
+        ),
+        ui_lang=data.get("ui_lang") or UI_LANG,
+        rtl_mode=bool(data.get("rtl_mode")),
+        theme=theme_dict,
+        slot_colors=palette_slots(),
+        cancel=cancel,
+    )
+
+    out: List[bytes] = []
+    images = ImageCache()
+    for palette in parsed:
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        bound = bind_palette(palette)
+        pdf = _replay_pdf(dl, lambda slot: bound[slot.key], images, data.get("compression"))
+        out.append(finish_pdf(pdf, **output_options(data)))
+    return out
+
 def _resolve_layout_and_columns_from_inline(data: Dict[str, Any]):
     """
     Determine layout plan and columns from inline layout data.
@@ -0,0 +1,322 @@
+"""
+SVG previews: display lists written as SVG markup for the browser.
+
+`render_svg` lays the resume out once (the same blocks and display list as
+the PDF) and replays it onto an `SvgCanvas`, which turns every canvas call
+into an element: paths (`left_panel_bg`, `decor_curve`, rules, the avatar
+circle) become `<path>`, text runs `<text>`, images `<image>` with a data
+URI, and link annotations transparent `<a>` hotspots. No PDF is written and
+no font is subset, so a preview is mostly string building.
+
+Text keeps the positions and widths ReportLab computed: every run carries
+its advance width as `textLength`, so a browser font with other metrics
+cannot change the line breaks of the layout. Arabic runs arrive shaped and
+in visual order, as they are written into the PDF; the stylesheet turns off
+the browser's bidi reordering so they are not reversed a second time. Runs
+that still contain unshaped Arabic letters (logical order) keep it.
+Registered TrueType fonts are embedded as data URIs (`embed_fonts`), the
+standard PDF fonts map to the usual system families.
+
+Images larger than needed at `IMAGE_SCALE` pixels per point are downsampled
+before they are embedded; encoded images and fonts are cached. Links
+outside http(s), mailto and tel are not turned into anchors.
+"""
+
+from __future__ import annotations
+
+import base64
+import functools
+import re
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+
+from .cancel import CancelToken
+from .page_backend import PageBackend, Segment, record_page, replay_page
+from .raster import _content_key, _decode
+
+# Embedded image pixels per point of drawn size (2 = 144 dpi, sharp on high-density screens).
+IMAGE_SCALE = 2.0
+
+# Standard PDF font families and the CSS families browsers have for them.
+_FAMILIES = {
+    "Helvetica": '"Helvetica Neue",Helvetica,Arial,sans-serif',
+    "Times": '"Times New Roman",Times,serif',
+    "Courier": '"Courier New",Courier,monospace',
+    "Symbol": "Symbol",
+    "ZapfDingbats": "ZapfDingbats",
+}
+
+_LINK_SCHEMES = ("http:", "https:", "mailto:", "tel:")
+
+# Characters XML 1.0 does not allow in text.
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# Arabic letters that shaping replaces with presentation forms; a run with any
+# of them was not shaped and is in logical order.
+_UNSHAPED = re.compile("[\u0621-\u063a\u0641-\u064a]")
+
+_ATTR = {'"': "&quot;"}
+
+# Data URIs of embedded images, keyed by (content, size, alpha).
+_URIS: "OrderedDict[Tuple[str, Tuple[int, int], bool], str]" = OrderedDict()
+_URIS_SIZE = 64
+_URIS_LOCK = threading.Lock()
+
+def _n(v: float) -> str:
+    s = f"{v:.2f}".rstrip("0").rstrip(".")
+    return "0" if s == "-0" else s
+
+def _hex(rgb: Tuple[float, float, float]) -> str:
+    return "#%02x%02x%02x" % tuple(max(0, min(255, round(v * 255))) for v in rgb)
+
+@functools.lru_cache(maxsize=None)
+def _font_file(name: str) -> Optional[str]:
+    try:
+        path = getattr(pdfmetrics.getFont(name).face, "filename", None)
+    except Exception:
+        return None
+    return str(path) if path and str(path).lower().endswith((".ttf", ".otf")) else None
+
+@functools.lru_cache(maxsize=None)
+def _font_css(name: str) -> str:
+    """
+    Returns the CSS declarations (family, weight, style) for a ReportLab font name.
+    """
+    base = name.split("-")[0]
+    if base in _FAMILIES and _font_file(name) is None:
+        style = name[len(base):]
+        css = f"font-family:{_FAMILIES[base]}"
+        if "Bold" in style:
+            css += ";font-weight:bold"
+        if "Oblique" in style or "Italic" in style:
+            css += ";font-style:italic"
+        return css
+    family = name.replace('"', "")
+    return f'font-family:"{family}",sans-serif'
+
+@functools.lru_cache(maxsize=None)
+def _font_face(name: str) -> str:
+    """
+    Returns an @font-face rule embedding a registered TrueType font, or "".
+    """
+    path = _font_file(name)
+    if path is None:
+        return ""
+    with open(path, "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    mime = "font/otf" if path.lower().endswith(".otf") else "font/ttf"
+    family = name.replace('"', "")
+    return f'@font-face{{font-family:"{family}";src:url(data:{mime};base64,{data})}}'
+
+def _sniff(data: bytes) -> Optional[str]:
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+def _raw_bytes(reader: ImageReader) -> Optional[bytes]:
+    fp = getattr(reader, "fp", None)
+    if isinstance(fp, BytesIO):
+        return fp.getvalue()
+    name = getattr(reader, "fileName", None)
+    if isinstance(name, str):
+        try:
+            with open(name, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+    return None
+
+def _encode(reader: ImageReader, size: Tuple[int, int], alpha: bool) -> str:
+    raw = _raw_bytes(reader)
+    mime = _sniff(raw) if raw is not None else None
+    iw, ih = reader.getSize()
+    if mime is not None and iw <= size[0] * 1.5 and ih <= size[1] * 1.5:
+        return f"data:{mime};base64," + base64.b64encode(raw).decode("ascii")
+    im = _decode(reader, alpha)
+    if iw > size[0] or ih > size[1]:
+        im = im.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    out = BytesIO()
+    if im.mode == "RGBA":
+        im.save(out, format="PNG")
+        mime = "image/png"
+    else:
+        im.save(out, format="JPEG", quality=85)
+        mime = "image/jpeg"
+    return f"data:{mime};base64," + base64.b64encode(out.getvalue()).decode("ascii")
+
+def _data_uri(reader: ImageReader, size: Tuple[int, int], alpha: bool) -> str:
+    """
+    Returns the image as a data URI, at most `size` pixels unless the original is close to it.
+    """
+    content = _content_key(reader)
+    key = (content, size, alpha) if content is not None else None
+    if key is not None:
+        with _URIS_LOCK:
+            hit = _URIS.get(key)
+            if hit is not None:
+                _URIS.move_to_end(key)
+                return hit
+    uri = _encode(reader, size, alpha)
+    if key is not None:
+        with _URIS_LOCK:
+            _URIS[key] = uri
+            while len(_URIS) > _URIS_SIZE:
+                _URIS.popitem(last=False)
+    return uri
+
+class SvgCanvas(PageBackend):
+    """
+    Page backend that writes SVG elements.
+
+    Args:
+        pagesize (Tuple[float, float]): Page size in points (also the viewBox).
+        embed_fonts (bool): Embed the registered TrueType fonts that are used.
+    """
+
+    BACKEND = "svg preview"
+
+    def __init__(self, pagesize: Tuple[float, float], embed_fonts: bool = True):
+        super().__init__(pagesize)
+        self.embed_fonts = embed_fonts
+        self._body: List[str] = []
+        self._defs: List[str] = []
+        self._classes: Dict[str, str] = {}
+
+    def _y(self, y: float) -> float:
+        return self.page_size[1] - y
+
+    def _d(self, segments: Sequence[Segment]) -> str:
+        out: List[str] = []
+        for op, v in segments:
+            if op == "Z":
+                out.append("Z")
+            elif op == "C":
+                x1, y1, x2, y2, x3, y3 = v
+                out.append(f"C{_n(x1)} {_n(self._y(y1))} {_n(x2)} {_n(self._y(y2))} {_n(x3)} {_n(self._y(y3))}")
+            else:
+                out.append(f"{op}{_n(v[0])} {_n(self._y(v[1]))}")
+        return "".join(out)
+
+    def _clip_attr(self) -> str:
+        return f' clip-path="url(#{self._clip})"' if self._clip is not None else ""
+
+    def _paint(self, segments: Sequence[Segment], fill: bool, stroke: bool) -> None:
+        if not segments or not (fill or stroke):
+            return
+        attrs = f' fill="{_hex(self.fill_rgb())}"' if fill else ' fill="none"'
+        if fill and self._fillAlpha < 1:
+            attrs += f' fill-opacity="{_n(self._fillAlpha)}"'
+        if stroke:
+            attrs += f' stroke="{_hex(self.stroke_rgb())}" stroke-width="{_n(self._lineWidth)}"'
+            if self._strokeAlpha < 1:
+                attrs += f' stroke-opacity="{_n(self._strokeAlpha)}"'
+        self._body.append(f'<path d="{self._d(segments)}"{attrs}{self._clip_attr()}/>')
+
+    def _font_class(self) -> str:
+        cls = self._classes.get(self._fontname)
+        if cls is None:
+            cls = self._classes[self._fontname] = f"f{len(self._classes)}"
+        return cls
+
+    def _text(self, x: float, y: float, text: str) -> None:
+        text = _XML_INVALID.sub("", text)
+        if not text.strip():
+            return
+        cls = self._font_class() + (" bidi" if _UNSHAPED.search(text) else "")
+        attrs = f' class="{cls}" font-size="{_n(self._fontsize)}"'
+        rgb = self.fill_rgb()
+        if rgb != (0, 0, 0):
+            attrs += f' fill="{_hex(rgb)}"'
+        if self._fillAlpha < 1:
+            attrs += f' fill-opacity="{_n(self._fillAlpha)}"'
+        width = self._width(text)
+        if width > 0:
+            attrs += f' textLength="{_n(width)}" lengthAdjust="spacingAndGlyphs"'
+        self._body.append(f'<text x="{_n(x)}" y="{_n(self._y(y))}"{attrs}{self._clip_attr()}>{escape(text)}</text>')
+
+    def _image(self, image: ImageReader, x: float, y: float, w: float, h: float, mask: Any) -> None:
+        if w <= 0 or h <= 0:
+            return
+        size = (max(1, round(w * IMAGE_SCALE)), max(1, round(h * IMAGE_SCALE)))
+        uri = _data_uri(image, size, mask == "auto")
+        opacity = f' opacity="{_n(self._fillAlpha)}"' if self._fillAlpha < 1 else ""
+        self._body.append(
+            f'<image x="{_n(x)}" y="{_n(self._y(y + h))}" width="{_n(w)}" height="{_n(h)}" '
+            f'preserveAspectRatio="none" href="{uri}"{opacity}{self._clip_attr()}/>'
+        )
+
+    def _clip_to(self, segments: Sequence[Segment]) -> str:
+        # A clipPath carrying the previous clip intersects the two.
+        cid = f"c{len(self._defs)}"
+        self._defs.append(f'<clipPath id="{cid}"{self._clip_attr()}><path d="{self._d(segments)}"/></clipPath>')
+        return cid
+
+    def _link(self, url: str, rect: Tuple[float, float, float, float]) -> None:
+        if not isinstance(url, str) or not url.lower().startswith(_LINK_SCHEMES):
+            return
+        x1, y1, x2, y2 = rect
+        self._body.append(
+            f'<a href="{escape(url, _ATTR)}" target="_blank">'
+            f'<rect x="{_n(x1)}" y="{_n(self._y(y2))}" width="{_n(x2 - x1)}" height="{_n(y2 - y1)}" '
+            f'fill="#fff" fill-opacity="0"/></a>'
+        )
+
+    def getvalue(self) -> str:
+        """
+        Returns the SVG document drawn so far.
+        """
+        w, h = self.page_size
+        css = ["text{white-space:pre;direction:ltr;unicode-bidi:bidi-override}", ".bidi{unicode-bidi:normal}"]
+        for name, cls in self._classes.items():
+            if self.embed_fonts:
+                face = _font_face(name)
+                if face:
+                    css.append(face)
+            css.append(f".{cls}{{{_font_css(name)}}}")
+        return "".join([
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{_n(w)}pt" height="{_n(h)}pt" '
+            f'viewBox="0 0 {_n(w)} {_n(h)}">',
+            f"<defs><style>{''.join(css)}</style>{''.join(self._defs)}</defs>",
+            f'<rect width="{_n(w)}" height="{_n(h)}" fill="#fff"/>',
+            *self._body,
+            "</svg>",
+        ])
+
+def render_svg(data: Dict[str, Any], *, embed_fonts: bool = True, ready: Optional[Any] = None,
+               cancel: Optional[CancelToken] = None) -> bytes:
+    """
+    Renders the first page of a resume as an SVG document.
+
+    Args:
+        data (Dict[str, Any]): Same input as `build_resume_pdf`; the PDF output
+            options (linearize, compact, compression) do not apply.
+        embed_fonts (bool): Embed the TrueType fonts used (e.g. the Arabic font);
+            without them the browser falls back to its own fonts.
+        ready (Optional[Any]): Shared block data for the profile.
+        cancel (Optional[CancelToken]): Checked between blocks.
+
+    Returns:
+        bytes: UTF-8 encoded SVG.
+
+    Raises:
+        RenderCancelled: If `cancel` fires before the last block is drawn.
+    """
+    dl = record_page(data, ready, cancel)
+    c = SvgCanvas(dl.page_size, embed_fonts)
+    replay_page(dl, c)
+    return c.getvalue().encode("utf-8")
+
+__all__ = ["IMAGE_SCALE", "SvgCanvas", "render_svg"]
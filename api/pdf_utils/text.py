@@ -3,6 +3,7 @@ from reportlab.pdfgen import canvas
 from reportlab.pdfbase import pdfmetrics
 
 from .fonts import rtl
+from .text_batch import TextBatch
 from .config import LEADING_BODY, LEADING_BODY_RTL, GAP_BETWEEN_PARAS
 
 def wrap_text(text: str, font: str, size: int, max_w: float) -> List[str]:
@@ -68,6 +69,8 @@ def draw_par(
     """
     Render paragraphs with wrapping, alignment, and spacing.
 
+    All lines are emitted into a single text object (see `TextBatch`).
+
     Args:
         c (canvas.Canvas): The PDF canvas.
         x (float): Starting X-coordinate.
@@ -84,22 +87,23 @@ def draw_par(
     Returns:
         float: New Y-coordinate after rendering.
     """
-    c.setFont(font, size)
     cur = y
     line_gap = leading if leading is not None else (
         LEADING_BODY_RTL if (rtl_mode and align == "right") else LEADING_BODY
     )
     gap_between_paras = GAP_BETWEEN_PARAS if para_gap is None else para_gap
 
-    for raw in lines:
-        txt = rtl(raw) if (rtl_mode and align == "right") else raw
-        wrapped = wrap_text(txt, font, size, max_w) if txt else [""]
-        for ln in wrapped:
-            if align == "right":
-                c.drawRightString(x + max_w, cur, ln)
-            else:
-                c.drawString(x, cur, ln)
-            cur -= line_gap
-        cur -= gap_between_paras
+    with TextBatch(c) as tb:
+        tb.set_font(font, size)
+        for raw in lines:
+            txt = rtl(raw) if (rtl_mode and align == "right") else raw
+            wrapped = wrap_text(txt, font, size, max_w) if txt else [""]
+            for ln in wrapped:
+                if align == "right":
+                    tb.draw_right_string(x + max_w, cur, ln)
+                else:
+                    tb.draw_string(x, cur, ln)
+                cur -= line_gap
+            cur -= gap_between_paras
 
     return cur
\ No newline at end of file
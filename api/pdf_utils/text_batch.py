@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from typing import Any, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+
+def _color_key(value: Any) -> Any:
+    """
+    Normalize a color value so that equal colors compare equal.
+
+    Args:
+        value (Any): ReportLab color, hex string, or RGB tuple.
+
+    Returns:
+        Any: A comparable color object (or the raw value if it cannot be converted).
+    """
+    try:
+        return colors.toColor(value)
+    except Exception:
+        return value
+
+class TextBatch:
+    """
+    Group consecutive text lines of a block into a single ReportLab text object.
+
+    `c.drawString` opens a new BT/ET pair for every line and relies on separate
+    font and color operators. A batch keeps one text object open, positions
+    each line with a relative move from the previous line, and only emits font
+    or fill changes when they differ from the current state.
+
+    Path and image operators are not allowed inside a text object, so draw
+    bullets, rules and icons before or after the batch (or call `flush()`).
+
+    Usage:
+        with TextBatch(c) as tb:
+            tb.set_font("Helvetica", 10)
+            tb.draw_string(x, y, "first line")
+            tb.draw_string(x, y - 14, "second line")
+    """
+
+    def __init__(self, c: canvas.Canvas):
+        self._c = c
+        self._t = None
+        self._font: Tuple[str, float] = (c._fontname, c._fontsize)
+        self._leading: float = c._leading
+        self._fill: Any = _color_key(c._fillColorObj)
+        self._pending_font: Optional[Tuple[str, float]] = None
+        self._pending_fill: Any = None
+        self._line_x = 0.0
+        self._line_y = 0.0
+        self.lines = 0
+
+    def __enter__(self) -> "TextBatch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+    @property
+    def font(self) -> Tuple[str, float]:
+        """Return the (font name, size) that the next line will be drawn with."""
+        return self._pending_font or self._font
+
+    def set_font(self, name: str, size: float) -> None:
+        """
+        Select the font for the following lines.
+
+        Args:
+            name (str): Font name.
+            size (float): Font size.
+        """
+        want = (name, size)
+        self._pending_font = None if want == self._font else want
+
+    def set_fill(self, color: Any) -> None:
+        """
+        Select the fill (text) color for the following lines.
+
+        Args:
+            color (Any): ReportLab color, hex string, or RGB tuple.
+        """
+        want = _color_key(color)
+        self._pending_fill = None if want == self._fill else want
+
+    def string_width(self, text: str) -> float:
+        """
+        Measure a string with the font of the next line.
+
+        Args:
+            text (str): Text to measure.
+
+        Returns:
+            float: Width in points.
+        """
+        name, size = self.font
+        return pdfmetrics.stringWidth(text, name, size)
+
+    def draw_string(self, x: float, y: float, text: str) -> None:
+        """
+        Draw a left-aligned line starting at (x, y).
+
+        Args:
+            x (float): X-coordinate of the line start.
+            y (float): Baseline Y-coordinate.
+            text (str): Text to draw.
+        """
+        t = self._t
+        if t is None:
+            t = self._t = self._c.beginText(x, y)
+        else:
+            t.moveCursor(x - self._line_x, self._line_y - y)
+        self._line_x, self._line_y = x, y
+
+        if self._pending_font is not None:
+            name, size = self._pending_font
+            t.setFont(name, size)
+            self._font, self._leading = self._pending_font, size * 1.2
+            self._pending_font = None
+        if self._pending_fill is not None:
+            t.setFillColor(self._pending_fill)
+            self._fill = self._pending_fill
+            self._pending_fill = None
+
+        t.textOut(text)
+        self.lines += 1
+
+    def draw_right_string(self, x: float, y: float, text: str) -> None:
+        """
+        Draw a line whose right edge ends at x.
+
+        Args:
+            x (float): X-coordinate of the right edge.
+            y (float): Baseline Y-coordinate.
+            text (str): Text to draw.
+        """
+        self.draw_string(x - self.string_width(text), y, text)
+
+    def draw_centred_string(self, x: float, y: float, text: str) -> None:
+        """
+        Draw a line centred on x.
+
+        Args:
+            x (float): X-coordinate of the centre.
+            y (float): Baseline Y-coordinate.
+            text (str): Text to draw.
+        """
+        self.draw_string(x - self.string_width(text) / 2.0, y, text)
+
+    def flush(self) -> None:
+        """
+        Close the open text object and write it to the canvas.
+
+        Font and fill changes made inside the text object persist in the PDF
+        graphics state, so the canvas bookkeeping is updated to match. Pending
+        changes that were never followed by a line are applied to the canvas.
+        """
+        c = self._c
+        if self._t is not None:
+            c.drawText(self._t)
+            self._t = None
+            c._fontname, c._fontsize = self._font
+            c._leading = self._leading
+            c._fillColorObj = self._fill
+        if self._pending_font is not None:
+            c.setFont(*self._pending_font)
+            self._font, self._leading = self._pending_font, c._leading
+            self._pending_font = None
+        if self._pending_fill is not None:
+            c.setFillColor(self._pending_fill)
+            self._fill = self._pending_fill
+            self._pending_fill = None
+
+__all__ = ["TextBatch"]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from reportlab.lib import colors
 from reportlab.lib.units import mm
@@ -13,6 +13,7 @@ from . import config as cfg
 THEMES_DIR = Path(__file__).resolve().parents[2] / "themes"
 
 Number = Union[int, float]
+Assignments = List[Tuple[str, Any]]
 
 def _to_hex_color(val: str | Number | tuple) -> colors.Color:
     """
@@ -92,6 +93,74 @@ COLOR_KEYS = {
     "LEFT_SEC_RULE_COLOR", "RIGHT_SEC_RULE_COLOR",
 }
 
+# Blocks import their colors from config when they are first loaded, before
+# any theme is applied, so these are the colors that actually reach the page.
+# Palette variants (see `parse_palette`) rebind them on replay.
+BLOCK_COLORS: Dict[str, colors.Color] = {k: getattr(cfg, k) for k in COLOR_KEYS if hasattr(cfg, k)}
+
+# Slot precedence when several keys share one block color (e.g. EDU_TITLE_COLOR
+# defaults to SUBHEAD_COLOR): the first key names the slot, the others are aliases.
+_SLOT_ORDER = [
+    "HEADING_COLOR", "SUBHEAD_COLOR", "MUTED", "RULE_COLOR", "LEFT_BG", "LEFT_BORDER",
+    "EDU_TITLE_COLOR", "LEFT_SEC_RULE_COLOR", "RIGHT_SEC_RULE_COLOR",
+]
+
+def palette_slots() -> Dict[str, str]:
+    """
+    Map block colors to color slot names for display-list recording.
+
+    Returns:
+        Dict[str, str]: Color hexval ("0xrrggbb") -> slot key.
+    """
+    slots: Dict[str, str] = {}
+    for key in _SLOT_ORDER:
+        if key in BLOCK_COLORS:
+            slots.setdefault(BLOCK_COLORS[key].hexval().lower(), key)
+    return slots
+
+def parse_palette(palette: Dict[str, Any]) -> Dict[str, colors.Color]:
+    """
+    Parse a palette of color overrides keyed by COLOR_KEYS names (case-insensitive).
+
+    Args:
+        palette (Dict[str, Any]): e.g. {"HEADING_COLOR": "#1D4ED8", "muted": "#555"}.
+
+    Returns:
+        Dict[str, colors.Color]: Parsed colors by upper-case key.
+
+    Raises:
+        ValueError: Unknown key or unparsable color.
+    """
+    out: Dict[str, colors.Color] = {}
+    for key, val in (palette or {}).items():
+        name = str(key).upper()
+        if name not in COLOR_KEYS:
+            raise ValueError(f"unknown palette key {key!r} (expected one of {sorted(COLOR_KEYS)})")
+        try:
+            out[name] = _to_hex_color(val)
+        except Exception:
+            raise ValueError(f"invalid color for {key!r}: {val!r}")
+    return out
+
+def bind_palette(palette: Dict[str, colors.Color]) -> Dict[str, colors.Color]:
+    """
+    Resolve every color slot for a parsed palette.
+
+    A slot takes the palette color of its own key, else of one of its aliases,
+    else keeps the block color.
+
+    Args:
+        palette (Dict[str, colors.Color]): Output of `parse_palette`.
+
+    Returns:
+        Dict[str, colors.Color]: Slot key -> color.
+    """
+    bound: Dict[str, colors.Color] = {}
+    for hexval, slot in palette_slots().items():
+        keys = [slot] + [k for k in _SLOT_ORDER if k != slot and BLOCK_COLORS.get(k, colors.black).hexval().lower() == hexval]
+        bound[slot] = next((palette[k] for k in keys if k in palette), BLOCK_COLORS[slot])
+    return bound
+
 PT_KEYS = {
     "HEADING_SIZE", "TEXT_SIZE", "NAME_SIZE",
     "LEFT_TEXT_SIZE", "LEFT_SEC_HEADING_SIZE", "LEFT_SEC_TEXT_SIZE",
@@ -119,60 +188,82 @@ BOOL_KEYS = {"LEFT_TEXT_IS_BOLD", "USE_LINKEDIN_REDIRECT", "USE_MOBILE_LINKEDIN"
 
 FONT_KEYS = {"AR_FONT", "LATIN_FONT", "LATIN_BOLD_FONT"}
 
-def _apply_style_map(style: Dict[str, Any]) -> None:
+def _compile_style_map(style: Dict[str, Any], out: Assignments) -> None:
     for key, val in (style or {}).items():
         try:
             if key in COLOR_KEYS:
-                setattr(cfg, key, _to_hex_color(val))
+                out.append((key, _to_hex_color(val)))
             elif key in MM_KEYS:
-                setattr(cfg, key, _parse_number_with_mm(val))
+                out.append((key, _parse_number_with_mm(val)))
             elif key in PT_KEYS:
-                setattr(cfg, key, float(val))
+                out.append((key, float(val)))
             elif key in STRING_KEYS:
-                setattr(cfg, key, str(val))
+                out.append((key, str(val)))
             elif key in BOOL_KEYS:
-                setattr(cfg, key, bool(val))
+                out.append((key, bool(val)))
             elif key in FONT_KEYS:
-                setattr(cfg, key, str(val))
+                out.append((key, str(val)))
         except Exception as e:
             print(f"[WARN] Failed to apply style key {key}={val!r}: {e}")
 
-def _apply_legacy_sections(theme: dict) -> None:
+def _compile_legacy_sections(theme: dict, out: Assignments) -> None:
     for k, v in (theme.get("colors") or {}).items():
         if k.lower() in {"heading", "heading_color"}:
-            cfg.HEADING_COLOR = _to_hex_color(v)
+            out.append(("HEADING_COLOR", _to_hex_color(v)))
         elif k.lower() in {"subhead", "subhead_color"}:
-            cfg.SUBHEAD_COLOR = _to_hex_color(v)
+            out.append(("SUBHEAD_COLOR", _to_hex_color(v)))
         elif k.lower() in {"text", "muted", "body"}:
-            cfg.MUTED = _to_hex_color(v)
+            out.append(("MUTED", _to_hex_color(v)))
         elif k.lower() in {"rule", "rule_color"}:
-            cfg.RULE_COLOR = _to_hex_color(v)
+            out.append(("RULE_COLOR", _to_hex_color(v)))
         elif k.lower() in {"left_bg", "panel_bg"}:
-            cfg.LEFT_BG = _to_hex_color(v)
+            out.append(("LEFT_BG", _to_hex_color(v)))
         elif k.lower() in {"left_border", "panel_border"}:
-            cfg.LEFT_BORDER = _to_hex_color(v)
+            out.append(("LEFT_BORDER", _to_hex_color(v)))
 
     for k, v in (theme.get("sizes") or {}).items():
         name = k.upper()
         try:
-            setattr(cfg, name, float(v))
+            out.append((name, float(v)))
         except Exception:
             pass
 
     for k, v in (theme.get("spacing") or {}).items():
         name = k.upper()
         try:
-            setattr(cfg, name, float(v))
+            out.append((name, float(v)))
         except Exception:
             pass
 
     for k, v in (theme.get("fonts") or {}).items():
         name = k.upper()
         try:
-            setattr(cfg, name, str(v))
+            out.append((name, str(v)))
         except Exception:
             pass
 
+def compile_theme_assignments(theme: dict) -> Assignments:
+    """
+    Convert a theme dictionary into the ordered list of config assignments it implies.
+
+    Colors, sizes and mm values are parsed once here, so applying a compiled
+    theme is a plain sequence of setattr calls.
+
+    Args:
+        theme (dict): Theme dictionary.
+
+    Returns:
+        Assignments: (config attribute, parsed value) pairs in application order.
+    """
+    out: Assignments = []
+    _compile_legacy_sections(theme, out)
+    _compile_style_map(theme.get("style") or {}, out)
+    return out
+
+def _apply_assignments(assignments: Assignments) -> None:
+    for name, value in assignments:
+        setattr(cfg, name, value)
+
 def apply_theme_to_config(theme: dict) -> None:
     """
     Apply theme settings to the global configuration module.
@@ -180,9 +271,42 @@ def apply_theme_to_config(theme: dict) -> None:
     Args:
         theme (dict): Theme dictionary to apply.
     """
-    _apply_legacy_sections(theme)
-    style = theme.get("style") or {}
-    _apply_style_map(style)
+    _apply_assignments(compile_theme_assignments(theme))
+
+# ============================================================
+# Compiled theme cache
+# ============================================================
+_COMPILED: Dict[str, Tuple[dict, Assignments]] = {}
+
+def compile_theme(theme_name: Optional[str]) -> Tuple[dict, Assignments]:
+    """
+    Load, merge and parse a theme once, then serve it from the cache.
+
+    Args:
+        theme_name (Optional[str]): Theme name to compile.
+
+    Returns:
+        Tuple[dict, Assignments]: The merged theme dictionary (treat as read-only)
+            and its parsed config assignments.
+    """
+    key = theme_name or ""
+    hit = _COMPILED.get(key)
+    if hit is None:
+        theme = load_theme(theme_name)
+        hit = _COMPILED[key] = (theme, compile_theme_assignments(theme))
+    return hit
+
+def clear_theme_cache(theme_name: Optional[str] = None) -> None:
+    """
+    Drop compiled themes so they are rebuilt from disk on next use.
+
+    Args:
+        theme_name (Optional[str]): Only drop this theme; drops all when None.
+    """
+    if theme_name is None:
+        _COMPILED.clear()
+    else:
+        _COMPILED.pop(theme_name, None)
 
 def load_and_apply(theme_name: Optional[str]) -> dict:
     """
@@ -192,8 +316,8 @@ def load_and_apply(theme_name: Optional[str]) -> dict:
         theme_name (Optional[str]): Theme name to load.
 
     Returns:
-        dict: Loaded theme dictionary.
+        dict: Loaded theme dictionary (shared, treat as read-only).
     """
-    theme = load_theme(theme_name)
-    apply_theme_to_config(theme)
-    return theme
\ No newline at end of file
+    theme, assignments = compile_theme(theme_name)
+    _apply_assignments(assignments)
+    return theme
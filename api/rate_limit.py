@@ -0,0 +1,219 @@
+"""
+Per-client token-bucket rate limiting for the generate routes.
+
+Clients are identified by their API key header when the key is listed in the
+policy file, otherwise by their IP address (unknown keys are ignored, so a
+caller cannot get a fresh bucket, or another client's policy, by making up a
+key). Each client gets a token bucket (sustained rate plus burst) and a
+scheduling weight that the render queue uses to share workers round-robin.
+`max_priority` caps the render lane a client may ask for with
+X-Render-Priority (default standard), so only trusted clients, such as the
+Streamlit app on localhost, can use the interactive lane.
+
+Policies come from the environment, with optional overrides in a JSON file;
+`api_keys` are matched against the key header, `clients` against the IP:
+
+    {
+        "default": {"rate": 2, "burst": 10, "weight": 1, "max_priority": "standard"},
+        "api_keys": {
+            "partner-batch-key": {"rate": 5, "burst": 50, "weight": 1}
+        },
+        "clients": {
+            "127.0.0.1": {"weight": 3, "max_priority": "interactive"}
+        }
+    }
+
+Routes resolve the caller with the `identify_client` dependency and charge
+its bucket with `admit` once the request body is valid, so rejected (422)
+requests and answers served from a cache (previews, 304) cost no token.
+
+Environment Variables:
+    RATE_LIMIT_RATE: Tokens added per second (default 2; 0 disables limiting).
+    RATE_LIMIT_BURST: Bucket size (default 10).
+    CLIENT_KEY_HEADER: Header carrying the API key (default X-API-Key).
+    CLIENT_POLICY_FILE: Override file (default config/client_policies.json, optional).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from .render_queue import cap_priority, normalize_priority
+
+ROOT = Path(__file__).resolve().parents[1]
+
+@dataclass(frozen=True)
+class ClientPolicy:
+    rate: float = 2.0
+    burst: float = 10.0
+    weight: int = 1
+    max_priority: str = "standard"
+
+@dataclass(frozen=True)
+class Client:
+    """
+    Identity, scheduling weight and highest render lane of the caller, as resolved by `identify_client`.
+    """
+    id: str
+    weight: int = 1
+    max_priority: str = "standard"
+
+    def priority(self, requested: Optional[str]) -> str:
+        """
+        Returns the render lane for a requested priority, capped at `max_priority`.
+        """
+        return cap_priority(requested, self.max_priority)
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float, cost: float = 1.0) -> float:
+        """
+        Takes `cost` tokens if available.
+
+        Returns:
+            float: 0.0 when admitted, otherwise seconds until enough tokens accrue.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+class ClientLimiter:
+    """
+    Holds one token bucket per client and resolves per-client policies.
+
+    Args:
+        default (ClientPolicy): Policy for clients without an override.
+        overrides (Dict[str, ClientPolicy]): Policies keyed by IP.
+        key_header (str): Header carrying the API key.
+        keys (Dict[str, ClientPolicy]): Policies of the accepted API keys.
+    """
+
+    # Buckets idle this long are full again and can be dropped.
+    IDLE_SECONDS = 600.0
+
+    def __init__(self, default: ClientPolicy, overrides: Optional[Dict[str, ClientPolicy]] = None,
+                 key_header: str = "X-API-Key", keys: Optional[Dict[str, ClientPolicy]] = None):
+        self.default = default
+        self.overrides = overrides or {}
+        self.key_header = key_header
+        self.keys = keys or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+        self.limited = 0
+
+    @classmethod
+    def from_env(cls) -> "ClientLimiter":
+        """
+        Builds a limiter from RATE_LIMIT_* variables and the optional CLIENT_POLICY_FILE.
+        """
+        default = ClientPolicy(
+            rate=float(os.getenv("RATE_LIMIT_RATE", "2")),
+            burst=float(os.getenv("RATE_LIMIT_BURST", "10")),
+        )
+        overrides: Dict[str, ClientPolicy] = {}
+        keys: Dict[str, ClientPolicy] = {}
+        path = Path(os.getenv("CLIENT_POLICY_FILE", str(ROOT / "config" / "client_policies.json")))
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                default = replace(default, **(data.get("default") or {}))
+                for key, cfg in (data.get("api_keys") or {}).items():
+                    keys[str(key)] = replace(default, **cfg)
+                for ip, cfg in (data.get("clients") or {}).items():
+                    overrides[str(ip)] = replace(default, **cfg)
+            except Exception as e:
+                print(f"[WARN] Failed to load client policies from {path}: {e}")
+        return cls(default, overrides, os.getenv("CLIENT_KEY_HEADER", "X-API-Key"), keys)
+
+    def identify(self, request: Request) -> str:
+        """
+        Returns `key:<api key>` for a configured API key, otherwise the client IP.
+        """
+        key = (request.headers.get(self.key_header) or "").strip()
+        if key and key in self.keys:
+            return f"key:{key}"
+        return request.client.host if request.client else "unknown"
+
+    def policy(self, client_id: str) -> ClientPolicy:
+        if client_id.startswith("key:"):
+            return self.keys.get(client_id[4:], self.default)
+        return self.overrides.get(client_id, self.default)
+
+    def check(self, client_id: str) -> float:
+        """
+        Charges one request to the client's bucket.
+
+        Returns:
+            float: 0.0 when admitted, otherwise seconds until the client may retry.
+        """
+        pol = self.policy(client_id)
+        if pol.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = self._buckets[client_id] = TokenBucket(pol.rate, pol.burst, now)
+            wait = bucket.take(now)
+            if wait:
+                self.limited += 1
+            if now - self._last_prune > self.IDLE_SECONDS:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now: float) -> None:
+        self._last_prune = now
+        for cid in [c for c, b in self._buckets.items() if now - b.updated > self.IDLE_SECONDS]:
+            del self._buckets[cid]
+
+    def stats(self) -> Dict[str, float]:
+        return {"clients_tracked": len(self._buckets), "rate_limited": self.limited}
+
+LIMITER = ClientLimiter.from_env()
+
+async def identify_client(request: Request) -> Client:
+    """
+    FastAPI dependency: identifies the caller without charging its bucket (see `admit`).
+    """
+    client_id = LIMITER.identify(request)
+    pol = LIMITER.policy(client_id)
+    return Client(id=client_id, weight=max(1, pol.weight), max_priority=normalize_priority(pol.max_priority))
+
+def admit(client: Client) -> None:
+    """
+    Charges one request to the client's token bucket.
+
+    Called by a route once the request is valid and cannot be answered from a cache.
+
+    Raises:
+        HTTPException: 429 with Retry-After when the client is over its rate.
+    """
+    wait = LIMITER.check(client.id)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+__all__ = ["Client", "ClientLimiter", "ClientPolicy", "LIMITER", "TokenBucket", "admit", "identify_client"]
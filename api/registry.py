@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -103,16 +107,216 @@ def make_str_enum(enum_name: str, values: list[str]) -> type[Enum]:
     mapping = {v: v for v in values}
     return Enum(enum_name, mapping, type=str)
 
-THEME_NAMES = load_theme_names()
-LAYOUT_NAMES = load_layout_names()
-UI_LANG_OBJS = load_ui_langs()
-UI_LANGS = [x["code"] for x in UI_LANG_OBJS]
-RTL_LANGS = {x["code"] for x in UI_LANG_OBJS if x.get("rtl")}
+def _pick_defaults(themes: list[str], layouts: list[str], langs: list[str]) -> tuple[str, str, str]:
+    theme = "default" if "default" in themes else (themes[0] if themes else "default")
+    layout = "single-column" if "single-column" in layouts else (layouts[0] if layouts else "single-column")
+    ui = "ar" if "ar" in langs else (langs[0] if langs else "ar")
+    return theme, layout, ui
 
-ThemeNameEnum = make_str_enum("ThemeNameEnum", THEME_NAMES)
-LayoutNameEnum = make_str_enum("LayoutNameEnum", LAYOUT_NAMES)
-UILangEnum = make_str_enum("UILangEnum", UI_LANGS)
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """
+    Immutable view of the available themes, layouts and UI languages.
+
+    A new snapshot is built on every reload and swapped in as a whole, so a
+    request always sees one consistent set of names and defaults.
+    """
+    version: int
+    theme_names: List[str]
+    layout_names: List[str]
+    ui_lang_objs: List[dict]
+    ui_langs: List[str]
+    rtl_langs: frozenset
+    default_theme: str
+    default_layout: str
+    default_ui: str
+
+def build_snapshot(version: int = 1) -> RegistrySnapshot:
+    """
+    Scans themes/, layouts/ and config/ui_langs.json and returns a fresh snapshot.
+
+    Args:
+        version (int): Version number to stamp on the snapshot.
+
+    Returns:
+        RegistrySnapshot: The current registry contents.
+    """
+    themes = load_theme_names()
+    layouts = load_layout_names()
+    lang_objs = load_ui_langs()
+    langs = [x["code"] for x in lang_objs]
+    d_theme, d_layout, d_ui = _pick_defaults(themes, layouts, langs)
+    return RegistrySnapshot(
+        version=version,
+        theme_names=themes,
+        layout_names=layouts,
+        ui_lang_objs=lang_objs,
+        ui_langs=langs,
+        rtl_langs=frozenset(x["code"] for x in lang_objs if x.get("rtl")),
+        default_theme=d_theme,
+        default_layout=d_layout,
+        default_ui=d_ui,
+    )
+
+# Files whose changes trigger a reload: (directory, glob pattern).
+WATCHED: Tuple[Tuple[Path, str], ...] = (
+    (ROOT / "themes", "*.theme.json*"),
+    (ROOT / "layouts", "*.layout.json*"),
+    (ROOT / "config", "ui_langs.json"),
+)
+
+def _scan() -> Dict[Path, Tuple[int, int]]:
+    stamps: Dict[Path, Tuple[int, int]] = {}
+    for folder, pattern in WATCHED:
+        for p in folder.glob(pattern):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            stamps[p] = (st.st_size, st.st_mtime_ns)
+    return stamps
+
+def theme_name_for(path: Path) -> Optional[str]:
+    """
+    Returns the theme name a file under themes/ belongs to, or None.
+    """
+    name = path.name.removesuffix(".fixed")
+    return name.removesuffix(".theme.json") if name.endswith(".theme.json") else None
+
+def layout_name_for(path: Path) -> Optional[str]:
+    """
+    Returns the layout name a file under layouts/ belongs to, or None.
+    """
+    name = path.name.removesuffix(".fixed")
+    return name.removesuffix(".layout.json") if name.endswith(".layout.json") else None
+
+RegistryListener = Callable[[RegistrySnapshot, List[Path]], None]
+
+class RegistryService:
+    """
+    Keeps the registry current by polling the watched files with os.stat.
+
+    On a change it builds a new `RegistrySnapshot`, swaps it in atomically and
+    notifies subscribers with the list of changed files, so caches can drop
+    only the entries that depend on those files.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stamps = _scan()
+        self.current = build_snapshot(1)
+        self._listeners: List[RegistryListener] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, listener: RegistryListener) -> None:
+        """
+        Registers a callback invoked as listener(snapshot, changed_paths) after each reload.
+        """
+        self._listeners.append(listener)
+
+    def poll(self) -> List[Path]:
+        """
+        Checks the watched files once and reloads if anything changed.
+
+        Returns:
+            List[Path]: Files that were added, removed or modified.
+        """
+        with self._lock:
+            stamps = _scan()
+            changed = sorted(p for p in set(stamps) | set(self._stamps) if stamps.get(p) != self._stamps.get(p))
+            if not changed:
+                return []
+            self._stamps = stamps
+            snap = build_snapshot(self.current.version + 1)
+            self.current = snap
+            _publish(snap)
+        print(f"[Registry] reloaded v{snap.version}: {[p.name for p in changed]}")
+        for listener in list(self._listeners):
+            try:
+                listener(snap, changed)
+            except Exception as e:
+                print(f"[WARN] Registry listener {listener!r} failed: {e}")
+        return changed
+
+    def fingerprint(self, theme_name: Optional[str], layout_name: Optional[str]) -> List[Tuple[str, int, int]]:
+        """
+        Returns (file name, size, mtime) of the watched files a theme/layout pair is drawn from.
+
+        Covers the theme file, the layout file and config/ui_langs.json, so a
+        cache keyed on it survives reloads caused by unrelated themes or
+        layouts, unlike one keyed on `current.version`.
+
+        Args:
+            theme_name (Optional[str]): Theme used by the render.
+            layout_name (Optional[str]): Layout used by the render, or None.
+
+        Returns:
+            List[Tuple[str, int, int]]: Stamps of the matching files, sorted by path.
+        """
+        with self._lock:
+            stamps = sorted(self._stamps.items())
+        return [
+            (p.name, size, mtime)
+            for p, (size, mtime) in stamps
+            if (theme_name and theme_name_for(p) == theme_name)
+            or (layout_name and layout_name_for(p) == layout_name)
+            or p.name == "ui_langs.json"
+        ]
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """
+        Starts background polling.
+
+        Args:
+            interval (Optional[float]): Seconds between polls. Defaults to the
+                REGISTRY_POLL_SECONDS environment variable (2.0); 0 disables polling.
+        """
+        if interval is None:
+            interval = float(os.getenv("REGISTRY_POLL_SECONDS", "2.0"))
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"[WARN] Registry poll failed: {e}")
+
+        self._thread = threading.Thread(target=_loop, name="registry-poll", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops background polling.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+def _publish(snap: RegistrySnapshot) -> None:
+    """
+    Mirrors a snapshot into the module-level names kept for backwards compatibility.
+
+    Code that needs live values should read `REGISTRY.current` instead of
+    importing these names, since `from api.registry import X` binds the value once.
+    """
+    globals().update(
+        THEME_NAMES=snap.theme_names,
+        LAYOUT_NAMES=snap.layout_names,
+        UI_LANG_OBJS=snap.ui_lang_objs,
+        UI_LANGS=snap.ui_langs,
+        RTL_LANGS=set(snap.rtl_langs),
+        ThemeNameEnum=make_str_enum("ThemeNameEnum", snap.theme_names),
+        LayoutNameEnum=make_str_enum("LayoutNameEnum", snap.layout_names),
+        UILangEnum=make_str_enum("UILangEnum", snap.ui_langs),
+        DEFAULT_THEME=snap.default_theme,
+        DEFAULT_LAYOUT=snap.default_layout,
+        DEFAULT_UI=snap.default_ui,
+    )
 
-DEFAULT_THEME = "default" if "default" in THEME_NAMES else (THEME_NAMES[0] if THEME_NAMES else "default")
-DEFAULT_LAYOUT = "single-column" if "single-column" in LAYOUT_NAMES else (LAYOUT_NAMES[0] if LAYOUT_NAMES else "single-column")
-DEFAULT_UI = "ar" if "ar" in UI_LANGS else (UI_LANGS[0] if UI_LANGS else "ar")
\ No newline at end of file
+REGISTRY = RegistryService()
+_publish(REGISTRY.current)
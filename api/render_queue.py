@@ -0,0 +1,457 @@
+"""
+Bounded admission queue in front of the PDF renderer.
+
+Renders run on a small dedicated thread pool instead of the event loop.
+Every request is tagged with a priority class (`interactive`, `standard` or
+`bulk`), and each class has its own lane with a bounded depth. Inside a lane
+every client has its own FIFO, and free workers are handed out round-robin
+across clients (a client with weight N gets up to N grants per turn), so one
+heavy client cannot starve the others.
+
+Lanes are served either in strict priority order or by weight, and a number
+of workers can be reserved for interactive renders, so previews stay fast
+while a large batch is running. Reservation needs at least two workers: with
+the default single worker nothing is reserved, and an interactive render that
+arrives while a bulk render is running waits for it to finish (it still goes
+ahead of every other waiting request under the strict policy). When a lane is full, or a request cannot get
+a worker before its deadline, it is rejected right away with `QueueRejected`
+so the route can answer 503 with a Retry-After hint instead of letting
+latency grow unbounded. A request whose CancelToken is cancelled while it
+waits is dropped from its lane before it starts.
+
+All bookkeeping happens on the event loop thread, so no locks are needed.
+
+Environment Variables:
+    RENDER_WORKERS: Concurrent renders (default 1; theme application mutates
+        process-wide config, so raise this only with one theme per process).
+    RENDER_QUEUE_DEPTH: Maximum number of waiting requests per lane (default 16).
+    RENDER_QUEUE_TIMEOUT: Seconds a request may wait for a worker (default 10).
+    RENDER_LANE_POLICY: "strict" (default) or "weighted".
+    RENDER_LANE_WEIGHTS: Lane weights for the weighted policy
+        (default "interactive=8,standard=3,bulk=1").
+    RENDER_RESERVED_INTERACTIVE: Workers only interactive renders may use
+        (default 1 when RENDER_WORKERS > 1, else 0; always fewer than RENDER_WORKERS).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+from .pdf_utils.cancel import CancelToken, RenderCancelled
+
+T = TypeVar("T")
+
+# Priority classes, highest first.
+PRIORITIES = ("interactive", "standard", "bulk")
+DEFAULT_PRIORITY = "standard"
+
+# Wait samples kept per lane for the p95 gauge.
+_WAIT_SAMPLES = 256
+
+class QueueRejected(Exception):
+    """
+    Raised when a render request cannot be admitted.
+
+    Attributes:
+        reason (str): "queue_full" or "wait_timeout".
+        retry_after (int): Suggested seconds before retrying.
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"render queue rejected request: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+def normalize_priority(value: Optional[str]) -> str:
+    """
+    Maps a priority tag to one of PRIORITIES, falling back to DEFAULT_PRIORITY.
+    """
+    value = (value or "").strip().lower()
+    return value if value in PRIORITIES else DEFAULT_PRIORITY
+
+def cap_priority(value: Optional[str], ceiling: str) -> str:
+    """
+    Normalizes a requested priority and lowers it to `ceiling` if it ranks higher.
+
+    Args:
+        value (Optional[str]): Requested priority, e.g. from X-Render-Priority.
+        ceiling (str): Highest priority the caller may use.
+    """
+    value = normalize_priority(value)
+    ceiling = normalize_priority(ceiling)
+    return max(value, ceiling, key=PRIORITIES.index)
+
+@dataclass(eq=False)
+class _Ticket:
+    future: asyncio.Future
+    enqueued: float
+    client: str
+    weight: int
+    lane: str
+    granted: bool = False
+
+class _Lane:
+    """
+    Waiting tickets of one priority class, one FIFO per client, served round-robin.
+    """
+
+    def __init__(self, name: str, weight: int):
+        self.name = name
+        self.weight = weight
+        self.current = 0  # smooth weighted round-robin state
+        self.in_flight = 0
+        self.depth = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.cancelled = 0
+        self.waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._queues: Dict[str, Deque[_Ticket]] = {}
+        self._turns: Deque[str] = deque()
+        self._credit: Dict[str, int] = {}
+
+    @property
+    def clients_waiting(self) -> int:
+        return len(self._queues)
+
+    def push(self, ticket: _Ticket) -> None:
+        q = self._queues.get(ticket.client)
+        if q is None:
+            q = self._queues[ticket.client] = deque()
+            self._turns.append(ticket.client)
+            self._credit[ticket.client] = ticket.weight
+        q.append(ticket)
+        self.depth += 1
+
+    def remove(self, ticket: _Ticket) -> None:
+        q = self._queues.get(ticket.client)
+        if q is not None and ticket in q:
+            q.remove(ticket)
+            self.depth -= 1
+            if not q:
+                self._drop_client(ticket.client)
+
+    def pop(self) -> Optional[_Ticket]:
+        """
+        Pops the next live ticket in weighted round-robin order across clients.
+        """
+        while self._turns:
+            client = self._turns[0]
+            q = self._queues[client]
+            ticket = q.popleft()
+            self.depth -= 1
+            self._credit[client] -= 1
+            if not q:
+                self._drop_client(client)
+            elif self._credit[client] <= 0:
+                self._credit[client] = q[0].weight
+                self._turns.rotate(-1)
+            if not ticket.future.done():
+                return ticket
+        return None
+
+    def _drop_client(self, client: str) -> None:
+        del self._queues[client]
+        del self._credit[client]
+        self._turns.remove(client)
+
+    def wait_p95(self) -> float:
+        if not self.waits:
+            return 0.0
+        ordered = sorted(self.waits)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+class RenderQueue:
+    """
+    Limits concurrent renders and bounds the number and wait time of queued ones.
+
+    Args:
+        workers (int): Renders allowed to run at the same time.
+        max_depth (int): Waiting requests allowed per lane before new ones are rejected.
+        wait_timeout (float): Seconds a request may wait for a worker.
+        policy (str): "strict" serves higher lanes first; "weighted" shares by lane weight.
+        lane_weights (Optional[Dict[str, int]]): Weights for the weighted policy.
+        reserved_interactive (int): Workers that only interactive renders may use.
+    """
+
+    def __init__(self, workers: int = 1, max_depth: int = 16, wait_timeout: float = 10.0,
+                 policy: str = "strict", lane_weights: Optional[Dict[str, int]] = None,
+                 reserved_interactive: int = 0):
+        self.workers = max(1, workers)
+        self.max_depth = max(0, max_depth)
+        self.wait_timeout = wait_timeout
+        self.policy = policy if policy in ("strict", "weighted") else "strict"
+        self.reserved_interactive = min(max(0, reserved_interactive), self.workers - 1)
+        weights = {"interactive": 8, "standard": 3, "bulk": 1, **(lane_weights or {})}
+        self._lanes: Dict[str, _Lane] = {p: _Lane(p, max(1, int(weights[p]))) for p in PRIORITIES}
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+        self._in_flight = 0
+
+        self.last_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._avg_wait_ms = 0.0
+        self._avg_service_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RenderQueue":
+        """
+        Builds a queue configured from the RENDER_* environment variables.
+        """
+        workers = int(os.getenv("RENDER_WORKERS", "1"))
+        weights: Dict[str, int] = {}
+        for part in os.getenv("RENDER_LANE_WEIGHTS", "").split(","):
+            name, _, value = part.partition("=")
+            if name.strip() in PRIORITIES and value.strip().isdigit():
+                weights[name.strip()] = int(value)
+        return cls(
+            workers=workers,
+            max_depth=int(os.getenv("RENDER_QUEUE_DEPTH", "16")),
+            wait_timeout=float(os.getenv("RENDER_QUEUE_TIMEOUT", "10")),
+            policy=os.getenv("RENDER_LANE_POLICY", "strict").strip().lower(),
+            lane_weights=weights,
+            reserved_interactive=int(os.getenv("RENDER_RESERVED_INTERACTIVE", "1" if workers > 1 else "0")),
+        )
+
+    @property
+    def depth(self) -> int:
+        """Number of requests currently waiting for a worker, across all lanes."""
+        return sum(lane.depth for lane in self._lanes.values())
+
+    @property
+    def in_flight(self) -> int:
+        """Number of renders currently holding a worker."""
+        return self._in_flight
+
+    def retry_after(self, priority: str = DEFAULT_PRIORITY) -> int:
+        """
+        Estimates how long until a worker frees up for a new request of this priority.
+
+        Returns:
+            int: Seconds, at least 1.
+        """
+        service_s = (self._avg_service_ms or 1000.0) / 1000.0
+        rank = PRIORITIES.index(priority)
+        ahead = sum(lane.depth for p, lane in self._lanes.items() if PRIORITIES.index(p) <= rank)
+        return max(1, math.ceil(service_s * (ahead + 1) / self.workers))
+
+    async def run(self, fn: Callable[..., T], *args: Any, client: str = "default", weight: int = 1,
+                  priority: str = DEFAULT_PRIORITY, cancel: Optional[CancelToken] = None,
+                  **kwargs: Any) -> T:
+        """
+        Waits for a worker, then runs fn(*args, **kwargs) on the render pool.
+
+        Args:
+            fn (Callable[..., T]): Blocking render function.
+            client (str): Client the request is scheduled under.
+            weight (int): Grants the client may take per round-robin turn.
+            priority (str): Priority class; unknown values map to "standard".
+            cancel (Optional[CancelToken]): Drops the request while it waits;
+                also passed on to fn as `cancel=` so it can stop mid-render.
+
+        Raises:
+            QueueRejected: If the lane is full or the wait deadline passes.
+            RenderCancelled: If `cancel` fires before or during the render.
+        """
+        ticket = await self._acquire(client, max(1, weight), normalize_priority(priority), cancel)
+        t0 = time.perf_counter()
+        try:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+                kwargs["cancel"] = cancel
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release(ticket)
+            raise
+        # The worker thread cannot be interrupted: if the caller is cancelled, the
+        # render keeps its slot until it has actually finished.
+        fut.add_done_callback(functools.partial(self._finished, ticket, t0))
+        return await asyncio.shield(fut)
+
+    def _finished(self, ticket: _Ticket, t0: float, fut: "asyncio.Future[Any]") -> None:
+        if not fut.cancelled():
+            fut.exception()  # retrieved here in case the caller is gone
+        self._avg_service_ms = _ewma(self._avg_service_ms, (time.perf_counter() - t0) * 1000)
+        self._release(ticket)
+
+    async def _acquire(self, client: str, weight: int, priority: str,
+                       cancel: Optional[CancelToken]) -> _Ticket:
+        lane = self._lanes[priority]
+        if lane.depth >= self.max_depth:
+            lane.rejected_full += 1
+            raise QueueRejected("queue_full", self.retry_after(priority))
+
+        loop = asyncio.get_running_loop()
+        ticket = _Ticket(loop.create_future(), time.perf_counter(), client, weight, priority)
+        lane.push(ticket)
+        self._dispatch()
+        if ticket.granted:
+            return ticket
+
+        unregister = None
+        if cancel is not None:
+            unregister = cancel.add_callback(lambda: loop.call_soon_threadsafe(self._drop_cancelled, ticket, cancel))
+        try:
+            await asyncio.wait({ticket.future}, timeout=self.wait_timeout)
+        except BaseException:
+            # Cancelled (e.g. client went away): give back a slot we may have been handed.
+            self._abandon(ticket)
+            raise
+        finally:
+            if unregister is not None:
+                unregister()
+        if ticket.granted:
+            return ticket
+        if ticket.future.done():
+            raise ticket.future.exception()
+        self._abandon(ticket)
+        lane.rejected_timeout += 1
+        raise QueueRejected("wait_timeout", self.retry_after(priority))
+
+    def _drop_cancelled(self, ticket: _Ticket, cancel: CancelToken) -> None:
+        if ticket.future.done():
+            return
+        lane = self._lanes[ticket.lane]
+        lane.remove(ticket)
+        lane.cancelled += 1
+        ticket.future.set_exception(RenderCancelled(cancel.reason or "cancelled"))
+
+    def _abandon(self, ticket: _Ticket) -> None:
+        if ticket.granted:
+            self._release(ticket)
+            return
+        ticket.future.cancel()
+        self._lanes[ticket.lane].remove(ticket)
+
+    def _release(self, ticket: _Ticket) -> None:
+        self._in_flight -= 1
+        self._lanes[ticket.lane].in_flight -= 1
+        self._dispatch()
+
+    def _eligible(self) -> List[_Lane]:
+        shared_cap = self.workers - self.reserved_interactive
+        shared_busy = sum(lane.in_flight for p, lane in self._lanes.items() if p != "interactive")
+        out = []
+        for name, lane in self._lanes.items():
+            if not lane.depth:
+                continue
+            if name != "interactive" and shared_busy >= shared_cap:
+                continue
+            out.append(lane)
+        return out
+
+    def _pick_lane(self) -> Optional[_Lane]:
+        lanes = self._eligible()
+        if not lanes:
+            return None
+        if self.policy == "strict":
+            return lanes[0]
+        # Smooth weighted round-robin over lanes that have work.
+        total = sum(lane.weight for lane in lanes)
+        for lane in lanes:
+            lane.current += lane.weight
+        best = max(lanes, key=lambda lane: lane.current)
+        best.current -= total
+        return best
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.workers:
+            lane = self._pick_lane()
+            if lane is None:
+                break
+            ticket = lane.pop()
+            if ticket is None:
+                continue
+            ticket.granted = True
+            ticket.future.set_result(None)
+            self._in_flight += 1
+            lane.in_flight += 1
+            self._record_wait(lane, (time.perf_counter() - ticket.enqueued) * 1000)
+
+    def _record_wait(self, lane: _Lane, wait_ms: float) -> None:
+        lane.admitted += 1
+        lane.waits.append(wait_ms)
+        self.last_wait_ms = wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self._avg_wait_ms = _ewma(self._avg_wait_ms, wait_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the queue gauges and counters.
+
+        Returns:
+            Dict[str, Any]: Totals (depth, in-flight renders, limits, counters and
+                wait/service times) plus a "lanes" entry with per-priority gauges.
+        """
+        lanes = self._lanes.values()
+        return {
+            "workers": self.workers,
+            "reserved_interactive": self.reserved_interactive,
+            "in_flight": self._in_flight,
+            "depth": self.depth,
+            "clients_waiting": sum(lane.clients_waiting for lane in lanes),
+            "max_depth": self.max_depth,
+            "wait_timeout_s": self.wait_timeout,
+            "admitted": sum(lane.admitted for lane in lanes),
+            "rejected_full": sum(lane.rejected_full for lane in lanes),
+            "rejected_timeout": sum(lane.rejected_timeout for lane in lanes),
+            "wait_ms_last": round(self.last_wait_ms, 1),
+            "wait_ms_avg": round(self._avg_wait_ms, 1),
+            "wait_ms_max": round(self.max_wait_ms, 1),
+            "service_ms_avg": round(self._avg_service_ms, 1),
+            "lanes": {
+                lane.name: {
+                    "depth": lane.depth,
+                    "in_flight": lane.in_flight,
+                    "admitted": lane.admitted,
+                    "rejected_full": lane.rejected_full,
+                    "rejected_timeout": lane.rejected_timeout,
+                    "cancelled": lane.cancelled,
+                    "wait_ms_p95": round(lane.wait_p95(), 1),
+                }
+                for lane in lanes
+            },
+        }
+
+def _ewma(prev: float, sample: float, alpha: float = 0.2) -> float:
+    return sample if prev == 0.0 else prev + alpha * (sample - prev)
+
+_COUNTERS = {"admitted", "rejected_full", "rejected_timeout", "cancelled"}
+
+def render_queue_metrics(queue: Optional["RenderQueue"] = None) -> str:
+    """
+    Formats the queue gauges in the Prometheus text exposition format.
+
+    Args:
+        queue (Optional[RenderQueue]): Queue to report on; defaults to RENDER_QUEUE.
+
+    Returns:
+        str: One `render_queue_<name> <value>` line per stat, and
+            `render_queue_lane_<name>{lane="..."} <value>` lines per lane.
+    """
+    stats = (queue or RENDER_QUEUE).stats()
+    lanes = stats.pop("lanes")
+    lines = []
+    for name, value in stats.items():
+        lines.append(f"# TYPE render_queue_{name} {'counter' if name in _COUNTERS else 'gauge'}")
+        lines.append(f"render_queue_{name} {value}")
+    for name in next(iter(lanes.values())):
+        lines.append(f"# TYPE render_queue_lane_{name} {'counter' if name in _COUNTERS else 'gauge'}")
+        for lane, values in lanes.items():
+            lines.append(f'render_queue_lane_{name}{{lane="{lane}"}} {values[name]}')
+    return "\n".join(lines) + "\n"
+
+RENDER_QUEUE = RenderQueue.from_env()
+
+__all__ = [
+    "DEFAULT_PRIORITY", "PRIORITIES", "QueueRejected", "RenderQueue", "RENDER_QUEUE",
+    "cap_priority", "normalize_priority", "render_queue_metrics",
+]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import traceback
+from io import BytesIO
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from api.disconnect import cancel_on_disconnect
+from api.rate_limit import Client, admit, identify_client
+from api.render_queue import RENDER_QUEUE, QueueRejected
+from api.schemas import AssembleRequest
+from ..pdf_utils.assemble import DocumentPart, assemble_pdf, page_part
+from ..pdf_utils.cancel import RenderCancelled
+from .common import busy, cancelled, prepare_render_data
+
+router = APIRouter(prefix="", tags=["generate"])
+
+@router.post("/assemble")
+async def assemble(request: Request, req: AssembleRequest, client: Client = Depends(identify_client)):
+    """
+    Renders several parts (resumes and text pages) into one PDF.
+
+    All parts are drawn into one document, so fonts, icons, a shared avatar and
+    decorative backgrounds are embedded once. Each part starts on a new page
+    and gets an outline (bookmark) entry with its title. With `linearize`,
+    the file is laid out so viewers can show the first page early; with
+    `compact`, it is written with object streams (PDF 1.5). `compression`
+    picks a size/speed profile for streams and the avatar photos.
+    """
+    admit(client)
+    try:
+        parts = []
+        for part in req.parts:
+            if part.resume is not None:
+                parts.append(DocumentPart(part.title, prepare_render_data(part.resume)))
+            else:
+                page = part.page
+                parts.append(page_part(part.title, page.heading, page.section, page.lines, theme_name=page.theme_name))
+        async with cancel_on_disconnect(request) as token:
+            pdf_bytes = await RENDER_QUEUE.run(
+                assemble_pdf, parts, client=client.id, weight=client.weight, cancel=token,
+                linearize=req.linearize, compact=req.compact, compression=req.compression,
+            )
+        return StreamingResponse(
+            BytesIO(pdf_bytes),
+            media_type="application/pdf",
+            headers={"Content-Disposition": 'inline; filename="document.pdf"'},
+        )
+    except RenderCancelled as e:
+        raise cancelled("/assemble", e)
+    except QueueRejected as e:
+        raise busy("/assemble", e)
+    except Exception as e:
+        print("[Error] /assemble:")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error assembling PDF: {e}")
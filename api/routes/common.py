@@ -0,0 +1,285 @@
+"""
+Helpers shared by the render routes.
+
+- layout compilation: a theme's inline layout merged with an optional layout
+  file, cached per (theme, layout) pair and invalidated on registry changes;
+- `prepare_render_data`: the `build_resume_pdf` input for a validated request;
+- `busy` / `cancelled`: map render queue rejections and cancelled renders to
+  HTTP errors;
+- `etag_matches`: If-None-Match comparison for cached responses;
+- `slug` / `validation_summary`: file names and error text for batch items,
+  shared by /generate-batch, render jobs and the render CLI.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from api.disconnect import CLIENT_CLOSED_REQUEST
+from api.registry import REGISTRY, RegistrySnapshot, layout_name_for, theme_name_for
+from api.render_queue import QueueRejected
+from api.schemas import GenerateFormRequest
+from ..pdf_utils.cancel import RenderCancelled
+from ..pdf_utils.theme_loader import clear_theme_cache
+
+try:
+    from ..pdf_utils.blocks.registry import get as get_block
+except Exception:
+    def get_block(_: str):
+        return None
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+THEMES_DIR = PROJECT_ROOT / "themes"
+LAYOUTS_DIR = PROJECT_ROOT / "layouts"
+
+def _prefer_fixed(path: Path) -> Path:
+    """
+    If a .fixed version of the file exists, return it; otherwise, return the original path.
+    """
+    fixed = path.with_suffix(path.suffix + ".fixed")
+    return fixed if fixed.exists() else path
+
+def _safe_json_read(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        print(f"[Warning] Failed to read JSON: {path} -> {e}")
+        return {}
+
+def _normalize_layout_list(items: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Converts layout items into a list of dictionaries with block_id.
+    Accepts strings or dictionaries. Skips invalid items.
+    """
+    out: List[Dict[str, Any]] = []
+    for it in (items or []):
+        if isinstance(it, str) and it.strip():
+            out.append({"block_id": it.strip()})
+        elif isinstance(it, dict) and it.get("block_id"):
+            out.append(it)
+        else:
+            print(f"[Warning] Skipping invalid layout item: {it!r}")
+    return out
+
+def _normalize_layout_value(layout_value: Any) -> Dict[str, Any]:
+    """
+    Returns a unified layout dictionary format with page, frames, and layout keys.
+    """
+    layout_value = layout_value or {}
+    page = layout_value.get("page") or {}
+    frames = layout_value.get("frames") or {}
+    layout_list = _normalize_layout_list(layout_value.get("layout") or [])
+    return {"page": page, "frames": frames, "layout": layout_list}
+
+def _build_layout_inline_from_theme(theme_name: Optional[str]) -> Dict[str, Any]:
+    """
+    Reads a theme JSON file and extracts inline layout if available.
+    """
+    theme_name = theme_name or "default"
+    theme_path = _prefer_fixed(THEMES_DIR / f"{theme_name}.theme.json")
+    theme = _safe_json_read(theme_path)
+    if any(k in theme for k in ("layout", "frames", "page")):
+        return _normalize_layout_value(theme)
+    return {"page": {}, "frames": {}, "layout": []}
+
+def _load_layout_inline(layout_name: Optional[str]) -> Dict[str, Any]:
+    """
+    Loads and normalizes an external layout file.
+    """
+    if not layout_name:
+        return {}
+    p = _prefer_fixed(LAYOUTS_DIR / f"{layout_name}.layout.json")
+    return _normalize_layout_value(_safe_json_read(p))
+
+def _merge_layouts(theme_inline: Dict[str, Any], layout_inline: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merges theme and layout, with layout taking precedence.
+    """
+    merged = dict(theme_inline or {"layout": []})
+    if layout_inline:
+        for key in ("frames", "layout", "page"):
+            if key in layout_inline:
+                merged[key] = layout_inline[key]
+    return _normalize_layout_value(merged)
+
+# Compiled (theme, layout) -> merged layout_inline; filled on first use or by warmup.
+_LAYOUT_CACHE: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+
+def compile_layout(theme_name: Optional[str], layout_name: Optional[str]) -> Dict[str, Any]:
+    """
+    Returns the merged layout for a theme/layout pair, reading the JSON files only once.
+
+    The renderer mutates layout items in place, so callers get a deep copy.
+    """
+    key = (theme_name or "default", layout_name or None)
+    merged = _LAYOUT_CACHE.get(key)
+    if merged is None:
+        theme_inline = _build_layout_inline_from_theme(theme_name)
+        extra_layout = _load_layout_inline(layout_name) if layout_name else {}
+        merged = _LAYOUT_CACHE[key] = _merge_layouts(theme_inline, extra_layout)
+    return copy.deepcopy(merged)
+
+def clear_layout_cache(theme_name: Optional[str] = None, layout_name: Optional[str] = None) -> None:
+    """
+    Drops compiled layouts so they are re-read from disk on next use.
+
+    Args:
+        theme_name (Optional[str]): Only drop pairs built from this theme.
+        layout_name (Optional[str]): Only drop pairs built from this layout.
+            Drops everything when neither is given.
+    """
+    if theme_name is None and layout_name is None:
+        _LAYOUT_CACHE.clear()
+        return
+    for key in [k for k in _LAYOUT_CACHE if k[0] == theme_name or k[1] == layout_name]:
+        _LAYOUT_CACHE.pop(key, None)
+
+def _on_registry_change(_snapshot: RegistrySnapshot, changed: List[Path]) -> None:
+    """
+    Invalidates only the compiled themes and layouts that depend on the changed files.
+    """
+    for p in changed:
+        theme_name = theme_name_for(p)
+        if theme_name:
+            clear_theme_cache(theme_name)
+            clear_layout_cache(theme_name=theme_name)
+            continue
+        layout_name = layout_name_for(p)
+        if layout_name:
+            clear_layout_cache(layout_name=layout_name)
+
+REGISTRY.subscribe(_on_registry_change)
+
+def _log_layout_blocks(layout_inline: Dict[str, Any]) -> None:
+    blocks = []
+    for b in (layout_inline.get("layout") or []):
+        if isinstance(b, dict):
+            blocks.append(b.get("block_id"))
+        elif isinstance(b, str):
+            blocks.append(b)
+    print(f"[Info] Layout blocks: {blocks}")
+
+def _preflight(layout_inline: dict, profile: dict):
+    """
+    Pre-check: logs expected blocks, unregistered blocks, and missing profile data.
+    """
+    wanted = [b.get("block_id") for b in (layout_inline.get("layout") or []) if isinstance(b, dict)]
+    not_registered = []
+    for b in wanted:
+        try:
+            get_block(b)
+        except Exception:
+            not_registered.append(b)
+
+    expected_keys = {
+        "header", "contact", "skills", "languages", "summary",
+        "projects", "education", "social_links", "avatar"
+    }
+    missing_data = []
+    for b in wanted:
+        if b in {"decor_curve", "left_panel_bg"}:
+            continue
+        key_map = {
+            "header_name": "header",
+            "contact_info": "contact",
+            "key_skills": "skills",
+            "languages": "languages",
+            "text_section": "summary",
+            "projects": "projects",
+            "education": "education",
+            "social_links": "social_links",
+            "avatar_circle": "avatar",
+        }
+        pk = key_map.get(b)
+        if pk and pk not in (profile or {}):
+            missing_data.append(b)
+
+    print(f"[PREFLIGHT] blocks: {wanted}")
+    if not_registered:
+        print(f"[PREFLIGHT] Warning: not registered: {not_registered}")
+    if missing_data:
+        print(f"[PREFLIGHT] Info: no profile data for: {missing_data}")
+
+def prepare_render_data(req: GenerateFormRequest) -> Dict[str, Any]:
+    """
+    Builds the build_resume_pdf input (profile, language, theme and merged layout) for a request.
+    """
+    prof = req.profile.dict()
+    data: Dict[str, Any] = {
+        "ui_lang": req.ui_lang,
+        "rtl_mode": bool(req.rtl_mode),
+        "profile": prof,
+        "theme_name": req.theme_name,
+        "linearize": req.linearize,
+        "compact": req.compact,
+        "compression": req.compression,
+    }
+
+    merged_inline = compile_layout(req.theme_name, req.layout_name)
+
+    _log_layout_blocks(merged_inline)
+    _preflight(merged_inline, data["profile"])
+
+    data["layout_inline"] = merged_inline
+    return data
+
+def busy(route: str, e: QueueRejected) -> HTTPException:
+    """
+    Maps a render queue rejection to a 503 with a Retry-After hint.
+    """
+    print(f"[WARN] {route} rejected: {e.reason} (retry after {e.retry_after}s)")
+    return HTTPException(
+        status_code=503,
+        detail=f"Renderer busy ({e.reason}), retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+def cancelled(route: str, e: RenderCancelled) -> HTTPException:
+    """
+    Maps a cancelled render to 409 (superseded preview) or 499 (client gone, shutdown).
+    """
+    print(f"[Info] {route} {e.reason}")
+    if e.reason == "superseded":
+        return HTTPException(status_code=409, detail="Preview superseded by a newer request")
+    return HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=f"Render cancelled: {e.reason}")
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Returns True if an If-None-Match header value matches `etag` (weak comparison, or `*`).
+    """
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def slug(text: Any) -> str:
+    """
+    Returns a file-name-safe form of `text` (at most 60 characters, "resume" if empty).
+    """
+    out = re.sub(r"[^A-Za-z0-9._-]+", "-", str(text or "")).strip("-._")
+    return out[:60] or "resume"
+
+def validation_summary(e: ValidationError) -> str:
+    """
+    Flattens a ValidationError into one line of `field.path: message` entries.
+    """
+    parts = []
+    for err in e.errors():
+        loc = ".".join(str(x) for x in err.get("loc", ()))
+        parts.append(f"{loc}: {err.get('msg')}")
+    return "; ".join(parts)
+
+__all__ = [
+    "LAYOUTS_DIR", "PROJECT_ROOT", "THEMES_DIR", "busy", "cancelled", "clear_layout_cache",
+    "compile_layout", "etag_matches", "prepare_render_data", "slug", "validation_summary",
+]
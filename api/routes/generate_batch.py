@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import zipfile
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from api.disconnect import cancel_on_disconnect
+from api.rate_limit import Client, admit, identify_client
+from api.render_queue import RENDER_QUEUE, QueueRejected
+from api.schemas import BatchItemRequest, GenerateBatchRequest
+from ..pdf_utils.cancel import CancelToken, RenderCancelled
+from ..pdf_utils.resume import build_resume_pdf
+from .common import prepare_render_data, slug, validation_summary
+
+router = APIRouter(prefix="", tags=["generate"])
+
+# Items of one batch in flight at the same time: queued, rendering, or finished
+# and not yet written to the archive. Keeping this small leaves queue depth for
+# other clients and bounds the PDFs held in memory. Items only render in
+# parallel when the queue has several workers (RENDER_WORKERS).
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "0")) or max(2, RENDER_QUEUE.workers)
+# How often an item is re-queued after the render queue turned it away.
+BATCH_QUEUE_RETRIES = int(os.getenv("BATCH_QUEUE_RETRIES", "5"))
+
+@dataclass
+class BatchItemResult:
+    """
+    Outcome of one batch item, as written to the batch manifest.
+    """
+    index: int
+    file: Optional[str]
+    status: str
+    error: Optional[str] = None
+    bytes: int = 0
+    ms: float = 0.0
+
+async def _render_item(index: int, item: Dict[str, Any], client: Client,
+                       token: CancelToken) -> tuple[BatchItemResult, Optional[bytes]]:
+    t0 = time.perf_counter()
+
+    def result(status: str, error: Optional[str] = None, file: Optional[str] = None, size: int = 0):
+        return BatchItemResult(index, file, status, error, size, round((time.perf_counter() - t0) * 1000, 1))
+
+    try:
+        req = BatchItemRequest.model_validate(item)
+    except ValidationError as e:
+        return result("error", validation_summary(e)), None
+
+    try:
+        # Checked between items: a cancelled batch stops picking up new work.
+        token.raise_if_cancelled()
+        data = prepare_render_data(req)
+        for attempt in range(BATCH_QUEUE_RETRIES + 1):
+            try:
+                pdf = await RENDER_QUEUE.run(
+                    build_resume_pdf, data=data, client=client.id, weight=client.weight,
+                    priority="bulk", cancel=token,
+                )
+                break
+            except QueueRejected as e:
+                if attempt == BATCH_QUEUE_RETRIES:
+                    raise
+                await asyncio.sleep(e.retry_after)
+    except RenderCancelled as e:
+        return result("cancelled", e.reason), None
+    except QueueRejected as e:
+        return result("error", f"renderer busy ({e.reason})"), None
+    except Exception as e:
+        print(f"[WARN] Batch item {index} failed: {e!r}")
+        return result("error", f"{type(e).__name__}: {e}"), None
+
+    name = f"{index + 1:04d}-{slug(req.profile.header.name)}-{req.theme_name}.pdf"
+    return result("ok", file=name, size=len(pdf)), pdf
+
+async def iter_batch(items: List[Dict[str, Any]], client: Client,
+                     token: CancelToken) -> AsyncIterator[tuple[BatchItemResult, Optional[bytes]]]:
+    """
+    Renders batch items through the bulk lane and yields results as they finish.
+
+    Each item is validated and rendered on its own; failures are reported in
+    the result instead of raised. At most BATCH_CONCURRENCY items are in
+    flight: the next item starts only once the consumer has taken a result,
+    so a slow consumer holds back rendering instead of buffering PDFs. If the
+    consumer stops early, `token` is cancelled so queued and running items
+    stop as well.
+
+    Args:
+        items (List[Dict[str, Any]]): Raw GenerateFormRequest payloads.
+        client (Client): Caller, used for fair scheduling.
+        token (CancelToken): Cancels the remaining items.
+
+    Yields:
+        tuple[BatchItemResult, Optional[bytes]]: Result and PDF bytes (None on failure).
+    """
+    todo = iter(enumerate(items))
+    pending: Set[asyncio.Task] = set()
+
+    def start_next() -> None:
+        nxt = next(todo, None)
+        if nxt is not None:
+            pending.add(asyncio.create_task(_render_item(nxt[0], nxt[1], client, token)))
+
+    for _ in range(BATCH_CONCURRENCY):
+        start_next()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                yield task.result()
+                start_next()
+    finally:
+        if pending:
+            token.cancel("batch aborted")
+        # Let the items observe the token instead of cancelling tasks that hold a worker.
+        await asyncio.gather(*pending, return_exceptions=True)
+
+class _ZipSink:
+    """
+    Write-only, non-seekable buffer for zipfile; drained after every entry.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, b: bytes) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        out, self._chunks = b"".join(self._chunks), []
+        return out
+
+@router.post("/generate-batch")
+async def generate_batch(request: Request, req: GenerateBatchRequest, client: Client = Depends(identify_client)):
+    """
+    Renders many GenerateFormRequest payloads and streams them back as a ZIP.
+
+    Items render in the bulk lane of the render queue, BATCH_CONCURRENCY at a
+    time, and are added to the archive in completion order; no more than
+    BATCH_CONCURRENCY finished PDFs wait for the archive. The archive ends with
+    `manifest.json` listing every item with its status, file name, size and
+    duration; invalid or failing items are reported there instead of failing
+    the whole batch. Every item is one PDF: an item with `ui_langs` or
+    `palettes` is reported as invalid (send one item per language or
+    palette). If the client disconnects, remaining items are cancelled.
+    """
+    admit(client)
+    async def stream() -> AsyncIterator[bytes]:
+        sink = _ZipSink()
+        zf = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+        results: List[BatchItemResult] = []
+        t0 = time.perf_counter()
+        async with cancel_on_disconnect(request) as token:
+            async for res, pdf in iter_batch(req.items, client, token):
+                results.append(res)
+                if pdf is not None:
+                    zf.writestr(res.file, pdf)
+                    yield sink.take()
+
+        results.sort(key=lambda r: r.index)
+        manifest = {
+            "items": [asdict(r) for r in results],
+            "ok": sum(r.status == "ok" for r in results),
+            "failed": sum(r.status != "ok" for r in results),
+            "total_ms": round((time.perf_counter() - t0) * 1000, 1),
+        }
+        zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+        zf.close()
+        print(f"[Info] /generate-batch: {manifest['ok']} ok, {manifest['failed']} failed in {manifest['total_ms']} ms")
+        yield sink.take()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="resumes.zip"'},
+    )
@@ -1,197 +1,176 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from io import BytesIO
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-import json
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import traceback
+import zipfile
 
+from api.registry import REGISTRY
+from api.disconnect import cancel_on_disconnect
+from api.rate_limit import Client, admit, identify_client
+from api.render_queue import RENDER_QUEUE, QueueRejected
 from api.schemas import GenerateFormRequest
-from ..pdf_utils.resume import build_resume_pdf
-
-try:
-    from ..pdf_utils.blocks.registry import get as get_block
-except Exception:
-    def get_block(_: str):
-        return None
+from ..pdf_utils.cancel import CancelToken, RenderCancelled
+from ..pdf_utils.data_utils import build_ready_from_profile
+from ..pdf_utils.resume import build_palette_variants, build_resume_pdf
+from .common import busy, cancelled, prepare_render_data
 
 router = APIRouter(prefix="", tags=["generate"])
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-THEMES_DIR = PROJECT_ROOT / "themes"
-LAYOUTS_DIR = PROJECT_ROOT / "layouts"
-
-def _prefer_fixed(path: Path) -> Path:
-    """
-    If a .fixed version of the file exists, return it; otherwise, return the original path.
-    """
-    fixed = path.with_suffix(path.suffix + ".fixed")
-    return fixed if fixed.exists() else path
+def _pdf_response(pdf_bytes: bytes, theme_name: str) -> StreamingResponse:
+    return StreamingResponse(
+        BytesIO(pdf_bytes),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="resume-{theme_name}.pdf"'},
+    )
+
+async def _render_bundle(req: GenerateFormRequest, client: Client, priority: Optional[str],
+                         token: CancelToken) -> bytes:
+    """
+    Renders the language and/or palette variants of a request and returns them as a ZIP.
+
+    Validation, the compiled theme/layout and the block data (including the
+    decoded avatar) are prepared once and shared by all variants; `LazyReady`
+    builds each block's data under a lock. Languages are queued together but
+    only render concurrently with RENDER_WORKERS > 1, which is safe only with
+    one theme per process (see `api.render_queue`); with the default single
+    worker they render one after another. Each uses the text direction
+    configured for it in ui_langs.json. Palettes of one language are recorded
+    once and replayed with each palette's colors (see `build_palette_variants`).
+    """
+    data = prepare_render_data(req)
+    ready = build_ready_from_profile(data["profile"], compression=req.compression)
+    if req.ui_langs:
+        rtl_langs = REGISTRY.current.rtl_langs
+        variants = [(lang, lang in rtl_langs) for lang in req.ui_langs]
+    else:
+        variants = [(req.ui_lang, bool(req.rtl_mode))]
+
+    async def variant(lang: str, rtl: bool) -> List[bytes]:
+        vdata = {**data, "ui_lang": lang, "rtl_mode": rtl}
+        if req.palettes:
+            return await RENDER_QUEUE.run(
+                build_palette_variants, vdata, req.palettes, ready=ready,
+                client=client.id, weight=client.weight, priority=priority, cancel=token,
+            )
+        pdf = await RENDER_QUEUE.run(
+            build_resume_pdf, data=vdata, ready=ready,
+            client=client.id, weight=client.weight, priority=priority, cancel=token,
+        )
+        return [pdf]
 
-def _safe_json_read(path: Path) -> Dict[str, Any]:
+    tasks = [asyncio.ensure_future(variant(lang, rtl)) for lang, rtl in variants]
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception as e:
-        print(f"[Warning] Failed to read JSON: {path} -> {e}")
-        return {}
-
-def _normalize_layout_list(items: List[Any]) -> List[Dict[str, Any]]:
-    """
-    Converts layout items into a list of dictionaries with block_id.
-    Accepts strings or dictionaries. Skips invalid items.
-    """
-    out: List[Dict[str, Any]] = []
-    for it in (items or []):
-        if isinstance(it, str) and it.strip():
-            out.append({"block_id": it.strip()})
-        elif isinstance(it, dict) and it.get("block_id"):
-            out.append(it)
-        else:
-            print(f"[Warning] Skipping invalid layout item: {it!r}")
-    return out
-
-def _normalize_layout_value(layout_value: Any) -> Dict[str, Any]:
-    """
-    Returns a unified layout dictionary format with page, frames, and layout keys.
-    """
-    layout_value = layout_value or {}
-    page = layout_value.get("page") or {}
-    frames = layout_value.get("frames") or {}
-    layout_list = _normalize_layout_list(layout_value.get("layout") or [])
-    return {"page": page, "frames": frames, "layout": layout_list}
-
-def _build_layout_inline_from_theme(theme_name: Optional[str]) -> Dict[str, Any]:
-    """
-    Reads a theme JSON file and extracts inline layout if available.
-    """
-    theme_name = theme_name or "default"
-    theme_path = _prefer_fixed(THEMES_DIR / f"{theme_name}.theme.json")
-    theme = _safe_json_read(theme_path)
-    if any(k in theme for k in ("layout", "frames", "page")):
-        return _normalize_layout_value(theme)
-    return {"page": {}, "frames": {}, "layout": []}
-
-def _load_layout_inline(layout_name: Optional[str]) -> Dict[str, Any]:
-    """
-    Loads and normalizes an external layout file.
-    """
-    if not layout_name:
-        return {}
-    p = _prefer_fixed(LAYOUTS_DIR / f"{layout_name}.layout.json")
-    return _normalize_layout_value(_safe_json_read(p))
-
-def _merge_layouts(theme_inline: Dict[str, Any], layout_inline: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Merges theme and layout, with layout taking precedence.
-    """
-    merged = dict(theme_inline or {"layout": []})
-    if layout_inline:
-        for key in ("frames", "layout", "page"):
-            if key in layout_inline:
-                merged[key] = layout_inline[key]
-    return _normalize_layout_value(merged)
-
-def _log_layout_blocks(layout_inline: Dict[str, Any]) -> None:
-    blocks = []
-    for b in (layout_inline.get("layout") or []):
-        if isinstance(b, dict):
-            blocks.append(b.get("block_id"))
-        elif isinstance(b, str):
-            blocks.append(b)
-    print(f"[Info] Layout blocks: {blocks}")
-
-def _preflight(layout_inline: dict, profile: dict):
-    """
-    Pre-check: logs expected blocks, unregistered blocks, and missing profile data.
-    """
-    wanted = [b.get("block_id") for b in (layout_inline.get("layout") or []) if isinstance(b, dict)]
-    not_registered = []
-    for b in wanted:
-        try:
-            get_block(b)
-        except Exception:
-            not_registered.append(b)
-
-    expected_keys = {
-        "header", "contact", "skills", "languages", "summary",
-        "projects", "education", "social_links", "avatar"
-    }
-    missing_data = []
-    for b in wanted:
-        if b in {"decor_curve", "left_panel_bg"}:
-            continue
-        key_map = {
-            "header_name": "header",
-            "contact_info": "contact",
-            "key_skills": "skills",
-            "languages": "languages",
-            "text_section": "summary",
-            "projects": "projects",
-            "education": "education",
-            "social_links": "social_links",
-            "avatar_circle": "avatar",
-        }
-        pk = key_map.get(b)
-        if pk and pk not in (profile or {}):
-            missing_data.append(b)
-
-    print(f"[PREFLIGHT] blocks: {wanted}")
-    if not_registered:
-        print(f"[PREFLIGHT] Warning: not registered: {not_registered}")
-    if missing_data:
-        print(f"[PREFLIGHT] Info: no profile data for: {missing_data}")
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        token.cancel("sibling variant failed")
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        for (lang, _rtl), pdfs in zip(variants, results):
+            for i, pdf in enumerate(pdfs, start=1):
+                suffix = f"-p{i}" if req.palettes else ""
+                zf.writestr(f"resume-{req.theme_name}-{lang}{suffix}.pdf", pdf)
+    return buf.getvalue()
 
 @router.post("/generate-form-simple")
-async def generate_form_simple(req: GenerateFormRequest):
+async def generate_form_simple(
+    request: Request,
+    req: GenerateFormRequest,
+    client: Client = Depends(identify_client),
+    priority: Optional[str] = Header(default=None, alias="X-Render-Priority"),
+):
     """
     Accepts payload matching GenerateFormRequest schema,
     merges layout, generates PDF, and returns it.
-    """
-    try:
-        prof = req.profile.dict()
-        print("[Debug] PROFILE keys:", list(prof.keys()))
-        print("[Debug] header:", prof.get("header"))
-        print("[Debug] counts -> summary:", len(prof.get("summary", [])),
-              "skills:", len(prof.get("skills", [])),
-              "projects:", len(prof.get("projects", [])),
-              "education:", len(prof.get("education", [])))
-
-        data: Dict[str, Any] = {
-            "ui_lang": req.ui_lang,
-            "rtl_mode": bool(req.rtl_mode),
-            "profile": prof,
-            "theme_name": req.theme_name,
-        }
-
-        theme_inline = _build_layout_inline_from_theme(req.theme_name)
-        extra_layout = _load_layout_inline(req.layout_name) if req.layout_name else {}
-        merged_inline = _merge_layouts(theme_inline, extra_layout)
 
-        _log_layout_blocks(merged_inline)
-        _preflight(merged_inline, data["profile"])
+    The optional X-Render-Priority header (interactive, standard, bulk) picks
+    the render queue lane; it defaults to standard and is capped at the
+    client's `max_priority`. If the client disconnects,
+    the render is dropped or stopped at the next block.
 
-        data["layout_inline"] = merged_inline
-
-        pdf_bytes = build_resume_pdf(data=data)
-        return StreamingResponse(
-            BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f'inline; filename="resume-{req.theme_name}.pdf"'},
-        )
+    With `ui_langs`, the profile is rendered once per listed language, and
+    with `palettes` once per palette; the response is then a ZIP bundle
+    (`resume-<theme>-<lang>.pdf`, or `resume-<theme>-<lang>-p<n>.pdf` per palette).
+    With `linearize`, every PDF is written linearized (fast web view); with
+    `compact`, with object streams and a cross-reference stream (PDF 1.5).
+    `compression` picks a size/speed profile: none, fast, balanced or max.
+    """
+    admit(client)
+    priority = client.priority(priority)
+    try:
+        if req.ui_langs or req.palettes:
+            async with cancel_on_disconnect(request) as token:
+                bundle = await _render_bundle(req, client, priority, token)
+            return StreamingResponse(
+                BytesIO(bundle),
+                media_type="application/zip",
+                headers={"Content-Disposition": f'attachment; filename="resume-{req.theme_name}.zip"'},
+            )
+        data = prepare_render_data(req)
+        async with cancel_on_disconnect(request) as token:
+            pdf_bytes = await RENDER_QUEUE.run(
+                build_resume_pdf, data=data, client=client.id, weight=client.weight,
+                priority=priority, cancel=token,
+            )
+        return _pdf_response(pdf_bytes, req.theme_name)
+    except RenderCancelled as e:
+        raise cancelled("/generate-form-simple", e)
+    except QueueRejected as e:
+        raise busy("/generate-form-simple", e)
     except Exception as e:
         print("[Error] /generate-form-simple:")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {e}")
 
-@router.get("/healthz")
-def healthz():
-    """
-    Health check endpoint.
-    """
-    return {
-        "ok": True,
-        "themes_dir": str(THEMES_DIR),
-        "layouts_dir": str(LAYOUTS_DIR),
-    }
\ No newline at end of file
+# Latest preview token per (client, session); a newer preview cancels the older one.
+_PREVIEWS: Dict[Tuple[str, str], CancelToken] = {}
+
+@router.post("/preview")
+async def preview(
+    request: Request,
+    req: GenerateFormRequest,
+    client: Client = Depends(identify_client),
+    session: str = Header(..., alias="X-Preview-Session", min_length=1, max_length=128),
+):
+    """
+    Latest-wins preview render for one editing session.
+
+    A new preview with the same X-Preview-Session (per client) supersedes the
+    previous one: if it is still queued it is dropped before it starts, and if
+    it is rendering it stops at the next block boundary. Superseded requests
+    get 409; only the newest one returns a PDF. Previews use the interactive lane
+    (capped at the client's `max_priority`) and are cancelled the same way when
+    the client disconnects.
+    """
+    admit(client)
+    key = (client.id, session)
+    token = CancelToken()
+    previous = _PREVIEWS.get(key)
+    _PREVIEWS[key] = token
+    if previous is not None:
+        previous.cancel("superseded")
+    try:
+        data = prepare_render_data(req)
+        async with cancel_on_disconnect(request, token):
+            pdf_bytes = await RENDER_QUEUE.run(
+                build_resume_pdf, data=data, client=client.id, weight=client.weight,
+                priority=client.priority("interactive"), cancel=token,
+            )
+        return _pdf_response(pdf_bytes, req.theme_name)
+    except RenderCancelled as e:
+        raise cancelled("/preview", e)
+    except QueueRejected as e:
+        raise busy("/preview", e)
+    except Exception as e:
+        print("[Error] /preview:")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error generating PDF: {e}")
+    finally:
+        if _PREVIEWS.get(key) is token:
+            del _PREVIEWS[key]
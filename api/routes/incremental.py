@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import traceback
+from io import BytesIO
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from api.disconnect import cancel_on_disconnect
+from api.rate_limit import Client, admit, identify_client
+from api.render_queue import RENDER_QUEUE, QueueRejected
+from api.schemas import GenerateFormRequest
+from ..pdf_utils.cancel import RenderCancelled
+from ..pdf_utils.incremental import DOCUMENTS, render_incremental
+from .common import busy, cancelled, prepare_render_data
+
+router = APIRouter(prefix="", tags=["generate"])
+
+@router.post("/generate-incremental")
+async def generate_incremental(
+    request: Request,
+    req: GenerateFormRequest,
+    client: Client = Depends(identify_client),
+    base_id: Optional[str] = Header(default=None, alias="X-Base-Document", max_length=64),
+    priority: Optional[str] = Header(default=None, alias="X-Render-Priority"),
+):
+    """
+    Renders a resume that later edits can update incrementally.
+
+    Without X-Base-Document, or when the base is unknown or expired, the
+    response is the full PDF (X-Update-Mode: full). With the X-Document-Id of
+    an earlier response as X-Base-Document, the response is only an
+    incremental update section (X-Update-Mode: incremental,
+    application/octet-stream): appending it to the base file gives the new
+    PDF. If nothing changed the response is 204 (X-Update-Mode: unchanged).
+    X-Changed-Blocks lists the blocks whose drawing changed, and the current
+    file is always available from /documents/{X-Document-Id}.
+
+    `linearize` and `compact` are ignored here: update sections are written
+    against the classic layout of the stored file. `compression` applies.
+    """
+    admit(client)
+    priority = client.priority(priority)
+    try:
+        data = prepare_render_data(req)
+        async with cancel_on_disconnect(request) as token:
+            update = await RENDER_QUEUE.run(
+                render_incremental, data, base_id, client=client.id, weight=client.weight,
+                priority=priority, cancel=token,
+            )
+        headers = {
+            "X-Document-Id": update.doc_id,
+            "X-Changed-Blocks": ",".join(update.changed_blocks),
+        }
+        if not update.incremental:
+            headers["X-Update-Mode"] = "full"
+            headers["Content-Disposition"] = f'inline; filename="resume-{req.theme_name}.pdf"'
+            return StreamingResponse(BytesIO(update.body), media_type="application/pdf", headers=headers)
+        headers["X-Base-Document"] = update.base_id
+        headers["X-Document-Size"] = str(update.size)
+        if not update.body:
+            headers["X-Update-Mode"] = "unchanged"
+            return Response(status_code=204, headers=headers)
+        headers["X-Update-Mode"] = "incremental"
+        return Response(content=update.body, media_type="application/octet-stream", headers=headers)
+    except RenderCancelled as e:
+        raise cancelled("/generate-incremental", e)
+    except QueueRejected as e:
+        raise busy("/generate-incremental", e)
+    except Exception as e:
+        print("[Error] /generate-incremental:")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error generating PDF: {e}")
+
+@router.get("/documents/{doc_id}")
+async def get_document(doc_id: str):
+    """
+    Downloads the current file of a document rendered by /generate-incremental.
+
+    Returns 404 once the document has been evicted from the document cache.
+    """
+    doc = await asyncio.to_thread(DOCUMENTS.get, doc_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found or expired")
+    return Response(
+        content=doc.pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="document-{doc_id}.pdf"'},
+    )
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import time
+import zipfile
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+
+from api.jobs import DONE, FAILED, FINAL_EVENTS, HEARTBEAT_SECONDS, STORE, Heartbeat, JobWorker
+from api.rate_limit import Client, admit, identify_client
+from api.render_queue import RENDER_QUEUE, QueueRejected
+from api.schemas import GenerateBatchRequest
+from ..pdf_utils.cancel import CancelToken
+from ..pdf_utils.resume import ProgressHook, build_resume_pdf
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+
+# Event stream tuning: how often new events are read, and how often an idle
+# stream sends a keep-alive comment.
+EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "0.25"))
+EVENTS_KEEPALIVE_SECONDS = 15.0
+
+_WORKERS: List[JobWorker] = []
+
+def _queue_render(loop: asyncio.AbstractEventLoop):
+    """
+    Returns a render function that runs job items through the app's render queue (bulk lane),
+    so in-process jobs share admission control with HTTP renders.
+
+    While an item waits in the lane or sleeps after a rejection, `heartbeat` is
+    called every HEARTBEAT_SECONDS so the job keeps its lease.
+    """
+    def render(data: Dict[str, Any], cancel: CancelToken, client: Optional[str],
+               progress: Optional[ProgressHook] = None, heartbeat: Optional[Heartbeat] = None) -> bytes:
+        beat = heartbeat or (lambda: None)
+        while True:
+            fut = asyncio.run_coroutine_threadsafe(
+                RENDER_QUEUE.run(
+                    build_resume_pdf, data=data, client=f"job:{client}", priority="bulk",
+                    cancel=cancel, progress=progress,
+                ),
+                loop,
+            )
+            try:
+                while True:
+                    try:
+                        return fut.result(timeout=HEARTBEAT_SECONDS)
+                    except concurrent.futures.TimeoutError:
+                        beat()
+            except QueueRejected as e:
+                resume_at = time.monotonic() + e.retry_after
+                while True:
+                    cancel.raise_if_cancelled()
+                    beat()
+                    left = resume_at - time.monotonic()
+                    if left <= 0:
+                        break
+                    time.sleep(min(left, HEARTBEAT_SECONDS))
+            except BaseException:
+                fut.cancel()
+                raise
+    return render
+
+def start_job_workers(loop: asyncio.AbstractEventLoop, count: int = JOB_WORKERS) -> None:
+    """
+    Starts `count` in-process job worker threads (called from the app lifespan).
+    """
+    render = _queue_render(loop)
+    for _ in range(count):
+        _WORKERS.append(JobWorker(STORE, render).start())
+
+def stop_job_workers() -> None:
+    """
+    Stops in-process job workers; interrupted jobs go back to the queue.
+    """
+    while _WORKERS:
+        _WORKERS.pop().stop()
+
+def _links(job_id: str) -> Dict[str, str]:
+    return {
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+        "result_url": f"/jobs/{job_id}/result",
+    }
+
+@router.post("", status_code=202)
+async def create_job(req: GenerateBatchRequest, client: Client = Depends(identify_client)):
+    """
+    Queues a render job for one or more GenerateFormRequest payloads.
+
+    Returns immediately with the job id. The result is a ZIP with one PDF per
+    item plus manifest.json, available from the result URL once the job is done.
+    Items are validated like /generate-batch items (one PDF each).
+    """
+    admit(client)
+    job_id = await asyncio.to_thread(STORE.submit, req.items, client.id)
+    return JSONResponse(status_code=202, content={"id": job_id, "status": "queued", **_links(job_id)})
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """
+    Returns the status and item progress of a job.
+    """
+    job = await asyncio.to_thread(STORE.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return {**job, **_links(job_id)}
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Downloads the result ZIP of a finished job.
+
+    Returns 409 while the job is queued or running, and 404 for unknown or expired jobs.
+    """
+    job = await asyncio.to_thread(STORE.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=409, detail=f"Job failed: {job['error']}")
+    path = STORE.result_path(job_id)
+    if job["status"] != DONE or not path.exists():
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return FileResponse(path, media_type="application/zip", filename=f"job-{job_id}.zip")
+
+def _sse(event: Dict[str, Any]) -> bytes:
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8")
+
+@router.get("/{job_id}/events")
+async def job_events(
+    request: Request,
+    job_id: str,
+    last_event_id: Optional[int] = Header(default=None, alias="Last-Event-ID"),
+):
+    """
+    Streams job progress as server-sent events.
+
+    Event types: queued, started, item_started, block (per-block progress),
+    item_done (file, bytes, ms), item_failed (error), requeued, done and
+    failed. The stream ends after done or failed. Reconnecting clients send
+    Last-Event-ID and resume after that event.
+    """
+    if await asyncio.to_thread(STORE.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    async def stream() -> AsyncIterator[bytes]:
+        after = last_event_id or 0
+        idle_since = time.monotonic()
+        while not await request.is_disconnected():
+            events = await asyncio.to_thread(STORE.events, job_id, after)
+            for event in events:
+                after = event["seq"]
+                yield _sse(event)
+                if event["type"] in FINAL_EVENTS:
+                    return
+            if events:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since > EVENTS_KEEPALIVE_SECONDS:
+                idle_since = time.monotonic()
+                yield b": keep-alive\n\n"
+            await asyncio.sleep(EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _read_item(job_id: str, index: int) -> Optional[bytes]:
+    prefix = f"{index + 1:04d}-"
+    parts = STORE.parts_dir(job_id)
+    if parts.is_dir():
+        # One subdirectory per worker that claimed the job; any complete copy will do.
+        for p in parts.glob(f"*/{prefix}*.pdf"):
+            return p.read_bytes()
+    result = STORE.result_path(job_id)
+    if result.exists():
+        with zipfile.ZipFile(result) as zf:
+            for name in zf.namelist():
+                if name.startswith(prefix) and name.endswith(".pdf"):
+                    return zf.read(name)
+    return None
+
+@router.get("/{job_id}/items/{index}")
+async def get_job_item(job_id: str, index: int):
+    """
+    Downloads one finished item PDF, also while the rest of the job is still running.
+
+    Returns 404 if the job does not exist or the item has not finished (or failed).
+    """
+    if await asyncio.to_thread(STORE.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    pdf = await asyncio.to_thread(_read_item, job_id, index)
+    if pdf is None:
+        raise HTTPException(status_code=404, detail="Item not available")
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="job-{job_id}-{index + 1:04d}.pdf"'},
+    )
+
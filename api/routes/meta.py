@@ -1,33 +1,71 @@
-from fastapi import APIRouter
+from __future__ import annotations
 
-from api.registry import (
-    THEME_NAMES,
-    LAYOUT_NAMES,
-    UI_LANG_OBJS,
-    DEFAULT_THEME,
-    DEFAULT_LAYOUT,
-    DEFAULT_UI,
-)
+import hashlib
+import json
+import os
+import threading
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Request, Response
+
+from api.registry import REGISTRY
+from .common import etag_matches
 
 router = APIRouter(prefix="/meta", tags=["meta"])
 
+# Seconds clients may reuse /meta/choices without revalidating.
+CHOICES_MAX_AGE = int(os.getenv("META_CHOICES_MAX_AGE", "60"))
+
+# (registry version, serialized body, ETag); rebuilt only when the registry reloads.
+_CHOICES: Optional[Tuple[int, bytes, str]] = None
+_CHOICES_LOCK = threading.Lock()
+
+def _build_choices() -> Tuple[int, bytes, str]:
+    """
+    Serializes the current registry into the /meta/choices body.
+
+    The ETag is derived from the body, so every worker hands out the same tag
+    for the same registry contents regardless of how often it has reloaded.
+    """
+    reg = REGISTRY.current
+    data = {
+        "themes": reg.theme_names,
+        "layouts": reg.layout_names,
+        "ui_langs": reg.ui_lang_objs,
+        "defaults": {
+            "theme": reg.default_theme,
+            "layout": reg.default_layout,
+            "ui_lang": reg.default_ui,
+        },
+    }
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+    return reg.version, body, etag
+
+def _current_choices() -> Tuple[int, bytes, str]:
+    global _CHOICES
+    cached = _CHOICES
+    if cached is None or cached[0] != REGISTRY.current.version:
+        with _CHOICES_LOCK:
+            cached = _CHOICES
+            if cached is None or cached[0] != REGISTRY.current.version:
+                cached = _CHOICES = _build_choices()
+    return cached
+
 @router.get("/choices")
-def get_choices():
+def get_choices(request: Request):
     """
     Returns available choices for themes, layouts, and UI languages,
     along with their respective default values.
 
+    The body is serialized once per registry version and served with an ETag
+    and a Cache-Control max-age; a matching If-None-Match gets an empty 304.
+
     Returns:
-        dict: A dictionary containing available themes, layouts, UI languages,
-              and default values for each category.
+        Response: JSON with themes, layouts, ui_langs and defaults, or 304.
     """
-    return {
-        "themes": THEME_NAMES,
-        "layouts": LAYOUT_NAMES,
-        "ui_langs": UI_LANG_OBJS,
-        "defaults": {
-            "theme": DEFAULT_THEME,
-            "layout": DEFAULT_LAYOUT,
-            "ui_lang": DEFAULT_UI,
-        },
-    }
\ No newline at end of file
+    _, body, etag = _current_choices()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CHOICES_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
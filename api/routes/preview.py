@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import traceback
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+
+from api.disconnect import cancel_on_disconnect
+from api.rate_limit import Client, admit, identify_client
+from api.registry import REGISTRY
+from api.render_queue import RENDER_QUEUE, QueueRejected
+from api.schemas import GenerateFormRequest
+from ..pdf_utils.cancel import CancelToken, RenderCancelled
+from ..pdf_utils.preview_cache import PREVIEWS, preview_key
+from ..pdf_utils.raster import render_png
+from ..pdf_utils.svg import render_svg
+from .common import busy, cancelled, etag_matches, prepare_render_data
+
+router = APIRouter(prefix="", tags=["preview"])
+
+PREVIEW_MAX_DPI = int(os.getenv("PREVIEW_MAX_DPI", "300"))
+# Default thumbnail resolution: half of 72 dpi, which renders in about half the
+# time (fewer pixels to fill and encode) and is enough for a live preview column.
+PREVIEW_DEFAULT_DPI = int(os.getenv("PREVIEW_DEFAULT_DPI", "36"))
+
+# Request fields that only affect the PDF file or the bundle, not the first page's drawing.
+_NOT_DRAWN = {"linearize", "compact", "compression", "ui_langs", "palettes"}
+
+# Latest preview token per (client, session, kind); a newer one cancels the older one.
+_SESSIONS: Dict[Tuple[str, str, str], CancelToken] = {}
+
+async def _cached_preview(route: str, kind: str, media_type: str, render: Callable[..., bytes],
+                          options: Dict[str, Any], request: Request, req: GenerateFormRequest,
+                          client: Client, session: Optional[str]) -> Response:
+    """
+    Serves a preview from `PREVIEWS`, rendering it on a miss on the interactive
+    lane (capped at the client's max_priority).
+
+    The cache key (also the ETag) covers the output kind, its options, the
+    stamps of the theme, layout and language files used, and every request
+    field that changes the drawing. Editing another theme or layout keeps
+    these previews cached.
+    """
+    files = REGISTRY.fingerprint(req.theme_name, req.layout_name)
+    key = preview_key(kind, options, files, req.model_dump(mode="json", exclude=_NOT_DRAWN))
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={**headers, "X-Preview-Cache": "hit"})
+    body = PREVIEWS.get(key)
+    if body is not None:
+        return Response(content=body, media_type=media_type, headers={**headers, "X-Preview-Cache": "hit"})
+
+    admit(client)
+    slot = (client.id, session, kind) if session else None
+    token = CancelToken()
+    if slot is not None:
+        previous = _SESSIONS.get(slot)
+        _SESSIONS[slot] = token
+        if previous is not None:
+            previous.cancel("superseded")
+    try:
+        data = prepare_render_data(req)
+        async with cancel_on_disconnect(request, token):
+            body = await RENDER_QUEUE.run(
+                render, data, **options, client=client.id, weight=client.weight,
+                priority=client.priority("interactive"), cancel=token,
+            )
+    except RenderCancelled as e:
+        raise cancelled(route, e)
+    except QueueRejected as e:
+        raise busy(route, e)
+    except Exception as e:
+        print(f"[Error] {route}:")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error generating preview: {e}")
+    finally:
+        if slot is not None and _SESSIONS.get(slot) is token:
+            del _SESSIONS[slot]
+    PREVIEWS.put(key, body)
+    return Response(content=body, media_type=media_type, headers={**headers, "X-Preview-Cache": "miss"})
+
+@router.post("/preview.png")
+async def preview_png(
+    request: Request,
+    req: GenerateFormRequest,
+    client: Client = Depends(identify_client),
+    dpi: int = Query(PREVIEW_DEFAULT_DPI, ge=18, le=PREVIEW_MAX_DPI),
+    session: Optional[str] = Header(default=None, alias="X-Preview-Session", min_length=1, max_length=128),
+):
+    """
+    First page of the resume as a PNG thumbnail, drawn without writing a PDF.
+
+    The display list is replayed on a Pillow canvas at `dpi` (default
+    PREVIEW_DEFAULT_DPI, 36; at most PREVIEW_MAX_DPI), which costs less than
+    rendering the PDF and is cheap enough to refresh while the user types. Responses are cached by request content: repeats are served from
+    memory (X-Preview-Cache: hit) and a matching If-None-Match gets an empty 304.
+    With X-Preview-Session, a newer preview of the same session supersedes a
+    pending one (409), as with /preview. `ui_langs`, `palettes` and the PDF
+    output options are ignored.
+    """
+    return await _cached_preview(
+        "/preview.png", "png", "image/png", render_png, {"dpi": dpi}, request, req, client, session,
+    )
+
+@router.post("/preview.svg")
+async def preview_svg(
+    request: Request,
+    req: GenerateFormRequest,
+    client: Client = Depends(identify_client),
+    embed_fonts: bool = Query(True),
+    session: Optional[str] = Header(default=None, alias="X-Preview-Session", min_length=1, max_length=128),
+):
+    """
+    First page of the resume as SVG, for browsers to render without a PDF viewer.
+
+    Text, paths, icons (data URIs) and link hotspots are written from the
+    display list, with no PDF serialization or font subsetting. The TrueType
+    fonts used (e.g. the Arabic font) are embedded unless `embed_fonts` is
+    false, in which case the browser's fonts are used. Caching, ETags and
+    X-Preview-Session work as for /preview.png.
+    """
+    return await _cached_preview(
+        "/preview.svg", "svg", "image/svg+xml", render_svg, {"embed_fonts": embed_fonts},
+        request, req, client, session,
+    )
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, List, Optional, Tuple, Annotated
-from pydantic import BaseModel, EmailStr, Field, HttpUrl, field_validator
+from typing import Any, Dict, List, Literal, Optional, Tuple, Annotated
+from pydantic import BaseModel, EmailStr, Field, HttpUrl, field_validator, model_validator
 
 # -------------------------------------------------
 # General Limits
@@ -14,18 +14,24 @@ MAX_EDUCATION = 20
 MAX_STR_LEN = 2000
 MAX_TITLE_LEN = 120
 MAX_DESC_LEN = 600
+MAX_BATCH_ITEMS = 500
+MAX_PALETTES = 50
+MAX_ASSEMBLY_PARTS = 20
 
 # -------------------------------------------------
 # Registry-based dynamic lists and defaults
 # -------------------------------------------------
-from .registry import (
-    THEME_NAMES, LAYOUT_NAMES, UI_LANGS, RTL_LANGS,
-    DEFAULT_THEME, DEFAULT_LAYOUT, DEFAULT_UI,
-)
+# Names are read from REGISTRY.current at validation time so that themes,
+# layouts and languages added on disk are accepted without a restart. The
+# OpenAPI enums below reflect the registry at import time only.
+from .registry import REGISTRY, THEME_NAMES, LAYOUT_NAMES, UI_LANGS
+from .pdf_utils.theme_loader import parse_palette
 
 ThemeNameStr = Annotated[str, Field(json_schema_extra={"enum": THEME_NAMES})]
 LayoutNameStr = Annotated[str, Field(json_schema_extra={"enum": LAYOUT_NAMES})]
 UILangStr = Annotated[str, Field(json_schema_extra={"enum": UI_LANGS})]
+# Names of api.pdf_utils.compression.PROFILES.
+CompressionName = Literal["none", "fast", "balanced", "max"]
 
 # -------------------------------------------------
 # Helper functions
@@ -153,32 +159,46 @@ class Profile(BaseModel):
         return v
 
 class GenerateFormRequest(BaseModel):
-    theme_name: ThemeNameStr = Field(default=DEFAULT_THEME)
-    layout_name: LayoutNameStr = Field(default=DEFAULT_LAYOUT)
-    ui_lang: UILangStr = Field(default=DEFAULT_UI)
+    theme_name: ThemeNameStr = Field(default_factory=lambda: REGISTRY.current.default_theme)
+    layout_name: LayoutNameStr = Field(default_factory=lambda: REGISTRY.current.default_layout)
+    ui_lang: UILangStr = Field(default_factory=lambda: REGISTRY.current.default_ui)
     rtl_mode: bool | None = None
+    # Optional fan-out: render the same profile once per language and return a ZIP bundle.
+    ui_langs: Optional[List[UILangStr]] = None
+    # Optional palette variants: color overrides keyed by theme color names
+    # (HEADING_COLOR, SUBHEAD_COLOR, MUTED, RULE_COLOR, LEFT_BG, LEFT_BORDER, ...).
+    palettes: Optional[List[Dict[str, Any]]] = Field(default=None, max_length=MAX_PALETTES)
+    # Write linearized ("fast web view") PDFs that browsers can show before the download ends,
+    # or compact PDF 1.5 files (object streams, xref stream) for archives; not both.
+    linearize: bool = False
+    compact: bool = False
+    # Compression profile (size against render time); None keeps ReportLab's default output.
+    compression: Optional[CompressionName] = None
     profile: Profile
 
     @field_validator("layout_name", mode="before")
     @classmethod
     def empty_to_single_column(cls, v):
         v = v or "single-column"
-        if v not in LAYOUT_NAMES:
-            raise ValueError(f"layout_name must be one of {LAYOUT_NAMES}")
+        names = REGISTRY.current.layout_names
+        if v not in names:
+            raise ValueError(f"layout_name must be one of {names}")
         return v
 
     @field_validator("theme_name")
     @classmethod
     def _check_theme(cls, v: str):
-        if v not in THEME_NAMES:
-            raise ValueError(f"theme_name must be one of {THEME_NAMES}")
+        names = REGISTRY.current.theme_names
+        if v not in names:
+            raise ValueError(f"theme_name must be one of {names}")
         return v
 
     @field_validator("ui_lang")
     @classmethod
     def _check_lang(cls, v: str):
-        if v not in UI_LANGS:
-            raise ValueError(f"ui_lang must be one of {UI_LANGS}")
+        langs = REGISTRY.current.ui_langs
+        if v not in langs:
+            raise ValueError(f"ui_lang must be one of {langs}")
         return v
 
     @field_validator("rtl_mode")
@@ -186,5 +206,104 @@ class GenerateFormRequest(BaseModel):
     def auto_rtl_by_lang(cls, v, info):
         if isinstance(v, bool):
             return v
-        ui_lang = info.data.get("ui_lang", DEFAULT_UI)
-        return ui_lang in RTL_LANGS
\ No newline at end of file
+        reg = REGISTRY.current
+        ui_lang = info.data.get("ui_lang", reg.default_ui)
+        return ui_lang in reg.rtl_langs
+
+    @field_validator("ui_langs")
+    @classmethod
+    def _check_langs(cls, v: Optional[List[str]]):
+        if not v:
+            return None
+        langs = REGISTRY.current.ui_langs
+        unknown = [x for x in v if x not in langs]
+        if unknown:
+            raise ValueError(f"ui_langs must be a subset of {langs} (unknown: {unknown})")
+        return list(dict.fromkeys(v))
+
+    @field_validator("palettes")
+    @classmethod
+    def _check_palettes(cls, v: Optional[List[Dict[str, Any]]]):
+        if not v:
+            return None
+        for i, palette in enumerate(v):
+            try:
+                parse_palette(palette)
+            except ValueError as e:
+                raise ValueError(f"palettes[{i}]: {e}")
+        return v
+
+    @model_validator(mode="after")
+    def _one_writer(self):
+        if self.linearize and self.compact:
+            raise ValueError("linearize and compact cannot be combined")
+        return self
+
+class BatchItemRequest(GenerateFormRequest):
+    """
+    One item of a batch or job: a GenerateFormRequest that renders exactly one PDF.
+    """
+
+    @model_validator(mode="after")
+    def _single_variant(self):
+        if self.ui_langs:
+            raise ValueError("ui_langs is not supported in batch items; add one item per language")
+        if self.palettes:
+            raise ValueError("palettes is not supported in batch items; add one item per palette")
+        return self
+
+class GenerateBatchRequest(BaseModel):
+    """
+    Batch of generate payloads. Items are kept raw here and validated one by
+    one against BatchItemRequest, so one invalid item does not reject the batch.
+    """
+    items: List[dict] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class PagePart(BaseModel):
+    """
+    Simple text page of an assembled document (cover sheet, appendix).
+    """
+    heading: str = Field(..., min_length=1, max_length=MAX_TITLE_LEN)
+    section: str = Field(default="", max_length=MAX_TITLE_LEN)
+    lines: List[str] = []
+    theme_name: Optional[ThemeNameStr] = None
+
+    @field_validator("lines")
+    @classmethod
+    def _limit_lines(cls, v: List[str]):
+        _assert_list_max(v, MAX_SUMMARY, "lines")
+        for i, s in enumerate(v):
+            _assert_str_max(s, MAX_STR_LEN, f"lines[{i}]")
+        return v
+
+class AssemblyPart(BaseModel):
+    """
+    One part of an assembled PDF: either a resume or a text page.
+    """
+    title: str = Field(..., min_length=1, max_length=MAX_TITLE_LEN)
+    resume: Optional[GenerateFormRequest] = None
+    page: Optional[PagePart] = None
+
+    @model_validator(mode="after")
+    def _one_kind(self):
+        if (self.resume is None) == (self.page is None):
+            raise ValueError("each part needs exactly one of 'resume' or 'page'")
+        if self.resume is not None and (self.resume.ui_langs or self.resume.palettes):
+            raise ValueError("ui_langs and palettes are not supported inside assembly parts; add one part per variant")
+        return self
+
+class AssembleRequest(BaseModel):
+    """
+    Parts of one combined PDF, in page order.
+    """
+    parts: List[AssemblyPart] = Field(..., min_length=1, max_length=MAX_ASSEMBLY_PARTS)
+    linearize: bool = False
+    compact: bool = False
+    compression: Optional[CompressionName] = None
+
+    @model_validator(mode="after")
+    def _one_writer(self):
+        if self.linearize and self.compact:
+            raise ValueError("linearize and compact cannot be combined")
+        return self
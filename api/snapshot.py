@@ -0,0 +1,165 @@
+"""
+Persisted warm-start snapshot of derived rendering state.
+
+New workers normally re-parse the TTF files, re-decode every icon and rebuild
+every theme and layout. The snapshot stores that derived state in one
+versioned file that a worker loads with a single read at startup:
+
+- parsed TrueType faces (metrics, width tables and the raw data used for subsetting)
+- decoded icon images (pixel buffers included)
+- compiled themes and compiled theme/layout pairs
+
+The snapshot carries a fingerprint (size and mtime of every source asset plus
+library versions). On mismatch it is ignored and rewritten after a normal warmup.
+The file is a pickle written by the server itself; keep it in a private directory.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import reportlab
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTEncoding, TTFont, TTFontFace
+
+from .pdf_utils import fonts, icons, theme_loader
+from .routes import common
+
+SNAPSHOT_VERSION = 1
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def snapshot_path() -> Path:
+    """
+    Return the snapshot location.
+
+    Environment Variable:
+        WARMSTART_SNAPSHOT: Overrides the default path (`.cache/warmstart.snapshot`).
+    """
+    env = os.getenv("WARMSTART_SNAPSHOT")
+    if env:
+        return Path(env).expanduser()
+    return ROOT / ".cache" / "warmstart.snapshot"
+
+def _source_files() -> List[Path]:
+    files: List[Path] = [Path(str(fonts.FONT_PATH_NOTO)), Path(str(fonts.FONT_PATH_AMIRI))]
+    files.extend(sorted(set(icons.ICON_PATHS.values())))
+    files.extend(sorted((ROOT / "themes").glob("*.theme.json")))
+    files.extend(sorted((ROOT / "layouts").glob("*.layout.json")))
+    return files
+
+def source_fingerprint() -> Tuple[Any, ...]:
+    """
+    Fingerprint every source the snapshot is derived from, using stat only.
+
+    Returns:
+        Tuple[Any, ...]: Comparable fingerprint; any change invalidates the snapshot.
+    """
+    entries: List[Tuple[str, int, int]] = []
+    for p in _source_files():
+        try:
+            st = p.stat()
+            entries.append((str(p), st.st_size, st.st_mtime_ns))
+        except OSError:
+            entries.append((str(p), -1, -1))
+    return (SNAPSHOT_VERSION, sys.version_info[:2], reportlab.Version, tuple(entries))
+
+# ============================================================
+# TrueType faces
+# ============================================================
+def _font_state(font: TTFont) -> Dict[str, Any]:
+    face = {k: v for k, v in vars(font.face).items() if k != "_pdfScale"}
+    return {
+        "name": font.fontName,
+        "face": face,
+        "asciiReadable": font._asciiReadable,
+        "shapable": font.shapable,
+    }
+
+def _font_from_state(state: Dict[str, Any]) -> TTFont:
+    face = TTFontFace.__new__(TTFontFace)
+    face.__dict__.update(state["face"])
+    upem = face.unitsPerEm
+    face._pdfScale = (lambda x: x) if upem == 1000 else (lambda x, _m=1000 / upem: x * _m)
+
+    font = TTFont.__new__(TTFont)
+    font.fontName = state["name"]
+    font.face = face
+    font.encoding = TTEncoding()
+    font.state = WeakKeyDictionary()
+    font._asciiReadable = state["asciiReadable"]
+    font.shapable = state["shapable"]
+    return font
+
+def _registered_ttfs() -> List[TTFont]:
+    out = []
+    for name in pdfmetrics.getRegisteredFontNames():
+        f = pdfmetrics.getFont(name)
+        if isinstance(f, TTFont):
+            out.append(f)
+    return out
+
+# ============================================================
+# Load / save
+# ============================================================
+def load_snapshot(path: Optional[Path] = None) -> Optional[str]:
+    """
+    Load the snapshot into the in-process caches if it matches the current sources.
+
+    Args:
+        path (Optional[Path]): Snapshot file; defaults to `snapshot_path()`.
+
+    Returns:
+        Optional[str]: Short summary when loaded, or None when missing or stale.
+    """
+    path = path or snapshot_path()
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        snap = pickle.loads(raw)
+    except Exception as e:
+        print(f"[WARN] Ignoring unreadable snapshot {path}: {e}")
+        return None
+    if not isinstance(snap, dict) or snap.get("fingerprint") != source_fingerprint():
+        return None
+
+    fonts.preload_fonts({s["name"]: _font_from_state(s) for s in snap["fonts"]})
+    icons._ICON_CACHE.update(snap["icons"])
+    theme_loader._COMPILED.update(snap["themes"])
+    common._LAYOUT_CACHE.update(snap["layouts"])
+    return (
+        f"{len(snap['fonts'])} fonts, {len(snap['icons'])} icons, "
+        f"{len(snap['themes'])} themes, {len(snap['layouts'])} layouts ({len(raw)} bytes)"
+    )
+
+def save_snapshot(path: Optional[Path] = None) -> str:
+    """
+    Write the current caches to disk atomically.
+
+    Args:
+        path (Optional[Path]): Snapshot file; defaults to `snapshot_path()`.
+
+    Returns:
+        str: Short summary of what was written.
+    """
+    path = path or snapshot_path()
+    snap = {
+        "fingerprint": source_fingerprint(),
+        "fonts": [_font_state(f) for f in _registered_ttfs()],
+        "icons": dict(icons._ICON_CACHE),
+        "themes": dict(theme_loader._COMPILED),
+        "layouts": dict(common._LAYOUT_CACHE),
+    }
+    data = pickle.dumps(snap, protocol=pickle.HIGHEST_PROTOCOL)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return f"{path} ({len(data)} bytes)"
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+def _load_snapshot() -> str:
+    from .snapshot import load_snapshot
+    summary = load_snapshot()
+    STATE.snapshot_loaded = summary is not None
+    return f"loaded {summary}" if summary else "no valid snapshot, building from sources"
+
+def _save_snapshot() -> str:
+    if STATE.snapshot_loaded:
+        return "up to date"
+    from .snapshot import save_snapshot
+    return f"written to {save_snapshot()}"
+
+def _warm_fonts() -> str:
+    from .pdf_utils import fonts
+    fonts.ensure_fonts()
+    return f"arabic font {fonts.AR_FONT}"
+
+def _warm_blocks() -> str:
+    from .pdf_utils.blocks import all_blocks
+    return f"{len(all_blocks())} blocks registered"
+
+def _warm_icons() -> str:
+    from .pdf_utils.icons import warm_icons
+    return f"{warm_icons()} icons decoded"
+
+def _warm_themes() -> str:
+    from .registry import REGISTRY
+    from .pdf_utils.theme_loader import compile_theme
+    names = REGISTRY.current.theme_names
+    for name in names:
+        compile_theme(name)
+    return f"{len(names)} themes compiled"
+
+def _warm_layouts() -> str:
+    from .registry import REGISTRY
+    from .routes.common import compile_layout
+    reg = REGISTRY.current
+    n = 0
+    for theme_name in reg.theme_names:
+        for layout_name in reg.layout_names:
+            compile_layout(theme_name, layout_name)
+            n += 1
+    return f"{n} theme/layout pairs compiled"
+
+# Order matters: the snapshot seeds the caches the later steps fill, blocks measure
+# text with registered fonts, layouts reference themes, and the snapshot is
+# rewritten last from the complete caches.
+STEPS: List[Tuple[str, Callable[[], str]]] = [
+    ("snapshot", _load_snapshot),
+    ("fonts", _warm_fonts),
+    ("blocks", _warm_blocks),
+    ("icons", _warm_icons),
+    ("themes", _warm_themes),
+    ("layouts", _warm_layouts),
+    ("snapshot_save", _save_snapshot),
+]
+
+@dataclass
+class WarmupState:
+    ready: bool = False
+    running: bool = False
+    snapshot_loaded: bool = False
+    steps_ms: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    total_ms: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "running": self.running,
+            "snapshot_loaded": self.snapshot_loaded,
+            "steps_ms": dict(self.steps_ms),
+            "errors": dict(self.errors),
+            "total_ms": self.total_ms,
+        }
+
+STATE = WarmupState()
+
+def run_warmup() -> WarmupState:
+    """
+    Build fonts, blocks, icons, compiled themes and compiled layouts in order.
+
+    Each step is timed and logged. A failing step is recorded in `STATE.errors`
+    and does not stop later steps, since every resource can still be built
+    lazily on first use.
+
+    Returns:
+        WarmupState: The shared warmup state, marked ready once all steps ran.
+    """
+    STATE.running = True
+    t_all = time.perf_counter()
+    for name, step in STEPS:
+        t0 = time.perf_counter()
+        try:
+            detail = step()
+            print(f"[Warmup] {name}: {detail} ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+        except Exception as e:
+            STATE.errors[name] = repr(e)
+            print(f"[Warmup] {name} failed: {e!r}")
+        STATE.steps_ms[name] = round((time.perf_counter() - t0) * 1000, 1)
+    STATE.total_ms = round((time.perf_counter() - t_all) * 1000, 1)
+    STATE.running = False
+    STATE.ready = True
+    print(f"[Warmup] done in {STATE.total_ms} ms")
+    return STATE
@@ -0,0 +1,136 @@
+"""
+Benchmark of the PDF output writers: file size against render time.
+
+    python dev_tools/bench_pdf_writers.py
+    python dev_tools/bench_pdf_writers.py --profile my_profile.json --repeat 20 --langs en ar
+    python dev_tools/bench_pdf_writers.py --avatar photo.jpg --writers default none fast balanced max
+
+Every theme/layout/language combination is rendered with each writer
+(default ReportLab output, `compact`, `linearize` and the compression
+profiles). The table reports the median render time (including the writer
+and the avatar re-encoding) and the file size per writer, and the totals show
+the trade-off over all combinations.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SAMPLE_PROFILE: Dict[str, Any] = {
+    "header": {"name": "Tamer Hammadeh Faour", "title": "Backend Developer"},
+    "contact": {"email": "tamer@example.com", "phone": "+49 000 000", "location": "Berlin"},
+    "summary": ["Backend developer building document pipelines and APIs with Python."],
+    "skills": ["Python", "FastAPI", "ReportLab", "PostgreSQL", "Docker"],
+    "languages": ["Arabic - C2", "English - B2", "German - B1"],
+    "projects": [["Resume API", "PDF rendering service\nThemes and layouts", "https://example.com"]],
+    "education": ["BSc Computer Science\nUniversity\nhttps://uni.example"],
+}
+
+# (label, render data overrides)
+WRITERS: List[Tuple[str, Dict[str, Any]]] = [
+    ("default", {}),
+    ("compact", {"compact": True}),
+    ("linearize", {"linearize": True}),
+    ("none", {"compression": "none"}),
+    ("fast", {"compression": "fast"}),
+    ("balanced", {"compression": "balanced"}),
+    ("max", {"compression": "max"}),
+    ("max+compact", {"compression": "max", "compact": True}),
+]
+
+def _render(data: Dict[str, Any]) -> bytes:
+    from api.pdf_utils.resume import build_resume_pdf
+    with contextlib.redirect_stdout(io.StringIO()):
+        return build_resume_pdf(data=data)
+
+def bench(profile: Dict[str, Any], themes: List[str], layouts: List[str], langs: List[str],
+          repeat: int, writers: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Renders every combination with every writer.
+
+    Returns:
+        List[Dict[str, Any]]: One row per combination and writer (bytes, median ms).
+    """
+    from api.registry import REGISTRY
+    from api.routes.common import compile_layout
+
+    rtl_langs = REGISTRY.current.rtl_langs
+    rows: List[Dict[str, Any]] = []
+    for theme in themes:
+        for layout in layouts:
+            base = {"profile": profile, "theme_name": theme, "layout_inline": compile_layout(theme, layout)}
+            for lang in langs:
+                for label, extra in writers:
+                    data = {**base, "ui_lang": lang, "rtl_mode": lang in rtl_langs, **extra}
+                    _render(data)  # warm caches
+                    times = []
+                    for _ in range(repeat):
+                        t0 = time.perf_counter()
+                        pdf = _render(data)
+                        times.append((time.perf_counter() - t0) * 1000)
+                    rows.append({
+                        "theme": theme, "layout": layout, "lang": lang, "writer": label,
+                        "bytes": len(pdf), "ms": statistics.median(times),
+                    })
+    return rows
+
+def main() -> None:
+    """
+    Parses arguments, runs the benchmark and prints the table and totals.
+    """
+    from api.registry import REGISTRY
+
+    reg = REGISTRY.current
+    ap = argparse.ArgumentParser(description="Compare PDF writers by size and render time.")
+    ap.add_argument("--profile", type=Path, default=None, help="profile JSON (default: built-in sample)")
+    ap.add_argument("--themes", nargs="+", default=[reg.default_theme])
+    ap.add_argument("--layouts", nargs="+", default=list(reg.layout_names))
+    ap.add_argument("--langs", nargs="+", default=list(reg.ui_langs))
+    ap.add_argument("--repeat", type=int, default=10, help="timed renders per combination (default 10)")
+    ap.add_argument("--avatar", type=Path, default=None, help="avatar photo added to the profile")
+    ap.add_argument("--writers", nargs="+", default=[label for label, _extra in WRITERS],
+                    choices=[label for label, _extra in WRITERS], help="writers to compare (first is the reference)")
+    ap.add_argument("--json", action="store_true", help="print rows as JSON instead of a table")
+    args = ap.parse_args()
+
+    profile = json.loads(args.profile.read_text(encoding="utf-8")) if args.profile else SAMPLE_PROFILE
+    profile = profile.get("profile", profile)
+    if args.avatar:
+        profile = {**profile, "avatar": {"path": str(args.avatar.resolve())}}
+    writers = [(label, extra) for label, extra in WRITERS if label in args.writers]
+    writers.sort(key=lambda w: args.writers.index(w[0]))
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api.warmup import run_warmup
+        run_warmup()
+
+    rows = bench(profile, args.themes, args.layouts, args.langs, max(1, args.repeat), writers)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'theme':<18} {'layout':<16} {'lang':<5} {'writer':<12} {'bytes':>8} {'ms':>8}")
+    for r in rows:
+        print(f"{r['theme']:<18} {r['layout']:<16} {r['lang']:<5} {r['writer']:<12} {r['bytes']:>8} {r['ms']:>8.1f}")
+    base = {(r["theme"], r["layout"], r["lang"]): r for r in rows if r["writer"] == writers[0][0]}
+    print()
+    for label, _extra in writers:
+        sel = [r for r in rows if r["writer"] == label]
+        size = sum(r["bytes"] for r in sel)
+        ms = sum(r["ms"] for r in sel)
+        ref_size = sum(base[(r["theme"], r["layout"], r["lang"])]["bytes"] for r in sel)
+        ref_ms = sum(base[(r["theme"], r["layout"], r["lang"])]["ms"] for r in sel)
+        print(f"{label:<12} total {size:>9} B ({100 * size / ref_size:5.1f}%)  {ms:>8.1f} ms ({100 * ms / ref_ms:5.1f}%)")
+
+if __name__ == "__main__":
+    main()
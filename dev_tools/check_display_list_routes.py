@@ -0,0 +1,65 @@
+"""
+Regression check for the routes that render from a recorded display list.
+
+    python dev_tools/check_display_list_routes.py
+
+Palette variants (and the other routes listed in CASES) lay the page out once
+on a recording canvas and replay it afterwards. A canvas call that fails while
+recording (e.g. a block passing a URL object where ReportLab wants a string)
+must fail only its block, as in a direct render, and must not reach the replay.
+Every case posts a valid profile with contact and project URLs and expects the
+same status as /generate-form-simple. Exits with 1 if any case fails.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+URL_PROFILE: Dict[str, Any] = {
+    "header": {"name": "Jane Doe", "title": "Backend Developer"},
+    "contact": {"email": "jane@example.com", "github": "https://github.com/jane", "location": "Berlin"},
+    "summary": ["Backend developer building document pipelines and APIs with Python."],
+    "skills": ["Python", "FastAPI", "ReportLab"],
+    "languages": ["English - C2"],
+    "projects": [["Resume API", "PDF rendering service", "https://example.com/resume-api"]],
+    "education": ["BSc Computer Science\nUniversity"],
+}
+
+REQUEST: Dict[str, Any] = {"theme_name": "default", "layout_name": "left-panel", "ui_lang": "en", "profile": URL_PROFILE}
+
+# (label, path, JSON body)
+CASES: List[Tuple[str, str, Dict[str, Any]]] = [
+    ("direct PDF", "/generate-form-simple", REQUEST),
+    ("palette variants", "/generate-form-simple", {**REQUEST, "palettes": [{"HEADING_COLOR": "#aa0000"}]}),
+    ("PNG preview", "/preview.png", REQUEST),
+    ("SVG preview", "/preview.svg", REQUEST),
+    ("assembled resume", "/assemble", {"parts": [{"title": "Resume", "resume": REQUEST}]}),
+    ("incremental base", "/generate-incremental", REQUEST),
+]
+
+def main() -> int:
+    """
+    Runs every case against the app in-process and prints one line per case.
+
+    Returns:
+        int: 0 if every case returned 200, else 1.
+    """
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    failed = 0
+    with TestClient(app) as client:
+        for label, path, body in CASES:
+            r = client.post(path, json=body)
+            ok = r.status_code == 200
+            failed += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {label:<20} {path} -> {r.status_code}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,50 @@
+import re
+import time
+
 import requests
 
 API_BASE = "http://127.0.0.1:8000"
 
+# Last /meta/choices response: {"etag", "data", "expires"}. Survives Streamlit reruns.
+_CHOICES_CACHE: dict = {}
+
+# Last /preview.png response per session: {"etag", "image"}. Survives Streamlit reruns.
+_THUMBNAILS: dict = {}
+
+def get_choices() -> dict | None:
+    """
+    Fetches the available themes, layouts and UI languages from /meta/choices.
+
+    The response is reused until its Cache-Control max-age expires and then
+    revalidated with If-None-Match, so reruns usually make no request at all.
+
+    Returns:
+        dict | None: The choices payload, or None if the API is unreachable
+            and nothing has been cached yet.
+    """
+    now = time.monotonic()
+    if _CHOICES_CACHE and now < _CHOICES_CACHE["expires"]:
+        return _CHOICES_CACHE["data"]
+
+    headers = {}
+    if _CHOICES_CACHE.get("etag"):
+        headers["If-None-Match"] = _CHOICES_CACHE["etag"]
+    try:
+        response = requests.get(f"{API_BASE}/meta/choices", headers=headers, timeout=5)
+    except requests.RequestException:
+        return _CHOICES_CACHE.get("data")
+
+    m = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    max_age = int(m.group(1)) if m else 0
+    if response.status_code == 304 and _CHOICES_CACHE:
+        _CHOICES_CACHE["expires"] = now + max_age
+        return _CHOICES_CACHE["data"]
+    if not response.ok:
+        return _CHOICES_CACHE.get("data")
+
+    _CHOICES_CACHE.update(etag=response.headers.get("ETag"), data=response.json(), expires=now + max_age)
+    return _CHOICES_CACHE["data"]
+
 def generate_pdf(
     profile: dict,
     theme_name: str,
@@ -33,6 +76,65 @@ def generate_pdf(
         "profile": profile or {},
     }
 
-    response = requests.post(f"{API_BASE}/generate-form-simple", json=payload, timeout=60)
+    # The user is waiting on the download: ask for the interactive render lane
+    # (the server caps it at the client's max_priority).
+    response = requests.post(
+        f"{API_BASE}/generate-form-simple",
+        json=payload,
+        headers={"X-Render-Priority": "interactive"},
+        timeout=60,
+    )
+    response.raise_for_status()
+    return response.content
+
+def preview_png(
+    profile: dict,
+    theme_name: str,
+    layout_name: str | None,
+    ui_lang: str,
+    rtl_mode: bool,
+    session_id: str,
+    dpi: int = 36,
+) -> bytes | None:
+    """
+    Fetches a PNG thumbnail of the first page from /preview.png.
+
+    The thumbnail is cheap enough to refresh on every rerun; the last one is
+    revalidated with its ETag, so an unchanged form costs an empty 304.
+
+    Args:
+        profile (dict): The profile data to include in the PDF.
+        theme_name (str): The name of the theme to use.
+        layout_name (str | None): The layout name or None for default.
+        ui_lang (str): The UI language code.
+        rtl_mode (bool): Whether to use right-to-left layout.
+        session_id (str): Stable id of the editing session.
+        dpi (int): Thumbnail resolution (36 keeps it cheaper than a PDF render).
+
+    Returns:
+        bytes | None: The PNG image, or None if a newer preview superseded it.
+
+    Raises:
+        HTTPError: If the request fails with any other non-2xx response.
+    """
+    payload = {
+        "theme_name": theme_name,
+        "layout_name": layout_name,
+        "ui_lang": ui_lang,
+        "rtl_mode": rtl_mode,
+        "profile": profile or {},
+    }
+    headers = {"X-Preview-Session": session_id}
+    last = _THUMBNAILS.get(session_id)
+    if last:
+        headers["If-None-Match"] = last["etag"]
+
+    response = requests.post(f"{API_BASE}/preview.png", params={"dpi": dpi}, json=payload, headers=headers, timeout=30)
+    if response.status_code == 304 and last:
+        return last["image"]
+    if response.status_code == 409:
+        return None
     response.raise_for_status()
-    return response.content
\ No newline at end of file
+    if response.headers.get("ETag"):
+        _THUMBNAILS[session_id] = {"etag": response.headers["ETag"], "image": response.content}
+    return response.content
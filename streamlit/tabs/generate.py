@@ -1,9 +1,10 @@
 # streamlit/tabs/generate.py
 from __future__ import annotations
 import re
+import uuid
 import streamlit as st
 
-from api_client import generate_pdf
+from api_client import generate_pdf, preview_png
 from .tab_theme_editor import theme_selector
 
 _SEPS = re.compile(r"[;\n\r•\-–—]+")
@@ -67,6 +68,8 @@ def render_generate_actions(outputs_dir):
         st.info("No profile data found yet — you can still generate a blank PDF.", icon="ℹ️")
 
     col1, col2 = st.columns([1, 2])
+    # معرّف ثابت للجلسة: الطلب الأحدث يلغي الأقدم على الخادم
+    session_id = st.session_state.setdefault("preview_session", uuid.uuid4().hex)
 
     with col1:
         if st.button("🚀 Generate PDF", type="primary", use_container_width=True):
@@ -90,6 +93,20 @@ def render_generate_actions(outputs_dir):
                 st.error(f"❌ Failed to generate PDF: {e}")
 
     with col2:
+        # معاينة سريعة (PNG) تتحدّث مع كل تعديل دون توليد PDF
+        try:
+            thumb = preview_png(
+                profile,
+                theme_name=theme_name,
+                layout_name=layout_name,
+                ui_lang=ui_lang,
+                rtl_mode=rtl_mode,
+                session_id=session_id,
+            )
+            if thumb:
+                st.image(thumb, caption="Live preview (first page)", width="stretch")
+        except Exception as e:
+            st.caption(f"Preview unavailable: {e}")
         st.caption("💡 Tip: Theme and layout can be changed instantly — no need to restart the server.")
 
     st.divider()
@@ -3,6 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 import streamlit as st
 
+from api_client import get_choices
+
 def _list_theme_names(base_dir: Path) -> list[str]:
     themes_dir = base_dir / "themes"
     if not themes_dir.exists():
@@ -31,14 +33,22 @@ def theme_selector():
     base_dir = Path(__file__).resolve().parents[2]
 
     st.subheader("🎨 Theme & Layout")
-    themes = _list_theme_names(base_dir)
-    layouts = _list_layout_names(base_dir)
+    # القوائم من /meta/choices (مع كاش ETag)، والرجوع لقراءة المجلدات إن لم يتوفر الـ API
+    choices = get_choices()
+    if choices:
+        themes = sorted(choices.get("themes") or ["default"])
+        layouts = [""] + list(choices.get("layouts") or [])
+        default_theme = (choices.get("defaults") or {}).get("theme")
+    else:
+        themes = sorted(_list_theme_names(base_dir))
+        layouts = _list_layout_names(base_dir)
+        default_theme = None
 
     # اختيار الثيم
     theme_name = st.selectbox(
         "Theme",
-        options=sorted(themes),
-        index=min(0, len(themes)-1),
+        options=themes,
+        index=themes.index(default_theme) if default_theme in themes else 0,
         help="Choose a theme JSON from the /themes folder.",
     )
 